@@ -0,0 +1,24 @@
+"""Benchmark suite of the LE audio log parser.
+
+Run from the parser project folder:
+  # Runs all benchmarks and saves the result as baseline.
+  $ python -m benchmarks --save-baseline benchmarks/baseline.json
+
+  # Compares with the baseline and fails if throughput regresses over 10%.
+  $ python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.1
+
+  # Checks the import time of main.py against the budget.
+  $ python -m benchmarks --suites startup --import-budget-ms 300
+
+Suites:
+  - micro: Hot functions such as `REPattern.search`, timestamp decoding,
+    `append_result_info` and report generators.
+  - macro: End-to-end `LogEventPublisher.start_to_search` on synthetic logcat
+    fixtures of small, medium and large size.
+  - startup: Import time of `main.py` by `python -X importtime` against a
+    budget. It also fails if the modules loaded on first use (device support,
+    NumPy, observers) are imported at startup.
+
+None of the suites is run by CI (the repository has none), so the baseline
+threshold and the import-time budget are only enforced when run by hand.
+"""
@@ -0,0 +1,114 @@
+"""Entry of benchmark suite. Run `python -m benchmarks --help` for usage."""
+import argparse
+import functools
+import logging
+import sys
+
+from benchmarks import bench_utils
+from benchmarks import macro
+from benchmarks import micro
+from benchmarks import startup
+import le_logcat_generator
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description='LE audio parser benchmarks.')
+  parser.add_argument(
+      '--suites', type=str, default='micro,macro',
+      help=(
+          'Comma separated suites to run among "micro", "macro" and'
+          ' "startup".'))
+  parser.add_argument(
+      '--sizes', type=str, default=','.join(macro.FIXTURE_SIZES),
+      help='Comma separated fixture sizes of macro benchmarks.')
+  parser.add_argument(
+      '--observer', type=str,
+      default='observer.le_synthetic_trial_test:SyntheticTrialPattern',
+      help='Benchmarked observer in format "<module>:<class>".')
+  parser.add_argument('--fixture-dir', type=str,
+                      default=macro.DEFAULT_FIXTURE_DIR)
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument(
+      '--save-baseline', type=str, default=None,
+      help='Save the results as baseline JSON file.')
+  parser.add_argument(
+      '--baseline', type=str, default=None,
+      help='Compare the results with the baseline JSON file.')
+  parser.add_argument(
+      '--threshold', type=float, default=0.1,
+      help='Allowed ratio of throughput drop against baseline.')
+  parser.add_argument(
+      '--import-budget-ms', type=float, default=startup.DEFAULT_BUDGET_MS,
+      help=(
+          'Budget of median import time of main.py in "startup" suite. Only'
+          ' checked when the suite is run; not enforced by any CI.'))
+  parser.add_argument('--verbose', action='store_true')
+  args = parser.parse_args()
+
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S',
+      # The parser logs each record in INFO level which disturbs measurement.
+      level=logging.DEBUG if args.verbose else logging.WARNING)
+  log = logging.getLogger('benchmarks')
+  suites = {suite.strip() for suite in args.suites.split(',')}
+  observer_factory = functools.partial(
+      le_logcat_generator.load_observer, args.observer)
+  try:
+    observer_factory()
+  except Exception as ex:
+    log.warning('Failed to create observer %s: %s', args.observer, ex)
+    observer_factory = None
+
+  results: list[bench_utils.BenchResult] = []
+  startup_passed = True
+  if 'startup' in suites:
+    startup_report = startup.check(
+        repeat=args.repeat, budget_ms=args.import_budget_ms)
+    print(startup.format_report(startup_report))
+    results.append(startup.to_bench_result(startup_report))
+    startup_passed = startup_report.passed
+
+  if 'micro' in suites:
+    results.extend(micro.run(
+        observer=observer_factory() if observer_factory else None,
+        repeat=args.repeat))
+
+  if 'macro' in suites:
+    if observer_factory is None:
+      log.warning('Skip macro benchmarks without observer!')
+    else:
+      results.extend(macro.run(
+          observer_factory,
+          size_names=[size.strip() for size in args.sizes.split(',')],
+          fixture_dir=args.fixture_dir,
+          repeat=max(1, args.repeat // 2)))
+
+  print(bench_utils.format_table(results))
+  if args.save_baseline:
+    bench_utils.save_baseline(results, args.save_baseline)
+    print(f'Saved baseline to {args.save_baseline}')
+
+  if args.baseline:
+    regressions = bench_utils.compare(
+        results, bench_utils.load_baseline(args.baseline), args.threshold)
+    for regression in regressions:
+      print(
+          f'REGRESSION {regression.name}: {regression.throughput:.1f} vs '
+          f'baseline {regression.baseline_throughput:.1f} '
+          f'({regression.change_ratio * 100:+.1f}%)')
+
+    if regressions:
+      return 1
+
+    print(f'No regression over {args.threshold * 100:.0f}% against baseline.')
+
+  if not startup_passed:
+    print('STARTUP over import-time budget or with eager imports!')
+    return 1
+
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,155 @@
+"""Utilities to measure benchmarks and compare them with baseline."""
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import gc
+import json
+import platform
+import statistics
+import time
+from typing import Any, Callable
+
+
+@dataclasses.dataclass
+class BenchResult:
+  """Result of a single benchmark.
+
+  Attributes:
+    name: Name of benchmark. e.g.: "micro.re_pattern_search"
+    unit: Unit of work. e.g.: "lines", "records"
+    work_num: Number of work units done in each round.
+    round_secs: Elapsed seconds of each measured round.
+  """
+  name: str
+  unit: str
+  work_num: int
+  round_secs: list[float] = dataclasses.field(default_factory=list)
+
+  @property
+  def median_sec(self) -> float:
+    return statistics.median(self.round_secs)
+
+  @property
+  def min_sec(self) -> float:
+    return min(self.round_secs)
+
+  @property
+  def throughput(self) -> float:
+    """Work units per second based on the median round."""
+    return self.work_num / self.median_sec if self.median_sec else 0.0
+
+  def to_dict(self) -> dict[str, Any]:
+    return {
+        'name': self.name,
+        'unit': self.unit,
+        'work_num': self.work_num,
+        'median_sec': self.median_sec,
+        'min_sec': self.min_sec,
+        'throughput': self.throughput,
+        'round_secs': self.round_secs,
+    }
+
+
+@dataclasses.dataclass
+class Regression:
+  """Benchmark whose throughput drops more than the threshold."""
+  name: str
+  baseline_throughput: float
+  throughput: float
+
+  @property
+  def change_ratio(self) -> float:
+    return self.throughput / self.baseline_throughput - 1
+
+
+def bench(name: str, func: Callable[[], Any], work_num: int,
+          unit: str = 'ops', repeat: int = 5, warmup: int = 1,
+          setup: Callable[[], Any] | None = None) -> BenchResult:
+  """Measures the given function.
+
+  Args:
+    name: Name of benchmark.
+    func: Function doing `work_num` units of work in each round.
+    work_num: Number of work units done by each call of `func`.
+    unit: Unit of work.
+    repeat: Number of measured rounds.
+    warmup: Number of rounds before measuring.
+    setup: Function called before each round and not measured.
+
+  Returns:
+    The benchmark result.
+  """
+  result = BenchResult(name=name, unit=unit, work_num=work_num)
+  for round_num in range(warmup + repeat):
+    if setup:
+      setup()
+
+    gc.collect()
+    start_time = time.perf_counter()
+    func()
+    elapsed_sec = time.perf_counter() - start_time
+    if round_num >= warmup:
+      result.round_secs.append(elapsed_sec)
+
+  return result
+
+
+def format_table(results: list[BenchResult]) -> str:
+  lines = [
+      f'{"Benchmark":<44} {"Median(ms)":>11} {"Min(ms)":>10} '
+      f'{"Throughput":>14} Unit']
+  for result in results:
+    lines.append(
+        f'{result.name:<44} {result.median_sec * 1e3:>11.2f} '
+        f'{result.min_sec * 1e3:>10.2f} {result.throughput:>14.1f} '
+        f'{result.unit}/s')
+
+  return '\n'.join(lines)
+
+
+def save_baseline(results: list[BenchResult], file_path: str) -> None:
+  with open(file_path, 'w') as fw:
+    json.dump({
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'node': platform.node(),
+        'results': [result.to_dict() for result in results],
+    }, fw, indent=2)
+
+
+def load_baseline(file_path: str) -> dict[str, float]:
+  """Loads baseline throughput keyed by benchmark name."""
+  with open(file_path) as fo:
+    baseline = json.load(fo)
+
+  return {
+      result['name']: result['throughput']
+      for result in baseline['results']}
+
+
+def compare(results: list[BenchResult], baseline: dict[str, float],
+            threshold: float) -> list[Regression]:
+  """Finds the benchmarks whose throughput regresses past the threshold.
+
+  Args:
+    results: Current benchmark results.
+    baseline: Baseline throughput keyed by benchmark name.
+    threshold: Allowed ratio of throughput drop. e.g.: 0.1 for 10%.
+
+  Returns:
+    List of regressions. Benchmarks missing in baseline are skipped.
+  """
+  regressions = []
+  for result in results:
+    baseline_throughput = baseline.get(result.name)
+    if not baseline_throughput:
+      continue
+
+    if result.throughput < baseline_throughput * (1 - threshold):
+      regressions.append(Regression(
+          name=result.name, baseline_throughput=baseline_throughput,
+          throughput=result.throughput))
+
+  return regressions
@@ -0,0 +1,132 @@
+"""Macro benchmarks of end-to-end `LogEventPublisher.start_to_search`.
+
+The fixtures are synthetic logcat generated by `le_logcat_generator` from the
+patterns of benchmarked observer with fixed seed. They are generated once and
+reused from the fixture folder afterwards.
+
+The publisher stops at the first found record. So the trials of a fixture are
+all dropped except the last one, and the whole fixture is parsed no matter
+its size. The throughput is measured in bytes actually read by the publisher
+(See `LogEventPublisher.metrics`).
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+import os
+import tempfile
+from typing import Callable
+
+from benchmarks import bench_utils
+import constants
+import le_audio_log_event_publisher
+import le_logcat_generator
+
+
+DEFAULT_FIXTURE_DIR = os.path.join(
+    tempfile.gettempdir(), 'le_parser_bench_fixtures')
+FIXTURE_SIZES = {
+    'small': 1024 ** 2,
+    'medium': 32 * 1024 ** 2,
+    'large': 256 * 1024 ** 2,
+}
+# Formats generated in macro benchmarks. Raw dump is excluded to avoid
+# measuring the disk of /tmp.
+_REPORT_FORMATS = (constants.ReportFormat.TXT, constants.ReportFormat.CSV)
+
+
+def prepare_fixture(observer_factory: Callable, size_name: str,
+                    fixture_dir: str = DEFAULT_FIXTURE_DIR) -> str:
+  """Gets the path of fixture logcat and generates it if not exists.
+
+  The fixture is made of dropped trials up to the size and a complete trial
+  at the end.
+  """
+  observer = observer_factory()
+  fixture_path = os.path.join(
+      fixture_dir, f'{observer.__class__.__name__}_{size_name}.log')
+  if os.path.isfile(fixture_path):
+    return fixture_path
+
+  os.makedirs(fixture_dir, exist_ok=True)
+  generator = le_logcat_generator.LogcatGenerator.from_observer(
+      observer,
+      le_logcat_generator.GeneratorConfig(
+          trial_num=None, target_bytes=FIXTURE_SIZES[size_name],
+          drop_ratio=1.0, seed=0))
+  generator.write(fixture_path)
+  # Leaves a gap of idle minute after the last dropped trial.
+  last_start_time = datetime.datetime.strptime(
+      generator.truths[-1].start_time, '%m-%d %H:%M:%S.%f')
+  last_generator = le_logcat_generator.LogcatGenerator.from_observer(
+      observer_factory(),
+      le_logcat_generator.GeneratorConfig(
+          trial_num=1,
+          start_time=(
+              last_start_time + datetime.timedelta(minutes=1)).strftime(
+                  '%m-%d %H:%M:%S'),
+          seed=0))
+  with open(fixture_path, 'a', encoding='utf-8') as fw:
+    for line in last_generator.lines():
+      fw.write(line + '\n')
+
+  with open(f'{fixture_path}.truth.jsonl', 'a') as fw:
+    for truth in last_generator.truths:
+      truth.trial += len(generator.truths)
+      fw.write(json.dumps(truth.to_dict()) + '\n')
+
+  return fixture_path
+
+
+def bench_start_to_search(
+    observer_factory: Callable, fixture_path: str, name: str,
+    repeat: int = 3) -> bench_utils.BenchResult:
+  """Benchmarks the search of given fixture by a fresh publisher per round."""
+  output_dir = tempfile.mkdtemp(prefix='le_parser_bench_')
+  output_file_path = os.path.join(output_dir, 'report')
+  state = {}
+
+  def setup():
+    publisher = le_audio_log_event_publisher.LogEventPublisher(
+        formats=_REPORT_FORMATS)
+    publisher.register_observer(observer_factory())
+    state['publisher'] = publisher
+
+  def run():
+    try:
+      state['publisher'].start_to_search(
+          fixture_path, output_file_path=output_file_path)
+    except Exception as ex:
+      # Incomplete parsing is expected for fixtures with injected failures.
+      logging.getLogger(__name__).debug('Search ends with: %s', ex)
+
+  result = bench_utils.bench(
+      name, run, work_num=0, unit='bytes', repeat=repeat, setup=setup)
+  result.work_num = state['publisher'].metrics.byte_num
+  return result
+
+
+def run(observer_factory: Callable,
+        size_names: list[str] | None = None,
+        fixture_dir: str = DEFAULT_FIXTURE_DIR,
+        repeat: int = 3) -> list[bench_utils.BenchResult]:
+  """Runs macro benchmarks on fixtures of given sizes.
+
+  Args:
+    observer_factory: Callable to create the benchmarked observer.
+    size_names: Names of fixture sizes among `FIXTURE_SIZES`. All if None.
+    fixture_dir: Folder to keep the generated fixtures.
+    repeat: Number of measured rounds of each benchmark.
+
+  Returns:
+    List of benchmark results.
+  """
+  results = []
+  for size_name in size_names or FIXTURE_SIZES:
+    fixture_path = prepare_fixture(observer_factory, size_name, fixture_dir)
+    results.append(bench_start_to_search(
+        observer_factory, fixture_path, f'macro.start_to_search.{size_name}',
+        repeat=repeat))
+
+  return results
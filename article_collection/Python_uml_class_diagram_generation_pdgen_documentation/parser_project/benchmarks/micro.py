@@ -0,0 +1,190 @@
+"""Micro benchmarks of the hot functions in parsing path."""
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+import logging
+from typing import Any
+
+from benchmarks import bench_utils
+import general_data
+import le_audio_constants
+import le_audio_parsing_data
+from le_audio_parsing_data import OutputFormat
+from le_audio_parsing_data import OutputResult
+import le_logcat_generator
+import le_patterns
+from le_report_gen_utils import CsvReportGen, TxtReportGen
+
+
+_PatternEnum = general_data.PatternEnum
+_TIME_RE = r'(?P<time>\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})'
+_LINE_NUM = 20000
+_RECORD_NUM = 1000
+
+
+def sample_log_pattern_dict() -> dict[Any, le_patterns.REPattern]:
+  """Gets patterns in the style of observers for benchmarking."""
+  return {
+      _PatternEnum.START: le_patterns.REPattern(
+          _TIME_RE + r'.*BluetoothDevice: (?P<log>connect\(\) for device '
+          r'([0-9A-F]{2}:){5}[0-9A-F]{2} called by .+)'),
+      _PatternEnum.STATE_1: le_patterns.REPattern([
+          _TIME_RE + r'.*bt_stack: (?P<log>.*CSIP state=(CONNECTED|BONDED))',
+          _TIME_RE + r'\s+\d+\s+\d+ I LeAudio: (?P<log>group_id=\d+ .*)']),
+      _PatternEnum.END: le_patterns.REPattern(
+          _TIME_RE + r'.*CachedBluetoothDevice: (?P<log>onProfileStateChanged'
+          r'.* newProfileState 2)'),
+  }
+
+
+def sample_lines(line_num: int = _LINE_NUM) -> list[str]:
+  """Generates logcat lines hitting the sample patterns."""
+  generator = le_logcat_generator.LogcatGenerator(
+      sample_log_pattern_dict(),
+      le_logcat_generator.GeneratorConfig(
+          trial_num=None, duration_mean_sec=2.0, seed=1))
+  lines = []
+  for line in generator.lines():
+    lines.append(line + '\n')
+    if len(lines) >= line_num:
+      break
+
+  return lines
+
+
+def sample_records(record_num: int = _RECORD_NUM) -> list[OutputResult]:
+  """Creates records of pairing test for benchmarking report generators."""
+  start_time = datetime.datetime(1900, 1, 1, 8, 0, 0)
+  records = []
+  for trial in range(1, record_num + 1):
+    event_start_time = start_time + datetime.timedelta(seconds=trial * 20)
+    event_end_time = event_start_time + datetime.timedelta(seconds=9.5)
+    records.append(OutputResult(
+        title='Pair', trial=trial, output_format=OutputFormat.PAIR,
+        raw_data=[
+            general_data.Log(event_start_time, 'connect() for device'),
+            general_data.Log(event_end_time, 'newProfileState 2')],
+        event_start_time=event_start_time,
+        event_end_time=event_end_time,
+        start_to_end_duration=event_end_time - event_start_time,
+        event_end_result=general_data.EndResult.PASS,
+        event_pass_criteria_sec=le_audio_constants.PAIR_AND_CONNECT_TIME_SEC,
+        dialog_start_time=event_start_time + datetime.timedelta(seconds=1),
+        dialog_end_time=event_start_time + datetime.timedelta(seconds=3)))
+
+  return records
+
+
+def bench_re_pattern_search(lines: list[str], **kwargs):
+  patterns = list(sample_log_pattern_dict().values())
+
+  def run():
+    for line in lines:
+      for pattern in patterns:
+        pattern.search(line)
+
+  return bench_utils.bench(
+      'micro.re_pattern_search', run, work_num=len(lines), unit='lines',
+      **kwargs)
+
+
+def bench_timestamp_decode(lines: list[str], **kwargs):
+  timestamps = [line[:18] for line in lines]
+  datetime_fmt = le_audio_constants.DATETIME_FMT
+
+  def run():
+    for timestamp in timestamps:
+      datetime.datetime.strptime(timestamp, datetime_fmt)
+
+  return bench_utils.bench(
+      'micro.timestamp_decode', run, work_num=len(timestamps),
+      unit='timestamps', **kwargs)
+
+
+def bench_pattern_construct(**kwargs):
+  """Measures building the patterns of an observer from the bundle."""
+  construct_num = 1000
+
+  def run():
+    for _ in range(construct_num):
+      sample_log_pattern_dict()
+
+  return bench_utils.bench(
+      'micro.pattern_construct', run, work_num=construct_num,
+      unit='pattern_dicts', **kwargs)
+
+
+def bench_append_result_info(observer, **kwargs):
+  start_time = datetime.datetime(1900, 1, 1, 8, 0, 0)
+
+  def run():
+    captured_messages = []
+    for trial in range(_RECORD_NUM):
+      observer.captured.event_start_time = start_time
+      observer.captured.event_end_time = start_time + datetime.timedelta(
+          seconds=trial % 10)
+      observer.append_result_info(captured_messages)
+
+  return bench_utils.bench(
+      'micro.append_result_info', run, work_num=_RECORD_NUM, unit='records',
+      **kwargs)
+
+
+def bench_txt_report_gen(records: list[OutputResult], **kwargs):
+  report_gen = TxtReportGen(
+      sections=le_audio_parsing_data.TASK_TYPE_2_REPORT_SECT_MAP[
+          OutputFormat.PAIR])
+
+  def run():
+    for record in records:
+      report_gen.gen_record(record)
+
+  return bench_utils.bench(
+      'micro.txt_report_gen', run, work_num=len(records), unit='records',
+      **kwargs)
+
+
+def bench_csv_report_gen(records: list[OutputResult], **kwargs):
+  report_gen = CsvReportGen(
+      sections=le_audio_parsing_data.TASK_TYPE_2_REPORT_SECT_MAP[
+          OutputFormat.PAIR])
+
+  def run():
+    csv_writer = csv.writer(io.StringIO())
+    for record in records:
+      csv_writer.writerow(report_gen.gen_row(record))
+
+  return bench_utils.bench(
+      'micro.csv_report_gen', run, work_num=len(records), unit='records',
+      **kwargs)
+
+
+def run(observer=None, repeat: int = 5) -> list[bench_utils.BenchResult]:
+  """Runs all micro benchmarks.
+
+  Args:
+    observer: Observer to benchmark `append_result_info`. The benchmark is
+      skipped if None.
+    repeat: Number of measured rounds of each benchmark.
+
+  Returns:
+    List of benchmark results.
+  """
+  log = logging.getLogger(__name__)
+  lines = sample_lines()
+  records = sample_records()
+  results = [
+      bench_re_pattern_search(lines, repeat=repeat),
+      bench_timestamp_decode(lines, repeat=repeat),
+      bench_pattern_construct(repeat=repeat),
+      bench_txt_report_gen(records, repeat=repeat),
+      bench_csv_report_gen(records, repeat=repeat),
+  ]
+  if observer is None:
+    log.warning('No observer is given. Skip benchmark of append_result_info!')
+  else:
+    results.append(bench_append_result_info(observer, repeat=repeat))
+
+  return results
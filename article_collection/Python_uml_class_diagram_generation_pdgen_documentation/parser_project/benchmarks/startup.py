@@ -0,0 +1,151 @@
+"""Startup benchmark of importing `main.py` with an import-time budget.
+
+Each round imports the module in a fresh interpreter with `python -X
+importtime` and parses the per-module report from stderr. The check fails if
+the median import time exceeds the budget, or if any module which should be
+imported on first use (device support, NumPy statistics, observers) is
+imported at startup.
+
+The budget is NOT enforced automatically: this repository has no CI, so the
+check only runs when someone runs the "startup" suite by hand, e.g.
+  $ python -m benchmarks --suites startup
+and nothing stops a change exceeding the budget from being merged. Run it
+before sending changes which touch the imports of `main.py`.
+"""
+from __future__ import annotations
+
+import dataclasses
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks import bench_utils
+
+
+DEFAULT_MODULE = 'main'
+DEFAULT_BUDGET_MS = 300.0
+# Modules imported on first use which must not be imported at startup.
+LAZY_MODULES = (
+    'bttc', 'numpy', 'pyarrow', 'pdb', 'sqlite3', 'le_section_stats',
+    'le_run_history', 'observer.le_audio_pairing_test')
+_TOP_NUM = 10
+
+
+@dataclasses.dataclass
+class ImportRecord:
+  """Line of `-X importtime` report.
+
+  Attributes:
+    name: Name of imported module.
+    self_us: Time to execute the module itself in microseconds.
+    cumulative_us: Time including the imports of the module in microseconds.
+    depth: Nesting level of the import. 0 for the imports of the main script.
+  """
+  name: str
+  self_us: int
+  cumulative_us: int
+  depth: int
+
+
+@dataclasses.dataclass
+class StartupReport:
+  """Result of startup check.
+
+  Attributes:
+    module: Name of imported module.
+    round_ms: Import time of the module in each round.
+    records: Import records of the last round.
+    lazy_violations: Lazy modules imported at startup.
+    budget_ms: Budget of median import time.
+  """
+  module: str
+  round_ms: list[float]
+  records: list[ImportRecord]
+  lazy_violations: list[str]
+  budget_ms: float
+
+  @property
+  def median_ms(self) -> float:
+    return statistics.median(self.round_ms)
+
+  @property
+  def passed(self) -> bool:
+    return self.median_ms <= self.budget_ms and not self.lazy_violations
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+  """Parses the report of `-X importtime`.
+
+  e.g.: "import time:       451 |       1203 |   le_log_reader"
+  """
+  records = []
+  for line in stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+
+    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+    records.append(ImportRecord(
+        name=name.strip(), self_us=int(self_us),
+        cumulative_us=int(cumulative_us),
+        depth=(len(name) - len(name.lstrip()) - 1) // 2))
+
+  return records
+
+
+def measure(module: str = DEFAULT_MODULE) -> list[ImportRecord]:
+  """Imports the module in a fresh interpreter and gets the import records."""
+  process = subprocess.run(
+      [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+      capture_output=True, text=True, check=False,
+      cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+  if process.returncode:
+    raise Exception(
+        f'Failed to import {module}:\n{process.stderr[-2000:]}')
+
+  return parse_importtime(process.stderr)
+
+
+def check(module: str = DEFAULT_MODULE, repeat: int = 5,
+          budget_ms: float = DEFAULT_BUDGET_MS) -> StartupReport:
+  """Measures the import time of the module and checks the budget."""
+  round_ms, records = [], []
+  for _ in range(repeat):
+    records = measure(module)
+    round_ms.append(next(
+        record.cumulative_us for record in records
+        if record.name == module and record.depth == 0) / 1000)
+
+  imported_names = {record.name for record in records}
+  return StartupReport(
+      module=module, round_ms=round_ms, records=records,
+      lazy_violations=[
+          name for name in LAZY_MODULES if name in imported_names],
+      budget_ms=budget_ms)
+
+
+def format_report(report: StartupReport) -> str:
+  """Formats the summary of startup check with the slowest imports."""
+  lines = [
+      f'Import of "{report.module}": median {report.median_ms:.1f} ms'
+      f' (budget {report.budget_ms:.0f} ms)',
+      f'Slowest {_TOP_NUM} modules by self time:']
+  for record in sorted(
+      report.records, key=lambda record: record.self_us,
+      reverse=True)[:_TOP_NUM]:
+    lines.append(
+        f'  {record.name:<40}{record.self_us / 1000:>8.1f} ms'
+        f'{record.cumulative_us / 1000:>10.1f} ms cumulative')
+
+  if report.lazy_violations:
+    lines.append(
+        f'Imported at startup but should be lazy: {report.lazy_violations}')
+
+  return '\n'.join(lines)
+
+
+def to_bench_result(report: StartupReport) -> bench_utils.BenchResult:
+  """Converts the report into benchmark result of one import per round."""
+  return bench_utils.BenchResult(
+      name=f'startup.import_{report.module}', unit='imports', work_num=1,
+      round_secs=[ms / 1000 for ms in report.round_ms])
@@ -13,6 +13,27 @@ ENV_ROUND_DIGIT = f'{_ENV_PREFIX}_ROUND_DIGIT'
 # Environment variable to setup the searching timeout in second.
 ENV_SEARCH_TIMEOUT = f'{_ENV_PREFIX}_PATTERNS_SEARCH_TIMEOUT_SEC'
 
+# Environment variable to select the output formats. e.g.: "txt,csv"
+ENV_REPORT_FORMATS = f'{_ENV_PREFIX}_REPORT_FORMATS'
+
+# Environment variable to enable the per-pattern profiler if set as "1".
+ENV_PATTERN_PROFILE = f'{_ENV_PREFIX}_PATTERN_PROFILE'
+
+# Environment variables to set up the reorder window of log lines in number of
+# lines and in milliseconds. Reordering is disabled if both are not set.
+ENV_REORDER_WINDOW_LINES = f'{_ENV_PREFIX}_REORDER_WINDOW_LINES'
+ENV_REORDER_WINDOW_MS = f'{_ENV_PREFIX}_REORDER_WINDOW_MS'
+
+# Environment variable of SQLite database path to record the history of runs.
+ENV_HISTORY_DB = f'{_ENV_PREFIX}_HISTORY_DB'
+
+# Environment variable of the build label recorded with the history of runs.
+ENV_BUILD = f'{_ENV_PREFIX}_BUILD'
+
+# Environment variable of the key shared by the coordinator and workers of
+# cluster mode to authenticate the connections.
+ENV_CLUSTER_AUTHKEY = f'{_ENV_PREFIX}_CLUSTER_AUTHKEY'
+
 # Perf round digit. e.g.: number = 0.1234
 #   Perf round digit=1 > number = 0.1
 #   Perf round digit=2 > number = 0.12
@@ -44,6 +65,49 @@ class HeadsetType(StrEnum):
     raise Exception(f'Unknown headset string="{headset_str}"!')
 
 
+class ReportFormat(StrEnum):
+  TXT = 'txt'
+  CSV = 'csv'
+  # JSON Lines with one trial per line.
+  JSON = 'json'
+  # Columnar dump of section durations and pass flags.
+  NPZ = 'npz'
+  PARQUET = 'parquet'
+  # Raw dump of all matched lines into /tmp/log_event_publisher_*.txt, or
+  # into <output path>_raw.txt for parse jobs. (See `le_parser_jobs`)
+  RAW = 'raw'
+
+  @classmethod
+  def from_str_list(cls, formats_str: str | None) -> list['ReportFormat']:
+    """Gets report formats from comma separated string. e.g.: "txt,csv".
+
+    If the given string is empty, the formats from environment variable
+    `ENV_REPORT_FORMATS` or `DEFAULT_REPORT_FORMATS` will be used.
+    """
+    formats_str = formats_str or os.environ.get(ENV_REPORT_FORMATS)
+    if not formats_str:
+      return list(DEFAULT_REPORT_FORMATS)
+
+    report_formats = []
+    for format_str in formats_str.split(','):
+      format_str = format_str.strip().lower()
+      if not format_str:
+        continue
+
+      try:
+        report_formats.append(cls(format_str))
+      except ValueError:
+        raise Exception(
+            f'Unknown report format="{format_str}"! '
+            f'(Supported: {", ".join(cls)})')
+
+    return report_formats
+
+
+DEFAULT_REPORT_FORMATS = (
+    ReportFormat.TXT, ReportFormat.CSV, ReportFormat.RAW)
+
+
 @dataclasses.dataclass
 class LEAConfig:
   # b/326007878
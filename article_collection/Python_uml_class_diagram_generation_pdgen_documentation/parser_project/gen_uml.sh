@@ -2,4 +2,8 @@
 pyreverse --only-classnames --colorized -o png -p le_audio_utilities \
     main.py le_report_data.py le_audio_parsing_data.py le_patterns.py \
     le_audio_log_event_publisher.py general_data.py errors.py \
-    constants.py observer/*.py le_audio_constants.py le_report_gen_utils.py
+    constants.py observer/*.py le_audio_constants.py le_report_gen_utils.py \
+    le_report_writers.py le_report_export.py le_raw_hit_sink.py le_log_reader.py le_pattern_profiler.py le_pipeline_metrics.py le_logcat_generator.py \
+    le_log_merge.py le_reorder_buffer.py le_statistics.py le_section_stats.py \
+    le_run_history.py le_regression_check.py le_parser_jobs.py le_parser_daemon.py \
+    le_parser_registry.py le_pattern_bundle.py le_batch.py le_parser_cluster.py
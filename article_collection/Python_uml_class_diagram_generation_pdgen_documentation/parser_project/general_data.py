@@ -33,6 +33,66 @@ class Log:
   message: str | None = None
 
 
+class LogSource(Protocol):
+  """Source of log lines which supports random access by byte offset."""
+
+  def read(self, offset: int, length: int) -> bytes:
+    """Reads `length` bytes starting at `offset`."""
+
+
+class LogRef:
+  """Reference of a matched log line in its source.
+
+  Only the byte offset and length of the line are kept and the message is
+  materialized from the source on demand. It provides the same interface as
+  `Log`.
+
+  Attributes:
+    timestamp: Timestamp of the matched line.
+    source: Source holding the matched line.
+    offset: Byte offset of the matched line in the source.
+    length: Length of the matched line in bytes.
+    message_start: Start index of the message in the decoded line.
+    message_end: End index of the message in the decoded line.
+  """
+  __slots__ = (
+      'timestamp', 'source', 'offset', 'length', 'message_start',
+      'message_end')
+
+  def __init__(self, timestamp: datetime.datetime | None, source: LogSource,
+               offset: int, length: int, message_start: int = 0,
+               message_end: int | None = None):
+    self.timestamp = timestamp
+    self.source = source
+    self.offset = offset
+    self.length = length
+    self.message_start = message_start
+    self.message_end = message_end
+
+  @property
+  def line(self) -> str:
+    """The matched line materialized from the source."""
+    return self.source.read(self.offset, self.length).decode(
+        'utf-8', errors='ignore')
+
+  @property
+  def message(self) -> str:
+    return self.line[self.message_start:self.message_end]
+
+  @property
+  def end_offset(self) -> int:
+    return self.offset + self.length
+
+  def __deepcopy__(self, memo) -> LogRef:
+    # Immutable reference, no need to copy the source.
+    return self
+
+  def __repr__(self) -> str:
+    return (
+        f'LogRef(timestamp={self.timestamp!r}, offset={self.offset}, '
+        f'length={self.length})')
+
+
 class OutputFormat(str, enum.Enum):
   PAIR = 'Pair'
   AUDIO = 'Audio'
@@ -0,0 +1,13 @@
+"""Golden-log correctness harness of the LE audio log parser.
+
+Each entry of corpus (See `golden/corpus.json`) is parsed by every registered
+mode (See `golden/modes.py`). The trial records of each mode are diffed field
+by field against the committed golden output in `golden/expected/`.
+
+Run from the parser project folder:
+  # Regenerates the golden outputs by the reference mode.
+  $ python -m golden --update
+
+  # Checks every mode against the golden outputs.
+  $ python -m golden
+"""
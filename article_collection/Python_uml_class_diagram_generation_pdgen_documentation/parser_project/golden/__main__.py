@@ -0,0 +1,75 @@
+"""Entry of golden harness. Run `python -m golden --help` for usage."""
+import argparse
+import logging
+import os
+import sys
+
+from golden import harness
+from golden import modes
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(description='LE audio parser golden logs.')
+  parser.add_argument(
+      '--modes', type=str, default=','.join(modes.MODES),
+      help='Comma separated modes to check.')
+  parser.add_argument(
+      '--entries', type=str, default=None,
+      help='Comma separated corpus entries to check. All if not given.')
+  parser.add_argument('--corpus', type=str, default=harness.DEFAULT_CORPUS_FILE)
+  parser.add_argument('--expected-dir', type=str,
+                      default=harness.DEFAULT_EXPECTED_DIR)
+  parser.add_argument('--cache-dir', type=str, default=harness.DEFAULT_CACHE_DIR)
+  parser.add_argument(
+      '--update', action='store_true',
+      help=f'Regenerate the golden outputs by mode "{modes.REFERENCE_MODE}".')
+  parser.add_argument('--verbose', action='store_true')
+  args = parser.parse_args()
+
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S',
+      level=logging.DEBUG if args.verbose else logging.WARNING)
+  mode_names = (
+      [modes.REFERENCE_MODE] if args.update
+      else [name.strip() for name in args.modes.split(',')])
+  for mode_name in mode_names:
+    if mode_name not in modes.MODES:
+      raise Exception(
+          f'Unknown mode "{mode_name}"! Supported: {list(modes.MODES)}')
+
+  entries = harness.load_corpus(args.corpus)
+  if args.entries:
+    entry_names = {name.strip() for name in args.entries.split(',')}
+    entries = [entry for entry in entries if entry.name in entry_names]
+
+  os.makedirs(args.expected_dir, exist_ok=True)
+  corpus_dir = os.path.dirname(os.path.abspath(args.corpus))
+  results: list[harness.ModeResult] = []
+  for entry in entries:
+    log_path = entry.log_path(corpus_dir, args.cache_dir)
+    for mode_name in mode_names:
+      result = harness.run_mode(
+          entry, modes.MODES[mode_name], log_path,
+          expected_dir=args.expected_dir, update=args.update)
+      results.append(result)
+      status = 'PASS' if result.passed else 'FAIL'
+      if args.update and result.passed:
+        status = 'UPDATED'
+
+      print(
+          f'{status:<8}{entry.name:<32}{mode_name:<16}'
+          f'{result.trial_num:>6} trials {result.mb_per_sec:>9.2f} MB/s')
+      if result.error:
+        print(f'  {result.error}')
+
+      for diff in result.diffs:
+        print(f'  {diff}')
+
+  failed_num = sum(1 for result in results if not result.passed)
+  print(f'{len(results) - failed_num}/{len(results)} passed.')
+  return 1 if failed_num else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
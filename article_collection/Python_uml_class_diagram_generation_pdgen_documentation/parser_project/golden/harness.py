@@ -0,0 +1,224 @@
+"""Harness to run the corpus by each mode and diff against golden outputs."""
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import tempfile
+import time
+from typing import Any
+
+from golden import modes
+from le_audio_constants import DATETIME_FMT
+from le_audio_parsing_data import OutputResult
+import le_log_reader
+import le_logcat_generator
+import le_report_export
+
+
+GOLDEN_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CORPUS_FILE = os.path.join(GOLDEN_DIR, 'corpus.json')
+DEFAULT_EXPECTED_DIR = os.path.join(GOLDEN_DIR, 'expected')
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'le_parser_golden')
+
+
+@dataclasses.dataclass
+class CorpusEntry:
+  """Entry of golden corpus.
+
+  Attributes:
+    name: Name of the entry which is also the name of golden output.
+    observer: Observer in format "<module>:<class>".
+    log: Path of log relative to the corpus file. None for synthetic log.
+    synthetic: Configuration of `le_logcat_generator.GeneratorConfig` to
+      generate the log. The seed makes the log identical in every run.
+  """
+  name: str
+  observer: str
+  log: str | None = None
+  synthetic: dict[str, Any] | None = None
+
+  def observer_factory(self):
+    return le_logcat_generator.load_observer(self.observer)
+
+  def log_path(self, corpus_dir: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Gets the log path and generates the synthetic log if not exists."""
+    if self.log:
+      return os.path.join(corpus_dir, self.log)
+
+    log_path = os.path.join(cache_dir, f'{self.name}.log')
+    if not os.path.isfile(log_path):
+      os.makedirs(cache_dir, exist_ok=True)
+      generator = le_logcat_generator.LogcatGenerator.from_observer(
+          self.observer_factory(),
+          le_logcat_generator.GeneratorConfig(**(self.synthetic or {})))
+      generator.write(log_path)
+
+    return log_path
+
+
+@dataclasses.dataclass
+class ModeResult:
+  """Result of parsing a corpus entry by a mode.
+
+  Attributes:
+    entry: Name of corpus entry.
+    mode: Name of mode.
+    trial_num: Number of found trials.
+    elapsed_sec: Time of parsing in seconds.
+    byte_num: Size of parsed log in bytes.
+    diffs: Differences against the golden output.
+    error: Error message if the mode failed.
+  """
+  entry: str
+  mode: str
+  trial_num: int = 0
+  elapsed_sec: float = 0.0
+  byte_num: int = 0
+  diffs: list[str] = dataclasses.field(default_factory=list)
+  error: str | None = None
+
+  @property
+  def passed(self) -> bool:
+    return not self.diffs and not self.error
+
+  @property
+  def mb_per_sec(self) -> float:
+    return (
+        self.byte_num / 1024 / 1024 / self.elapsed_sec
+        if self.elapsed_sec else 0.0)
+
+
+def load_corpus(corpus_file: str = DEFAULT_CORPUS_FILE) -> list[CorpusEntry]:
+  with open(corpus_file) as fo:
+    return [CorpusEntry(**entry) for entry in json.load(fo)]
+
+
+def to_golden_record(output_result: OutputResult) -> dict[str, Any]:
+  """Converts the record into JSON serializable golden record."""
+  golden_record = json.loads(
+      json.dumps(le_report_export.to_trial_record(output_result)))
+  golden_record['raw_data'] = [
+      [val.timestamp.strftime(DATETIME_FMT) if val.timestamp else None,
+       val.message]
+      for val in output_result.raw_data if not isinstance(val, str)]
+  return golden_record
+
+
+def save_golden(file_path: str, records: list[OutputResult]) -> None:
+  with open(file_path, 'w') as fw:
+    for record in records:
+      fw.write(json.dumps(to_golden_record(record)) + '\n')
+
+
+def load_golden(file_path: str) -> list[dict[str, Any]]:
+  with open(file_path) as fo:
+    return [json.loads(line) for line in fo if line.strip()]
+
+
+def _flatten(value: Any, prefix: str = '') -> dict[str, Any]:
+  if isinstance(value, dict):
+    flat_dict = {}
+    for key, sub_value in value.items():
+      flat_dict.update(_flatten(sub_value, f'{prefix}{key}.'))
+    return flat_dict
+
+  return {prefix.rstrip('.'): value}
+
+
+def diff_records(expected_records: list[dict[str, Any]],
+                 actual_records: list[dict[str, Any]]) -> list[str]:
+  """Diffs the records field by field.
+
+  Returns:
+    Description of each difference. Empty if the records are identical.
+  """
+  diffs = []
+  if len(expected_records) != len(actual_records):
+    diffs.append(
+        f'Number of trials: expected {len(expected_records)} '
+        f'got {len(actual_records)}')
+
+  for index, (expected, actual) in enumerate(
+      zip(expected_records, actual_records), start=1):
+    expected_fields = _flatten(expected)
+    actual_fields = _flatten(actual)
+    for field_name in sorted(expected_fields.keys() | actual_fields.keys()):
+      expected_value = expected_fields.get(field_name)
+      actual_value = actual_fields.get(field_name)
+      if expected_value != actual_value:
+        diffs.append(
+            f'Trial#{index} {field_name}: expected {expected_value!r} '
+            f'got {actual_value!r}')
+
+  return diffs
+
+
+def check_log_windows(records: list[OutputResult]) -> list[str]:
+  """Checks the log window of each source spans the hits of trial in it.
+
+  Returns:
+    Description of each problem. Empty if all windows are correct.
+  """
+  problems = []
+  for index, record in enumerate(records, start=1):
+    for source, lines in le_log_reader.trial_log_windows(record):
+      source_lines = [
+          val.line.rstrip('\r\n') for val in sorted(
+              (val for val in record.raw_data
+               if isinstance(val, le_log_reader.LogRef) and
+               val.source is source),
+              key=lambda val: val.offset)]
+      if (not lines or lines[0] != source_lines[0] or
+          lines[-1] != source_lines[-1] or
+          not set(source_lines).issubset(lines)):
+        problems.append(
+            f'Trial#{index} log window of {source.file_path} does not span'
+            ' its hits')
+
+  return problems
+
+
+def run_mode(entry: CorpusEntry, mode: modes.Mode, log_path: str,
+             expected_dir: str = DEFAULT_EXPECTED_DIR,
+             update: bool = False) -> ModeResult:
+  """Parses the entry by the mode and diffs against the golden output.
+
+  Args:
+    entry: The corpus entry.
+    mode: The parsing mode.
+    log_path: Path of the entry's log.
+    expected_dir: Folder of golden outputs.
+    update: True to overwrite the golden output by the result.
+
+  Returns:
+    The result of the mode.
+  """
+  result = ModeResult(
+      entry=entry.name, mode=mode.name, byte_num=os.path.getsize(log_path))
+  golden_path = os.path.join(expected_dir, f'{entry.name}.jsonl')
+  with tempfile.TemporaryDirectory(prefix='le_parser_golden_') as work_dir:
+    start_time = time.perf_counter()
+    try:
+      records = mode.func(entry.observer_factory, log_path, work_dir)
+    except Exception as ex:
+      result.error = f'{ex.__class__.__name__}: {ex}'
+      return result
+    finally:
+      result.elapsed_sec = time.perf_counter() - start_time
+
+    result.trial_num = len(records)
+    result.diffs = check_log_windows(records)
+    if update:
+      save_golden(golden_path, records)
+      return result
+
+    if not os.path.isfile(golden_path):
+      result.error = f'Golden output {golden_path} does not exist!'
+      return result
+
+    result.diffs += diff_records(
+        load_golden(golden_path),
+        [to_golden_record(record) for record in records])
+
+  return result
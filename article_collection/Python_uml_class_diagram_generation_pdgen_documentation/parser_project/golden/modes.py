@@ -0,0 +1,142 @@
+"""Registry of parsing modes compared by the golden harness.
+
+A mode parses a log file by a specific engine, reader or parallelism and
+returns the found trial records. New modes register themselves by
+`register_mode`.
+"""
+from __future__ import annotations
+
+import dataclasses
+import logging
+import os
+from typing import Callable
+
+import constants
+import le_audio_log_event_publisher
+import le_log_merge
+from le_audio_parsing_data import OutputResult
+from le_reorder_buffer import ReorderWindow
+
+
+ObserverFactory = Callable[[], object]
+ModeFunc = Callable[[ObserverFactory, str, str], list[OutputResult]]
+# Mode which generates the golden outputs.
+REFERENCE_MODE = 'publisher'
+# Lines of each part of mode "merge_rotated". Parts are small so the hits of a
+# trial spread over parts.
+_ROTATED_PART_LINES = 64
+
+
+@dataclasses.dataclass(frozen=True)
+class Mode:
+  """Parsing mode.
+
+  Attributes:
+    name: Name of the mode.
+    description: Description of the mode.
+    func: Function to parse the log. It takes the observer factory, the log
+      path and a work folder to output reports, and returns the records.
+  """
+  name: str
+  description: str
+  func: ModeFunc
+
+
+MODES: dict[str, Mode] = {}
+
+
+def register_mode(name: str, description: str) -> Callable[[ModeFunc], ModeFunc]:
+  """Decorator to register the decorated function as parsing mode."""
+
+  def decorate_func(func: ModeFunc) -> ModeFunc:
+    if name in MODES:
+      raise Exception(f'Mode "{name}" is registered already!')
+
+    MODES[name] = Mode(name=name, description=description, func=func)
+    return func
+
+  return decorate_func
+
+
+@register_mode(
+    REFERENCE_MODE,
+    'LogEventPublisher reading the log in binary by LogSource (mmap).')
+def run_publisher(observer_factory: ObserverFactory, log_path: str,
+                  work_dir: str) -> list[OutputResult]:
+  return _run_publisher(observer_factory, log_path, work_dir)
+
+
+def _run_publisher(observer_factory: ObserverFactory, log_path: str,
+                   work_dir: str, **publisher_kwargs) -> list[OutputResult]:
+  publisher = le_audio_log_event_publisher.LogEventPublisher(
+      formats=(constants.ReportFormat.TXT,), **publisher_kwargs)
+  publisher.register_observer(observer_factory())
+  try:
+    publisher.start_to_search(
+        log_path,
+        output_file_path=os.path.join(work_dir, 'report'))
+  except Exception as ex:
+    # Incomplete parsing still keeps the found records.
+    logging.getLogger(__name__).debug('Search ends with: %s', ex)
+
+  return publisher.output.collection
+
+
+@register_mode(
+    'merge',
+    'LogEventPublisher reading the log through the k-way merge by time.')
+def run_merge(observer_factory: ObserverFactory, log_path: str,
+              work_dir: str) -> list[OutputResult]:
+  return _run_publisher(
+      observer_factory, le_log_merge.MERGE_INPUT_PREFIX + log_path, work_dir)
+
+
+@register_mode(
+    'merge_rotated',
+    'LogEventPublisher reading the log split into rotated files through the'
+    ' k-way merge by time.')
+def run_merge_rotated(observer_factory: ObserverFactory, log_path: str,
+                      work_dir: str) -> list[OutputResult]:
+  with open(log_path, 'rb') as fo:
+    lines = fo.readlines()
+
+  parts = [
+      lines[index:index + _ROTATED_PART_LINES]
+      for index in range(0, len(lines), _ROTATED_PART_LINES)] or [[]]
+  rotated_path = os.path.join(work_dir, 'logcat')
+  # The newest part is "logcat" and the older ones are "logcat.<N>".
+  for index, part in enumerate(reversed(parts)):
+    with open(rotated_path + (f'.{index}' if index else ''), 'wb') as fw:
+      fw.writelines(part)
+
+  return _run_publisher(
+      observer_factory, le_log_merge.MERGE_INPUT_PREFIX + rotated_path,
+      work_dir)
+
+
+@register_mode(
+    'reorder',
+    'LogEventPublisher with the lines reordered by timestamp in a window.')
+def run_reorder(observer_factory: ObserverFactory, log_path: str,
+                work_dir: str) -> list[OutputResult]:
+  return _run_publisher(
+      observer_factory, log_path, work_dir,
+      reorder_window=ReorderWindow(max_lines=256, max_delay_ms=100))
+
+
+@register_mode(
+    'text_reader',
+    'Observer fed by the legacy text mode reader with str lines.')
+def run_text_reader(observer_factory: ObserverFactory, log_path: str,
+                    work_dir: str) -> list[OutputResult]:
+  observer = observer_factory()
+  records = []
+  with open(log_path, 'r', encoding='utf-8', errors='ignore') as fo:
+    for line in fo:
+      captured_messages = observer.notify(line)
+      if captured_messages is not None:
+        records.extend(captured_messages)
+        # Stops at the first found record as LogEventPublisher does.
+        break
+
+  return records
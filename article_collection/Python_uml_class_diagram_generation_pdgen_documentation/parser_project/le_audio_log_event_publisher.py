@@ -1,20 +1,43 @@
 """Utility to sevrve as Publisher of LE audio log event."""
-import bttc
+import dataclasses
+from datetime import datetime
 from datetime import timedelta
 import logging
 import os
-from typing import List
+from typing import Iterable, List
 
 import constants
 import errors
 
 from le_audio_parsing_data import CollectOutputResult
+from le_audio_parsing_data import OutputResult
+import le_log_merge
+from le_log_reader import LogSource
+import le_pattern_profiler
+from le_pipeline_metrics import PipelineMetrics
+from le_pipeline_metrics import Stage
+from le_reorder_buffer import ReorderBuffer
+from le_reorder_buffer import ReorderWindow
+import le_report_export
+from le_report_writers import ColumnarReportWriter
+from le_report_writers import CsvReportWriter
+from le_report_writers import JsonReportWriter
+from le_report_writers import ParquetReportWriter
+from le_report_writers import ReportWriter
+from le_report_writers import TxtReportWriter
 from observer.le_audio_log_observer import Observer
 import utils
 
 
 _COLLECTION_OUTPUT_FILE_PATH = '/tmp/log_event_publisher_{observer_name}.txt'
 _ENV_LOGCAT_MONITOR_TIME = 'LE_AUDIO_PERF_LOGCAT_MONITOR_TIME'
+_REPORT_FORMAT_2_WRITER_CLS = {
+    constants.ReportFormat.TXT: TxtReportWriter,
+    constants.ReportFormat.CSV: CsvReportWriter,
+    constants.ReportFormat.JSON: JsonReportWriter,
+    constants.ReportFormat.NPZ: ColumnarReportWriter,
+    constants.ReportFormat.PARQUET: ParquetReportWriter,
+}
 
 
 class LogEventPublisher():
@@ -24,104 +47,167 @@ class LogEventPublisher():
       observers: List to hold registered observer.
       output: Dataclass to hold the output data generated by the log parser.
       log: Logger object literally.
+      formats: Requested output formats. Reports of other formats are not
+        generated at all.
+      report_writers: Report writers opened by the ongoing search.
+      report_file_paths: Paths of the report files output by the latest
+        search.
+      log_source: Source of the analyzed log. The matched lines kept in the
+        records refer to it by byte offset. None if multiple logs are merged.
+      pattern_profiler: Profiler of pattern cost. None if profiling is
+        disabled.
+      metrics: Stage timing and throughput metrics of the latest search.
+      metrics_file_path: Path of JSON file to output the metrics. None to
+        print the metrics only.
+      reorder_window: Window to reorder the lines by timestamp before they
+        are notified to observer. None if reordering is disabled.
+      history_db_path: Path of SQLite database to record the run. None if
+        the run is not recorded.
+      keep_raw_data: False to drop the matched lines of records once they
+        are written into the reports. The matched lines are the bulk of a
+        record so the kept records stay small in long searches.
+      raw_data_file_path: Path to dump the matched lines of format
+        `constants.ReportFormat.RAW`. None to dump them into
+        `/tmp/log_event_publisher_<observer>.txt`.
   """
 
-  def __init__(self):
-    """Initial setup test."""
+  def __init__(
+      self, formats: Iterable[constants.ReportFormat] | None = None,
+      profile_patterns: bool | None = None,
+      metrics_file_path: str | None = None,
+      reorder_window: ReorderWindow | None = None,
+      history_db_path: str | None = None,
+      keep_raw_data: bool = True,
+      raw_data_file_path: str | None = None):
+    """Initial setup test.
+
+    Args:
+      formats: Requested output formats. Default formats are used if None.
+      profile_patterns: True to profile the cost of each pattern. Environment
+        variable `constants.ENV_PATTERN_PROFILE` is checked if None.
+      metrics_file_path: Path of JSON file to output the pipeline metrics.
+      reorder_window: Window to reorder the lines by timestamp. Environment
+        variables `constants.ENV_REORDER_WINDOW_LINES` and
+        `constants.ENV_REORDER_WINDOW_MS` are checked if None.
+      history_db_path: Path of SQLite database to record the run. (See
+        `le_run_history`) Environment variable `constants.ENV_HISTORY_DB` is
+        checked if None.
+      keep_raw_data: False to drop the matched lines of records after writing
+        them into the reports.
+      raw_data_file_path: Path to dump the matched lines if format
+        `constants.ReportFormat.RAW` is requested. A path shared by
+        concurrent searches (e.g. the default path in `/tmp`) gets the dumps
+        truncated and interleaved, so give each of them its own path.
+    """
     self.observer: Observer | None = None
     self.output = CollectOutputResult()
     self.log = logging.getLogger(__name__)
+    self.formats = set(
+        constants.DEFAULT_REPORT_FORMATS if formats is None else formats)
+    self.report_writers: List[ReportWriter] = []
+    self.report_file_paths: List[str] = []
+    self.log_source: LogSource | None = None
+    if profile_patterns is None:
+      profile_patterns = le_pattern_profiler.is_enabled_by_env()
+    self.pattern_profiler = (
+        le_pattern_profiler.PatternProfiler() if profile_patterns else None)
+    self.metrics: PipelineMetrics | None = None
+    self.metrics_file_path = metrics_file_path
+    self.reorder_window = reorder_window or ReorderWindow.from_env()
+    self.history_db_path = history_db_path or os.environ.get(
+        constants.ENV_HISTORY_DB)
+    self.keep_raw_data = keep_raw_data
+    self.raw_data_file_path = raw_data_file_path
 
   def register_observer(self, observer: Observer):
     """Saves the registered observer."""
     self.observer = observer
+    # Skips collecting the raw data of matched lines if nobody reads it.
+    self.observer.keep_global_raw_data = (
+        constants.ReportFormat.RAW in self.formats)
 
   @utils.pdb_able
+  @utils.profile_able
   def start_to_search(self, input_file_path: str,
-                      output_file_path: str = 'report') -> CollectOutputResult:
+                      output_file_path: str = 'report',
+                      since: datetime | None = None,
+                      until: datetime | None = None) -> CollectOutputResult:
     """Opens the input file and analyzes the input log file.
 
+    The found records are written into the reports as soon as they are
+    completed. The summary of reports is written when the search is done or
+    interrupted.
+
     Args:
-      input_file_path: Log file path to analyze.
+      input_file_path: Log file path to analyze. Multiple log files are
+        merged by time in format "merge:<path>[,<path>...]" (See
+        `le_log_merge`).
       output_file_path: File path to output result.
+      since: Only analyzes the lines from this time. The log file must be
+        sorted by time. Not supported for logcat from device.
+      until: Only analyzes the lines until this time plus the search timeout
+        of observer as margin. Same constraints as `since`.
 
     Returns:
       captured_messages : List to store the captured messages.
     """
-    line_num = 0
-    debug_lin_num = 0
-    if input_file_path.startswith('device:'):
-      # Read logcat directly from device
-      input_info = input_file_path.split(':')
-      device_serial = input_info[1].strip()
-      output_collected_log_path = f'/tmp/collected_log_from_{device_serial}.txt'
-      if len(input_info) > 2:
-        output_collected_log_path = input_info[2]
-
-      if device_serial.startswith('localhost_'):
-        device_serial = device_serial.replace('_', ':')
-        self.log.info('Device serial: %s', device_serial)
-
-      dut = bttc.get(device_serial)
-      # Default logcat monitoring time is 1 hr.
-      logcat_monitoring_time_sec = int(
-          os.environ.get(_ENV_LOGCAT_MONITOR_TIME, 60 * 60))
-      time_info = timedelta(seconds=logcat_monitoring_time_sec)
-      self.log.info(
-          f'Monitoring logcat message for %s... '
-          f'(You could use environment "%s" to change this setting)',
-          time_info, _ENV_LOGCAT_MONITOR_TIME)
-      try:
-        with open(output_collected_log_path, 'w') as fw:
-          for line_num, line in enumerate(
-              dut.gm.follow_logcat_within(
-                  time_sec=logcat_monitoring_time_sec,
-                  logcat_args='-b system -b events -b main')):
-            fw.write(f'{line}\n')
-            if ' D ' in line:
-              debug_lin_num += 1
-
-            captured_messages = self.observer.notify(line)
-            if captured_messages is not None:
-              self.output.collection.extend(captured_messages)
-              break
-      except KeyboardInterrupt as ex:
-        self.log.info('Stop monitoring logcat!')
-        self.log.info('Output collected logcat message into %s!', output_collected_log_path)
-      except Exception as ex:
-        self.log.error('Failed at line=%s (%s): %s', line_num, line, ex)
-        raise
+    if constants.ReportFormat.RAW in self.formats:
+      self.observer.global_raw_data.open(
+          self.raw_data_file_path or _COLLECTION_OUTPUT_FILE_PATH.format(
+              observer_name=self.observer.__class__.__name__))
+
+    if self.pattern_profiler:
+      self.pattern_profiler.instrument(
+          self.observer.captured.log_pattern_dict)
+
+    started_at = datetime.now()
+    is_device = input_file_path.startswith('device:')
+    rotated_file_sets = None
+    if le_log_merge.is_merge_input(input_file_path):
+      rotated_file_sets = le_log_merge.parse_merge_input(input_file_path)
+      total_bytes = le_log_merge.total_size(rotated_file_sets)
     else:
-      with open(input_file_path, 'r', encoding='utf-8', errors='ignore') as fo:
-        try:
-          for line_num, line in enumerate(fo):
-            if ' D ' in line:
-              debug_lin_num += 1
-
-            captured_messages = self.observer.notify(line)
-            if captured_messages is not None:
-              self.output.collection.extend(captured_messages)
-              break
-        except Exception as ex:
-          self.log.error('Failed at line=%s (%s): %s', line_num, line, ex)
-          raise
-
-    output_collection_file_path = (
-        _COLLECTION_OUTPUT_FILE_PATH.format(
-            self.observer_name=observer.__class__.__name__))
-    self.log.info(
-        'Output collection of captured message to %s...',
-        output_collection_file_path)
-    with open(output_collection_file_path, 'w') as fw:
-      for raw_data in observer.global_raw_data:
-        fw.write(f'{raw_data}\n')
+      total_bytes = None if is_device else os.path.getsize(input_file_path)
+
+    self.metrics = PipelineMetrics(total_bytes=total_bytes)
+    self.open_report_writers(output_file_path)
+    self.metrics.start_phase('search')
+    try:
+      if is_device:
+        if since or until:
+          self.log.warning('Time range is ignored for logcat from device!')
+
+        debug_lin_num = self._search_from_device(input_file_path)
+      elif rotated_file_sets:
+        if since or until:
+          self.log.warning('Time range is ignored for merged logs!')
+
+        self.log_source = None
+        debug_lin_num = self._search_raw_lines(
+            le_log_merge.iter_merged_lines(rotated_file_sets))
+      else:
+        debug_lin_num = self._search_from_file(input_file_path, since, until)
+    finally:
+      self.metrics.lap(Stage.READ)
+      self.metrics.end_phase('search')
+      utils.profile_checkpoint('search')
+      self.metrics.start_phase('report')
+      self.close_report_writers()
+      self.metrics.lap(Stage.REPORT)
+      self.metrics.end_phase('report')
+      utils.profile_checkpoint('report')
+      self.report_metrics()
+      self.observer.global_raw_data.close()
+      if self.pattern_profiler:
+        self.pattern_profiler.report(output_file_path)
+        self.pattern_profiler.uninstrument()
 
     # TODO: The original design doesn't take multiple observers situation
     #   into consideration and use the last observer from for loop which
     #   is buggy. We have to improve this problem soon.
     try:
-      observer.is_parsing_complete()
-      self.output.drop_num = observer.drop_num
+      self.observer.is_parsing_complete()
+      self.output.drop_num = self.observer.drop_num
       if not self.output.collection:
         raise errors.EmptyCollectionError()
     except Exception as ex:
@@ -130,21 +216,283 @@ class LogEventPublisher():
 
       raise ex
 
-    # Output error collection to file for further analysis
-    self.print_to_file(output_file_path)
+    self.report_section_stats()
+    if self.history_db_path:
+      self.record_history(input_file_path, started_at)
 
-  def print_to_file(self, output_file_path: str) -> None:
-    """Prints the result to given output file.
+    return self.output
 
-     Steps:
-      1. Gets the output title list for checking the output format.
-      2. Save the output results to a .txt file.
-      3. Save the output results to a .csv file.
+  def _search_from_device(self, input_file_path: str) -> int:
+    """Monitors logcat from device and analyzes the received log.
 
     Args:
-      output_file_path: File path to output result.
+      input_file_path: Device information in format
+        "device:<serial>[:<collected log path>]".
+
+    Returns:
+      Number of debug level lines.
+    """
+    line_num = 0
+    line = None
+    debug_lin_num = 0
+    # Read logcat directly from device
+    input_info = input_file_path.split(':')
+    device_serial = input_info[1].strip()
+    output_collected_log_path = f'/tmp/collected_log_from_{device_serial}.txt'
+    if len(input_info) > 2:
+      output_collected_log_path = input_info[2]
+
+    if device_serial.startswith('localhost_'):
+      device_serial = device_serial.replace('_', ':')
+      self.log.info('Device serial: %s', device_serial)
+
+    # Device support is imported on first use to keep the startup fast.
+    import bttc
+
+    dut = bttc.get(device_serial)
+    # Default logcat monitoring time is 1 hr.
+    logcat_monitoring_time_sec = int(
+        os.environ.get(_ENV_LOGCAT_MONITOR_TIME, 60 * 60))
+    time_info = timedelta(seconds=logcat_monitoring_time_sec)
+    self.log.info(
+        f'Monitoring logcat message for %s... '
+        f'(You could use environment "%s" to change this setting)',
+        time_info, _ENV_LOGCAT_MONITOR_TIME)
+    metrics = self.metrics
+    # Matched lines are referred by their offset in the collected log.
+    self.log_source = LogSource(output_collected_log_path)
+    try:
+      with open(output_collected_log_path, 'w', encoding='utf-8',
+                errors='ignore') as fw:
+
+        def collect_lines():
+          offset = 0
+          for line in dut.gm.follow_logcat_within(
+              time_sec=logcat_monitoring_time_sec,
+              logcat_args='-b system -b events -b main'):
+            fw.write(f'{line}\n')
+            metrics.lap(Stage.READ)
+            line_length = len(line.encode('utf-8', errors='ignore')) + 1
+            yield self.log_source.new_line(line, offset, line_length)
+            offset += line_length
+
+        for line_num, line in enumerate(self._reorder(collect_lines())):
+          metrics.count_line(line.length)
+          metrics.lap(Stage.DECODE)
+          if ' D ' in line:
+            debug_lin_num += 1
+
+          captured_messages = self.observer.notify(line)
+          metrics.lap(Stage.MATCH)
+          if captured_messages is not None:
+            # Reports materialize the matched lines from the collected log.
+            fw.flush()
+            self.publish_records(captured_messages)
+            metrics.lap(Stage.REPORT)
+            break
+    except KeyboardInterrupt as ex:
+      self.log.info('Stop monitoring logcat!')
+      self.log.info('Output collected logcat message into %s!', output_collected_log_path)
+    except Exception as ex:
+      self.log.error('Failed at line=%s (%s): %s', line_num, line, ex)
+      raise
+
+    return debug_lin_num
+
+  def _search_from_file(self, input_file_path: str,
+                        since: datetime | None = None,
+                        until: datetime | None = None) -> int:
+    """Analyzes the given log file.
+
+    Args:
+      input_file_path: Log file path to analyze.
+      since: Analyzes the lines from this time if given.
+      until: Analyzes the lines until this time plus search timeout if given.
+
+    Returns:
+      Number of debug level lines.
+    """
+    self.log_source = LogSource(input_file_path)
+    start_offset, end_offset = self.seek_time_range(since, until)
+    self.metrics.total_bytes = (
+        (end_offset if end_offset is not None else self.metrics.total_bytes)
+        - start_offset)
+    return self._search_raw_lines(
+        (self.log_source, offset, raw_line)
+        for offset, raw_line in self.log_source.iter_raw_lines(
+            start_offset, end_offset))
+
+  def _search_raw_lines(
+      self, raw_lines: Iterable[le_log_merge.RawLine]) -> int:
+    """Decodes the lines read from log sources and analyzes them.
+
+    Args:
+      raw_lines: Undecoded lines along with their source and offset.
+
+    Returns:
+      Number of debug level lines.
     """
+    line_num = 0
+    line = None
+    debug_lin_num = 0
+    metrics = self.metrics
+    try:
+      for line_num, (log_source, offset, raw_line) in enumerate(
+          self._reorder(raw_lines, line_of=lambda raw_line: raw_line[2])):
+        metrics.lap(Stage.READ)
+        metrics.count_line(len(raw_line))
+        line = log_source.decode_line(raw_line, offset)
+        metrics.lap(Stage.DECODE)
+        if ' D ' in line:
+          debug_lin_num += 1
+
+        captured_messages = self.observer.notify(line)
+        metrics.lap(Stage.MATCH)
+        if captured_messages is not None:
+          self.publish_records(captured_messages)
+          metrics.lap(Stage.REPORT)
+          break
+    except Exception as ex:
+      self.log.error('Failed at line=%s (%s): %s', line_num, line, ex)
+      raise
+
+    return debug_lin_num
+
+  def _reorder(self, lines: Iterable, line_of=lambda line: line) -> Iterable:
+    """Reorders the lines by timestamp if reorder window is set.
+
+    Args:
+      lines: Lines to analyze.
+      line_of: Function to get the log line from the item of `lines`.
+
+    Returns:
+      The lines in timestamp order within the reorder window.
+    """
+    if not self.reorder_window:
+      return lines
+
+    reorder_buffer = ReorderBuffer(self.reorder_window, line_of=line_of)
+
+    def reorder_lines():
+      try:
+        yield from reorder_buffer.reorder(lines)
+      finally:
+        self.log.info(
+            'Reordered %s inverted lines (%s beyond window %s)',
+            reorder_buffer.inversion_num, reorder_buffer.late_num,
+            self.reorder_window)
+
+    return reorder_lines()
+
+  def seek_time_range(
+      self, since: datetime | None,
+      until: datetime | None) -> tuple[int, int | None]:
+    """Seeks the byte range of log source covering the given time range.
+
+    The trial started before `until` may end within the search timeout of
+    observer. Thus the lines within the timeout after `until` are included.
+
+    Args:
+      since: Start time of the range. From the beginning if None.
+      until: End time of the range. Till the end if None.
+
+    Returns:
+      Tuple of the start offset and end offset. The end offset is None to
+      read till the end of file.
+    """
+    start_offset = self.log_source.seek_time(since) if since else 0
+    end_offset = None
+    if until:
+      margin_sec = getattr(
+          self.observer, '_search_timeout_sec',
+          constants.PATTERNS_SEARCH_TIMEOUT_SEC)
+      end_offset = self.log_source.seek_time(
+          until + timedelta(seconds=margin_sec))
+
+    if since or until:
+      self.log.info(
+          'Seek time range [%s, %s] to byte range [%s, %s)...',
+          since, until, start_offset,
+          end_offset if end_offset is not None else 'EOF')
+
+    return start_offset, end_offset
+
+  def publish_records(self, output_results: List[OutputResult]) -> None:
+    """Collects the completed records and streams them into reports."""
+    self.output.extend(output_results)
+    for report_writer in self.report_writers:
+      for output_result in output_results:
+        report_writer.write(output_result)
+
+    if not self.keep_raw_data:
+      for output_result in output_results:
+        output_result.raw_data = []
+
+  def open_report_writers(self, output_file_path: str) -> None:
+    """Opens the report writers of requested formats."""
+    self.report_writers = [
+        report_writer_cls(output_file_path)
+        for report_format, report_writer_cls in
+        _REPORT_FORMAT_2_WRITER_CLS.items()
+        if report_format in self.formats]
+
+  def close_report_writers(self) -> None:
+    """Writes the summary of reports and closes the report writers."""
+    drop_num = self.observer.drop_num if self.observer else 0
+    for report_writer in self.report_writers:
+      report_writer.close(drop_num=drop_num)
+
+    # A file shared by writers is listed once.
+    self.report_file_paths = list(dict.fromkeys(
+        report_writer.file_path for report_writer in self.report_writers
+        if os.path.isfile(getattr(report_writer, 'file_path', ''))))
+    self.report_writers = []
+
+  def report_metrics(self) -> None:
+    """Prints the metrics of the latest search and saves them if requested."""
+    self.metrics.finish()
+    self.metrics.hit_num = sum(
+        getattr(pattern, 'match_count', 0)
+        for pattern in self.observer.captured.log_pattern_dict.values())
+    self.metrics.record_num = len(self.output.collection)
+    self.log.info('Pipeline metrics:\n%s', self.metrics.summary())
+    if self.metrics_file_path:
+      self.log.info('Output pipeline metrics to %s...', self.metrics_file_path)
+      self.metrics.save_json(self.metrics_file_path)
+
+  def report_section_stats(self) -> None:
+    """Prints the statistics of the event and each report section."""
+    import le_section_stats
+
+    section_matrix = le_section_stats.SectionMatrix.from_trial_records(
+        le_report_export.to_trial_record(output_result)
+        for output_result in self.output.collection)
+    self.log.info(
+        'Section statistics:\n%s',
+        le_section_stats.format_table(
+            le_section_stats.calc_section_stats(section_matrix)))
+
+  def record_history(self, input_file_path: str,
+                     started_at: datetime) -> None:
+    """Records the run and its trials into the history database."""
+    import le_run_history
 
-    self.output.get_title_list()
-    self.output.save_output_messages(output_file_path)
-    self.output.save_output_messages_to_csv(output_file_path)
+    lea_config = getattr(self.observer, 'lea_config', None)
+    run_info = le_run_history.RunInfo(
+        task_num=getattr(self.observer, 'task_num', None),
+        headset_type=lea_config.headset_type.value if lea_config else None,
+        lea_config=dataclasses.asdict(lea_config) if lea_config else None,
+        observer=self.observer.__class__.__name__,
+        input_path=input_file_path,
+        input_hash=(
+            le_run_history.fingerprint_file(self.log_source.file_path)
+            if self.log_source else None),
+        build=os.environ.get(constants.ENV_BUILD),
+        found_num=len(self.output.collection),
+        drop_num=self.output.drop_num,
+        started_at=started_at)
+    with le_run_history.RunHistory(self.history_db_path) as run_history:
+      run_history.record_run(
+          run_info,
+          (le_report_export.to_trial_record(output_result)
+           for output_result in self.output.collection))
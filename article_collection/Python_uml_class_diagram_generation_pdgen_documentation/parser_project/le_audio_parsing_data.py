@@ -7,11 +7,13 @@ import dataclasses
 import datetime
 import enum
 import general_data
-import numpy as np
 import re
 from typing import List, Optional, Protocol
 import le_audio_constants
 import le_report_data
+from le_report_gen_utils import AudioPathSwitchCsvReportGen
+from le_report_gen_utils import AudioPathSwitchTxtReportGen
+from le_report_gen_utils import PairCsvReportGen
 from le_report_gen_utils import TxtReportGen, CsvReportGen
 import utils
 
@@ -80,6 +82,27 @@ TASK_TYPE_2_REPORT_SECT_MAP = {
 }
 
 
+def txt_report_gen_of(output_format: OutputFormat) -> TxtReportGen:
+  """Gets the generator of text report for records of the output format."""
+  if output_format in AudioPathSwitchCsvReportGen.SECTIONS:
+    return AudioPathSwitchTxtReportGen()
+
+  return TxtReportGen(
+      sections=TASK_TYPE_2_REPORT_SECT_MAP.get(output_format, ()))
+
+
+def csv_report_gen_of(output_format: OutputFormat) -> CsvReportGen:
+  """Gets the generator of CSV report for records of the output format."""
+  if output_format == OutputFormat.PAIR:
+    return PairCsvReportGen()
+
+  if output_format in AudioPathSwitchCsvReportGen.SECTIONS:
+    return AudioPathSwitchCsvReportGen(output_format)
+
+  return CsvReportGen(
+      sections=TASK_TYPE_2_REPORT_SECT_MAP.get(output_format, ()))
+
+
 @dataclasses.dataclass
 class CollectOutputResult():
   """Defines the output data collection of the log parser.
@@ -94,6 +117,46 @@ class CollectOutputResult():
   collection: List[OutputResult] = dataclasses.field(default_factory=list)
   output_messages: List[str] = dataclasses.field(default_factory=list)
   drop_num: int = 0
+  _title_2_records: dict[str, List[OutputResult]] = dataclasses.field(
+      default_factory=dict, init=False, repr=False)
+  _title_2_output_format: dict[str, OutputFormat] = dataclasses.field(
+      default_factory=dict, init=False, repr=False)
+  _indexed_num: int = dataclasses.field(default=0, init=False, repr=False)
+
+  def append(self, output_result: OutputResult) -> None:
+    """Appends a record into the collection and indexes it by title."""
+    self.collection.append(output_result)
+    self._update_title_index()
+
+  def extend(self, output_results: List[OutputResult]) -> None:
+    """Appends records into the collection and indexes them by title."""
+    self.collection.extend(output_results)
+    self._update_title_index()
+
+  def _update_title_index(self) -> None:
+    """Indexes the records appended to `collection` since the last update.
+
+    Records are expected to be appended only. If the collection is replaced or
+    shrunk from outside, the index is rebuilt from scratch.
+    """
+    if self._indexed_num > len(self.collection):
+      self._title_2_records.clear()
+      self._title_2_output_format.clear()
+      self._indexed_num = 0
+
+    for index in range(self._indexed_num, len(self.collection)):
+      output_result = self.collection[index]
+      self._title_2_records.setdefault(output_result.title, []).append(
+          output_result)
+      self._title_2_output_format.setdefault(
+          output_result.title, output_result.output_format)
+
+    self._indexed_num = len(self.collection)
+
+  def records_of(self, title: str) -> List[OutputResult]:
+    """Gets the records of given title in the order of being appended."""
+    self._update_title_index()
+    return self._title_2_records.get(title, [])
 
   def _event_time(self, datetime_obj):
     if not datetime_obj: return '?'
@@ -109,201 +172,198 @@ class CollectOutputResult():
   def text_file_format(self) -> List[str]:
     """Checks the output format used by the test results."""
 
-    for t in range(len(self.title_list)):
+    for title_info in self.title_list:
       self.output_messages.append('=' * 150)
-      self.output_messages.append('*' * 3 + self.title_list[t][0])
+      self.output_messages.append('*' * 3 + title_info[0])
       # Prepare success rate in title section
       # e.g.: Success Rate 60.0%, total 5, success 3
-      found_num = len(self.collection)
-      drop_num = self.drop_num
-      total_num = found_num + drop_num
-      success_rate = found_num / (found_num + drop_num) * 100
-      success_rate_message = (
-          f'=====> Success Rate {success_rate:.01f}%, total {total_num}'
-          f', success {found_num}')
-      self.output_messages.append(success_rate_message)
-
-      # Check output format
-      if self.title_list[t][1] == OutputFormat.PAIR:
-        # self.to_txt_file_format_for_pair_template(self.title_list[t][0])
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO:
-        # self.to_txt_file_format_for_audio_template(self.title_list[t][0])
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.GENERIC:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif (
-          self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_A
-          or self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_B
-          or self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_C
-      ):
-        self.to_txt_file_format_for_audio_path_switch_template(
-            self.title_list[t][0]
-        )
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_A2DP_2_LE_MEDIA_STREAM:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_HFP_2_LE_CONV_SW:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_CONV_SW_2_HFP:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_CONV_SW:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_MEDIA_STREAM_SW:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP_SW:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_TASK_12:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      elif self.title_list[t][1] ==  OutputFormat.AUDIO_PATH_SWITCH_D:
-        self.to_txt_report_by_output_type(self.title_list[t])
-      else:
-        self.to_txt_report_by_output_type(self.title_list[t])
-        # self.to_txt_file_format(self.title_list[t][0])
+      self.output_messages.append(
+          utils.success_rate_summary(len(self.collection), self.drop_num))
 
-  def get_title_list(self) -> List[str]:
-    """Gets a list of unique titles and the output format used."""
+      self.to_txt_report(title_info)
+
+  def to_txt_report(self, title_info: tuple[str, OutputFormat]) -> None:
+    """Outputs the records of given title into `output_messages`.
 
-    for output_result in self.collection:
-      self.title_list.append((output_result.title, output_result.output_format))
-    self.title_list = list(set(self.title_list))
+    Args:
+      title_info: Tuple of title and output format of the records.
+    """
+    # Check output format
+    if title_info[1] == OutputFormat.PAIR:
+      # self.to_txt_file_format_for_pair_template(title_info[0])
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO:
+      # self.to_txt_file_format_for_audio_template(title_info[0])
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.GENERIC:
+      self.to_txt_report_by_output_type(title_info)
+    elif (
+        title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_A
+        or title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_B
+        or title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_C
+    ):
+      self.to_txt_file_format_for_audio_path_switch_template(
+          title_info[0]
+      )
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_A2DP_2_LE_MEDIA_STREAM:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_HFP_2_LE_CONV_SW:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_CONV_SW_2_HFP:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_CONV_SW:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_MEDIA_STREAM_SW:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP_SW:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_TASK_12:
+      self.to_txt_report_by_output_type(title_info)
+    elif title_info[1] ==  OutputFormat.AUDIO_PATH_SWITCH_D:
+      self.to_txt_report_by_output_type(title_info)
+    else:
+      self.to_txt_report_by_output_type(title_info)
+      # self.to_txt_file_format(title_info[0])
+
+  def get_title_list(self) -> List[tuple[str, OutputFormat]]:
+    """Gets a list of unique titles and the output format used."""
+    self._update_title_index()
+    self.title_list = list(self._title_2_output_format.items())
+    return self.title_list
 
   def to_txt_file_format(self, title: str) -> None:
     """The txt output format of the captured log patterns."""
 
-    for i in range(len(self.collection)):
-      if self.collection[i].title == title:
-        self.output_messages.append('-' * 50 + '|' +
-                                    str(self.collection[i].trial) + '|' +
-                                    '-' * 50)
-        self.output_messages.append('')
-        for val in self.collection[i].raw_data:
-          self.output_messages.append(
-              val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
-              val.message)
-        self.output_messages.append('')
-        self.output_messages.append('Event initial time:' +
-                                    self.collection[i].initial_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('Event final ime:' +
-                                    self.collection[i].final_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
+    for output_result in self.records_of(title):
+      self.output_messages.append('-' * 50 + '|' +
+                                  str(output_result.trial) + '|' +
+                                  '-' * 50)
+      self.output_messages.append('')
+      for val in output_result.raw_data:
         self.output_messages.append(
-            'Event duration:' +
-            str(self.collection[i].initial_to_final_duration.total_seconds()) +
-            self.collection[i].final_result)
-        if self.collection[i].mac_address_list:
-          for item in range(len(self.collection[i].mac_address_list)):
-            self.output_messages.append(
-                'Mac address:' + self.collection[i].mac_address_list[item])
-        else:
-          self.output_messages.append('Mac address:' + '')
-        self.output_messages.append('')
+            val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
+            val.message)
+      self.output_messages.append('')
+      self.output_messages.append('Event initial time:' +
+                                  output_result.initial_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('Event final ime:' +
+                                  output_result.final_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Event duration:' +
+          str(output_result.initial_to_final_duration.total_seconds()) +
+          output_result.final_result)
+      if output_result.mac_address_list:
+        for mac_address in output_result.mac_address_list:
+          self.output_messages.append('Mac address:' + mac_address)
+      else:
+        self.output_messages.append('Mac address:' + '')
+      self.output_messages.append('')
 
   def to_txt_file_format_for_pair_template(self, title: str) -> None:
     """The txt output format of the captured log patterns for pair template."""
 
-    for output_result in self.collection:
-      if output_result.title == title:
-        self.output_messages.append('-' * 50 + '|' + str(output_result.trial) +
-                                    '|' + '-' * 50)
-        self.output_messages.append('')
-        for val in output_result.raw_data:
-          self.output_messages.append(
-              val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
-              val.messages)
-        self.output_messages.append('')
-        self.output_messages.append('--Section 1 - Dialog process time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.dialog_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.dialog_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append(
-            'Duration:' +
-            str(output_result.dialog_process_duration.total_seconds()))
-        self.output_messages.append('')
-        self.output_messages.append('--Event time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.event_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.event_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append(
-            'Duration:' +
-            str(output_result.start_to_end_duration.total_seconds()))
+    for output_result in self.records_of(title):
+      self.output_messages.append('-' * 50 + '|' + str(output_result.trial) +
+                                  '|' + '-' * 50)
+      self.output_messages.append('')
+      for val in output_result.raw_data:
         self.output_messages.append(
-            'Event duration - Dialog press duration:' +
-            str(output_result.final_duration.total_seconds()) +
-            output_result.event_end_result)
-        # if output_result.mac_address_list:
-          # for item in set(output_result.mac_address_list):
-            # self.output_messages.append('Mac address:' + item)
-        # else:
-          # self.output_messages.append('Mac address:')
-        self.output_messages.append('')
+            val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
+            val.messages)
+      self.output_messages.append('')
+      self.output_messages.append('--Section 1 - Dialog process time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.dialog_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.dialog_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' +
+          str(output_result.dialog_process_duration.total_seconds()))
+      self.output_messages.append('')
+      self.output_messages.append('--Event time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.event_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.event_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' +
+          str(output_result.start_to_end_duration.total_seconds()))
+      self.output_messages.append(
+          'Event duration - Dialog press duration:' +
+          str(output_result.final_duration.total_seconds()) +
+          output_result.event_end_result)
+      # if output_result.mac_address_list:
+        # for item in set(output_result.mac_address_list):
+          # self.output_messages.append('Mac address:' + item)
+      # else:
+        # self.output_messages.append('Mac address:')
+      self.output_messages.append('')
 
   def to_txt_file_format_for_audio_template(self, title: str) -> None:
     """The txt output format of the captured log patterns for audio template."""
 
-    for output_result in self.collection:
-      if output_result.title == title:
-
-        self.output_messages.append('-' * 50 + '|' + str(output_result.trial) +
-                                    '|' + '-' * 50)
-        self.output_messages.append('')
-        for val in output_result.raw_data:
-          self.output_messages.append(
-              val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
-              val.messages)
-        self.output_messages.append('')
-        self.output_messages.append('--Section 1 - CIG setup time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.cig_setup_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.cig_setup_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append(
-            'Duration:' + str(output_result.cig_setup_duration.total_seconds()))
-        self.output_messages.append('')
-        self.output_messages.append('--Section 2 - CIS setup time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.cis_setup_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.cis_setup_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append(
-            'Duration:' + str(output_result.cis_setup_duration.total_seconds()))
-        self.output_messages.append('')
-        self.output_messages.append('--Section 3 - ASCS setup time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.ascs_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.ascs_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append(
-            'Duration:' +
-            str(output_result.ascs_setup_duration.total_seconds()) +
-            output_result.ascs_end_result)
-        self.output_messages.append('')
-        self.output_messages.append('--Event time--')
-        self.output_messages.append('Start time:' +
-                                    output_result.event_start_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
-        self.output_messages.append('End time:' +
-                                    output_result.event_end_time.strftime(
-                                        le_audio_constants.DATETIME_FMT))
+    for output_result in self.records_of(title):
+
+      self.output_messages.append('-' * 50 + '|' + str(output_result.trial) +
+                                  '|' + '-' * 50)
+      self.output_messages.append('')
+      for val in output_result.raw_data:
         self.output_messages.append(
-            'Duration:' +
-            str(output_result.start_to_end_duration.total_seconds()) +
-            output_result.event_end_result)
-        self.output_messages.append('')
+            val.timestamp.strftime(le_audio_constants.DATETIME_FMT) +
+            val.messages)
+      self.output_messages.append('')
+      self.output_messages.append('--Section 1 - CIG setup time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.cig_setup_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.cig_setup_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' + str(output_result.cig_setup_duration.total_seconds()))
+      self.output_messages.append('')
+      self.output_messages.append('--Section 2 - CIS setup time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.cis_setup_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.cis_setup_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' + str(output_result.cis_setup_duration.total_seconds()))
+      self.output_messages.append('')
+      self.output_messages.append('--Section 3 - ASCS setup time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.ascs_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.ascs_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' +
+          str(output_result.ascs_setup_duration.total_seconds()) +
+          output_result.ascs_end_result)
+      self.output_messages.append('')
+      self.output_messages.append('--Event time--')
+      self.output_messages.append('Start time:' +
+                                  output_result.event_start_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append('End time:' +
+                                  output_result.event_end_time.strftime(
+                                      le_audio_constants.DATETIME_FMT))
+      self.output_messages.append(
+          'Duration:' +
+          str(output_result.start_to_end_duration.total_seconds()) +
+          output_result.event_end_result)
+      self.output_messages.append('')
 
   def to_csv_report_by_output_type(self, csv_writer, title_info):
     """Output collected information into report as CSV format."""
@@ -312,7 +372,8 @@ class CollectOutputResult():
     csv_report_gen.gen(
         csv_writer,
         report_raw_data=le_report_data.ReportRawData(
-            report_title=title_info[0], collection=self.collection))
+            report_title=title_info[0],
+            collection=self.records_of(title_info[0])))
 
   def to_txt_report_by_output_type(self, title_info):
     """Output collected information into report as text format."""
@@ -321,150 +382,16 @@ class CollectOutputResult():
     self.output_messages.extend(txt_report_gen.gen(
         report_raw_data=le_report_data.ReportRawData(
             report_title=title_info[0],
-            collection=self.collection,
+            collection=self.records_of(title_info[0]),
             drop_num=self.drop_num)))
 
   def to_txt_file_format_for_audio_path_switch_template(
       self, title: str
   ) -> None:
     """The txt output format of the captured log patterns for audio path switch template."""
-
-    for output_result in self.collection:
-      if output_result.title == title:
-        self.output_messages.append(
-            '-' * 50 + '|' + str(output_result.trial) + '|' + '-' * 50
-        )
-        self.output_messages.append('')
-        for val in output_result.raw_data:
-          self.output_messages.append(
-              val.timestamp.strftime(le_audio_constants.DATETIME_FMT)
-              + val.message
-          )
-        self.output_messages.append('')
-        self.output_messages.append('--Section 1 - Stop stream--')
-        self.output_messages.append(
-            'Start time:'
-            + output_result.event_start_time.strftime(
-                le_audio_constants.DATETIME_FMT
-            )
-        )
-        self.output_messages.append(
-            'End time:'
-            + output_result.audio_routing_start_time.strftime(
-                le_audio_constants.DATETIME_FMT
-            )
-        )
-        self.output_messages.append(
-            'Duration:'
-            + str(output_result.stream_stop_duration_in_sec)
-        )
-        self.output_messages.append('')
-        if output_result.stream_create_start_time:
-          self.output_messages.append('--Section 2 - Audio routing--')
-          self.output_messages.append(
-              'Start time:'
-              + output_result.audio_routing_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              )
-          )
-          self.output_messages.append(
-              'End time:'
-              + output_result.stream_create_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              )
-          )
-          self.output_messages.append(
-              'Duration:'
-              + str(output_result.audio_routing_duration_in_sec)
-          )
-          self.output_messages.append('')
-          self.output_messages.append('--Section 3 - Create audio stream--')
-          self.output_messages.append(
-              'Start time:'
-              + output_result.stream_create_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              )
-          )
-          if output_result.send_audio_start_time:
-            self.output_messages.append(
-                'End time:'
-                + output_result.send_audio_start_time.strftime(
-                    le_audio_constants.DATETIME_FMT
-                )
-            )
-            self.output_messages.append(
-                'Duration:'
-                + str(output_result.stream_create_duration_in_sec)
-            )
-            self.output_messages.append('')
-            self.output_messages.append('--Section 4 - Start audio data time--')
-            self.output_messages.append(
-                'Start time:'
-                + output_result.send_audio_start_time.strftime(
-                    le_audio_constants.DATETIME_FMT
-                )
-            )
-            self.output_messages.append(
-                'End time:'
-                + output_result.event_end_time.strftime(
-                    le_audio_constants.DATETIME_FMT
-                )
-            )
-            self.output_messages.append(
-                'Duration:'
-                + str(output_result.send_audio_duration_in_sec)
-            )
-            self.output_messages.append('')
-          else:
-            self.output_messages.append(
-                'End time:'
-                + output_result.event_end_time.strftime(
-                    le_audio_constants.DATETIME_FMT
-                )
-            )
-            self.output_messages.append(
-                'Duration:'
-                + str(output_result.stream_create_duration_in_sec)
-            )
-            self.output_messages.append('')
-        else:
-          self.output_messages.append('--Section 2 - Start audio data time--')
-          self.output_messages.append(
-              'Start time:'
-              + output_result.audio_routing_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              )
-          )
-          self.output_messages.append(
-              'End time:'
-              + output_result.event_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              )
-          )
-          self.output_messages.append(
-              'Duration:'
-              + str(output_result.send_audio_duration_in_sec)
-          )
-          self.output_messages.append('')
-        self.output_messages.append('--Event time--')
-        self.output_messages.append(
-            'Start time:'
-            + output_result.event_start_time.strftime(
-                le_audio_constants.DATETIME_FMT
-            )
-        )
-        self.output_messages.append(
-            'End time:'
-            + output_result.event_end_time.strftime(
-                le_audio_constants.DATETIME_FMT
-            )
-        )
-        self.output_messages.append(
-            'Duration:'
-            + str(output_result.start_to_end_duration_in_sec)
-            + output_result.event_end_result
-        )
-        self.output_messages.append('')
+    self.output_messages.extend(AudioPathSwitchTxtReportGen().gen(
+        report_raw_data=le_report_data.ReportRawData(
+            report_title=title, collection=self.records_of(title))))
 
   def save_output_messages(self, output_file_path: str) -> None:
     """Saves collected output messages to given file path.
@@ -488,49 +415,59 @@ class CollectOutputResult():
         encoding='utf-8') as csv_file:
 
       csv_writer = csv.writer(csv_file)
-      for t in range(len(self.title_list)):
+      for title_info in self.title_list:
         csv_writer.writerow(["'" + '=' * 150])
-        csv_writer.writerow(['*' * 3 + self.title_list[t][0]])
-        if self.title_list[t][1] == OutputFormat.PAIR:
-          self._save_output_messages_to_csv_for_pair_template(
-              self.title_list[t][0], csv_writer)
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_TASK_12:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-          # self._save_output_messages_to_csv_for_audio_template(
-          #     self.title_list[t][0], csv_writer)
-        elif self.title_list[t][1] == OutputFormat.GENERIC:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_C:
-          self._save_output_messages_to_csv_for_audio_path_switch_c_template(
-              self.title_list[t][0], csv_writer
-          )
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_A:
-          # self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-          self._save_output_messages_to_csv_for_audio_path_switch_a_template(
-              self.title_list[t][0], csv_writer
-          )
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_B:
-          self._save_output_messages_to_csv_for_audio_path_switch_b_template(
-              self.title_list[t][0], csv_writer
-          )
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_A2DP_2_LE_MEDIA_STREAM:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_HFP_2_LE_CONV_SW:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_CONV_SW_2_HFP:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_CONV_SW:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_MEDIA_STREAM_SW:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        elif self.title_list[t][1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP_SW:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
-        else:
-          self.to_csv_report_by_output_type(csv_writer, self.title_list[t])
+        csv_writer.writerow(['*' * 3 + title_info[0]])
+        self.to_csv_report(csv_writer, title_info)
+
+  def to_csv_report(
+      self, csv_writer: object, title_info: tuple[str, OutputFormat]) -> None:
+    """Outputs the records of given title into CSV report.
+
+    Args:
+      csv_writer: CSV writer object.
+      title_info: Tuple of title and output format of the records.
+    """
+    if title_info[1] == OutputFormat.PAIR:
+      self._save_output_messages_to_csv_for_pair_template(
+          title_info[0], csv_writer)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_TASK_12:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+      # self._save_output_messages_to_csv_for_audio_template(
+      #     title_info[0], csv_writer)
+    elif title_info[1] == OutputFormat.GENERIC:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_C:
+      self._save_output_messages_to_csv_for_audio_path_switch_c_template(
+          title_info[0], csv_writer
+      )
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_A:
+      # self.to_csv_report_by_output_type(csv_writer, title_info)
+      self._save_output_messages_to_csv_for_audio_path_switch_a_template(
+          title_info[0], csv_writer
+      )
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_B:
+      self._save_output_messages_to_csv_for_audio_path_switch_b_template(
+          title_info[0], csv_writer
+      )
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_A2DP_2_LE_MEDIA_STREAM:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_HFP_2_LE_CONV_SW:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_CONV_SW_2_HFP:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_CONV_SW:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_SPEAKER_2_LE_MEDIA_STREAM_SW:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    elif title_info[1] == OutputFormat.AUDIO_PATH_SWITCH_LE_MEDIA_STREAM_SW_2_A2DP_SW:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
+    else:
+      self.to_csv_report_by_output_type(csv_writer, title_info)
 
   def _save_output_messages_to_csv(
       self, title: str, csv_writer: object
@@ -545,17 +482,16 @@ class CollectOutputResult():
         'Round', 'Event initial time', 'Event final time', 'Event duration',
         'Mac address', 'Test result (Pass/Fail)'
     ])
-    for i in range(len(self.collection)):
-      if self.collection[i].title == title:
-        csv_writer.writerow([
-            str(self.collection[i].trial),
-            self.collection[i].initial_time.strftime(
-                le_audio_constants.DATETIME_FMT),
-            self.collection[i].final_time.strftime(
-                le_audio_constants.DATETIME_FMT),
-            self.collection[i].initial_to_final_duration.total_seconds(),
-            self.collection[i].mac_address_list, self.collection[i].final_result
-        ])
+    for output_result in self.records_of(title):
+      csv_writer.writerow([
+          str(output_result.trial),
+          output_result.initial_time.strftime(
+              le_audio_constants.DATETIME_FMT),
+          output_result.final_time.strftime(
+              le_audio_constants.DATETIME_FMT),
+          output_result.initial_to_final_duration.total_seconds(),
+          output_result.mac_address_list, output_result.final_result
+      ])
 
   def _save_output_messages_to_csv_for_pair_template(
       self, title: str, csv_writer: object) -> None:
@@ -565,38 +501,10 @@ class CollectOutputResult():
       title: The title of test result.
       csv_writer: CSV writer object.
     """
-    csv_writer.writerow([
-        'Time interval', '', 'Section 1 - Dialog process time', '', 'Event time'
-    ])
-    csv_writer.writerow([
-        'Round', 'Start time', 'End time', 'Duration', 'Start time', 'End time',
-        'Duration', 'Event duration - Dialog press duration', 'Test result (Pass/Fail)'
-    ])
-    try:
-      duration_list = []
-      for output_result in self.collection:
-        if output_result.title == title:
-          csv_writer.writerow([
-              str(output_result.trial),
-              output_result.dialog_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.dialog_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.dialog_process_duration.total_seconds(),
-              output_result.event_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.start_to_end_duration.total_seconds(),
-              output_result.final_duration.total_seconds(),
-              #output_result.mac_address_list,
-              output_result.event_end_result
-          ])
-          duration_list.append(output_result.start_to_end_duration.total_seconds())
-
-      utils.print_p95(duration_list)
-    except AttributeError:
-      csv_writer.writerow('')
+    PairCsvReportGen().gen(
+        csv_writer,
+        report_raw_data=le_report_data.ReportRawData(
+            report_title=title, collection=self.records_of(title)))
 
   def _save_output_messages_to_csv_for_audio_template(
       self, title: str, csv_writer: object) -> None:
@@ -619,178 +527,70 @@ class CollectOutputResult():
     ])
 
     try:
-      for output_result in self.collection:
-        if output_result.title == title:
-          csv_writer.writerow([
-              str(output_result.trial),
-              output_result.cig_setup_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.cig_setup_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.cig_setup_duration.total_seconds(),
-              output_result.cis_setup_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.cis_setup_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.cis_setup_duration.total_seconds(),
-              output_result.ascs_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.ascs_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.ascs_setup_duration.total_seconds(),
-              output_result.ascs_end_result,
-              output_result.event_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT),
-              output_result.start_to_end_duration.total_seconds(),
-              output_result.event_end_result,
-          ])
+      for output_result in self.records_of(title):
+        csv_writer.writerow([
+            str(output_result.trial),
+            output_result.cig_setup_start_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.cig_setup_end_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.cig_setup_duration.total_seconds(),
+            output_result.cis_setup_start_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.cis_setup_end_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.cis_setup_duration.total_seconds(),
+            output_result.ascs_start_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.ascs_end_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.ascs_setup_duration.total_seconds(),
+            output_result.ascs_end_result,
+            output_result.event_start_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.event_end_time.strftime(
+                le_audio_constants.DATETIME_FMT),
+            output_result.start_to_end_duration.total_seconds(),
+            output_result.event_end_result,
+        ])
     except AttributeError:
       csv_writer.writerow('')
 
   def _save_output_messages_to_csv_for_audio_path_switch_a_template(
-    self, title: str, csv_writer: object) -> None:
+      self, title: str, csv_writer: object) -> None:
     """Saves collected output messages to given file path.
 
     Args:
       title: The title of test result.
       csv_writer: CSV writer object.
     """
-    csv_writer.writerow(['Time interval', '', 'Section 1 - Stop stream time', '', '', 'Section 2 - Audio routing time', '', '', 'Section 3 - Create stream time', '', '', 'Section 4 - Start audio data time', '', 'Event time'])
-    csv_writer.writerow(['Round', 'Start time', 'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Test result (Pass/Fail)'])
-    try:
-      duration_list = []
-      for output_result in self.collection:
-        if output_result.title == title:
-          csv_writer.writerow([
-              str(output_result.trial),
-              output_result.event_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.audio_routing_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_stop_duration.total_seconds(),
-              output_result.audio_routing_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_create_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.audio_routing_duration.total_seconds(),
-              output_result.stream_create_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.send_audio_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_create_duration.total_seconds(),
-              output_result.send_audio_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.send_audio_duration.total_seconds(),
-              output_result.event_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.start_to_end_duration.total_seconds(),
-              output_result.event_end_result
-          ])
-          duration_list.append(output_result.start_to_end_duration.total_seconds())
-
-      utils.print_p95(duration_list)
-    except AttributeError:
-      csv_writer.writerow("")
+    AudioPathSwitchCsvReportGen(OutputFormat.AUDIO_PATH_SWITCH_A).gen(
+        csv_writer,
+        report_raw_data=le_report_data.ReportRawData(
+            report_title=title, collection=self.records_of(title)))
 
   def _save_output_messages_to_csv_for_audio_path_switch_b_template(
-    self, title: str, csv_writer: object) -> None:
+      self, title: str, csv_writer: object) -> None:
     """Saves collected output messages to given file path.
 
     Args:
       title: The title of test result.
       csv_writer: CSV writer object.
     """
-    csv_writer.writerow([
-        'Time interval', '', 'Section 1 - Stop stream time', '', '', 'Section 2 - Audio routing time', '', '',
-        'Section 3 - Create stream time', '', 'Event time'])
-    csv_writer.writerow([
-        'Round', 'Start time', 'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Start time',
-        'End time', 'Duration', 'Start time', 'End time', 'Duration', 'Test result (Pass/Fail)'])
-    try:
-      duration_list = []
-      for output_result in self.collection:
-        if output_result.title == title:
-          csv_writer.writerow([
-              str(output_result.trial),
-              output_result.event_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.audio_routing_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_stop_duration.total_seconds(),
-              output_result.audio_routing_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_create_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.audio_routing_duration.total_seconds(),
-              output_result.stream_create_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.stream_create_duration.total_seconds(),
-              output_result.event_start_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.event_end_time.strftime(le_audio_constants.DATETIME_FMT),
-              output_result.start_to_end_duration.total_seconds(),
-              output_result.event_end_result
-            ])
-          duration_list.append(output_result.start_to_end_duration.total_seconds())
-
-      utils.print_p95(duration_list)
-    except AttributeError:
-      csv_writer.writerow("")
+    AudioPathSwitchCsvReportGen(OutputFormat.AUDIO_PATH_SWITCH_B).gen(
+        csv_writer,
+        report_raw_data=le_report_data.ReportRawData(
+            report_title=title, collection=self.records_of(title)))
 
   def _save_output_messages_to_csv_for_audio_path_switch_c_template(
-      self, title: str, csv_writer: object
-  ) -> None:
+      self, title: str, csv_writer: object) -> None:
     """Saves collected output messages to given file path.
 
     Args:
       title: The title of test result.
       csv_writer: CSV writer object.
     """
-    csv_writer.writerow([
-        'Time interval',
-        '',
-        'Section 1 - Stop stream time',
-        '',
-        '',
-        'Section 2 - Start audio data time',
-        '',
-        'Event time',
-    ])
-    csv_writer.writerow([
-        'Round',
-        'Start time',
-        'End time',
-        'Duration',
-        'Start time',
-        'End time',
-        'Duration',
-        'Start time',
-        'End time',
-        'Duration',
-        'Test result (Pass/Fail)',
-    ])
-    try:
-      duration_list = []
-      for output_result in self.collection:
-        if output_result.title == title:
-          csv_writer.writerow([
-              str(output_result.trial),
-              output_result.event_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.audio_routing_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.stream_stop_duration.total_seconds(),
-              output_result.audio_routing_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.event_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.send_audio_duration.total_seconds(),
-              output_result.event_start_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.event_end_time.strftime(
-                  le_audio_constants.DATETIME_FMT
-              ),
-              output_result.start_to_end_duration.total_seconds(),
-              output_result.event_end_result,
-          ])
-          duration_list.append(output_result.start_to_end_duration.total_seconds())
-
-      utils.print_p95(duration_list)
-    except AttributeError as ex:
-      csv_writer.writerow('')
+    AudioPathSwitchCsvReportGen(OutputFormat.AUDIO_PATH_SWITCH_C).gen(
+        csv_writer,
+        report_raw_data=le_report_data.ReportRawData(
+            report_title=title, collection=self.records_of(title)))
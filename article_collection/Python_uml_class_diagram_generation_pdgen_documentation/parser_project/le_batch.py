@@ -0,0 +1,277 @@
+"""Batch mode to parse many logs by a pool of worker processes.
+
+Every (log, task) pair is a job run on the pool of warm workers (See
+`le_parser_jobs`). The reports of each pair are written into the output
+folder as "<log name>_task<task>.<format>", and the aggregated summary of all
+jobs with the section statistics of each task is written as
+"batch_summary.json".
+
+Only the files named like logs (See `DEFAULT_INPUT_PATTERNS` and `--pattern`)
+are taken from the input folders, and the files in the output folder are
+skipped.
+
+Usage:
+  $ python le_batch.py --inputs /data/nightly/ --tasks 1 --headset Sony \\
+      --output-dir /tmp/nightly_reports --workers 16
+  $ python le_batch.py --inputs '/data/nightly/*/logcat*.txt' --tasks 1,2 \\
+      --headset Largo --output-dir /tmp/reports --formats txt,npz
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import concurrent.futures
+import dataclasses
+import fnmatch
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from typing import Iterable
+
+import constants
+import le_parser_jobs
+import le_section_stats
+
+
+SUMMARY_FILE_NAME = 'batch_summary.json'
+# Name patterns of the logs taken from the input folders.
+DEFAULT_INPUT_PATTERNS = ('*.log', '*.txt', 'logcat*')
+
+
+@dataclasses.dataclass
+class BatchItem:
+  """Result of parsing a log by a task.
+
+  Attributes:
+    input_path: Path of the log.
+    task_num: Number of parser task.
+    result: Result of the job. Trial records are excluded.
+  """
+  input_path: str
+  task_num: int
+  result: le_parser_jobs.JobResult
+
+
+def find_inputs(inputs: list[str], recursive: bool = False,
+                patterns: Iterable[str] = DEFAULT_INPUT_PATTERNS,
+                exclude_dir: str | None = None) -> list[str]:
+  """Expands the folders and glob patterns into sorted log paths.
+
+  Args:
+    inputs: Folders, glob patterns or paths of logs.
+    recursive: True to search the folders and "**" recursively.
+    patterns: Name patterns of the logs taken from the folders, so other
+      files such as the truth sidecars of `le_logcat_generator` are skipped.
+      The files matched by the glob patterns of `inputs` are all taken.
+    exclude_dir: Folder whose files are skipped. e.g. The output folder
+      inside an input folder.
+  """
+  patterns = list(patterns)
+  exclude_prefix = (
+      os.path.join(os.path.abspath(exclude_dir), '') if exclude_dir else None)
+  input_paths = set()
+  for input_str in inputs:
+    is_dir = os.path.isdir(input_str)
+    if is_dir:
+      input_str = os.path.join(input_str, '**' if recursive else '*')
+
+    for path in glob.glob(input_str, recursive=recursive):
+      if not os.path.isfile(path) or (is_dir and not any(
+          fnmatch.fnmatch(os.path.basename(path), pattern)
+          for pattern in patterns)):
+        continue
+
+      path = os.path.abspath(path)
+      if not exclude_prefix or not path.startswith(exclude_prefix):
+        input_paths.add(path)
+
+  return sorted(input_paths)
+
+
+def output_names(input_paths: list[str]) -> dict[str, str]:
+  """Gets the unique output name of each log by its path under common folder."""
+  if not input_paths:
+    return {}
+
+  common_dir = os.path.commonpath(
+      [os.path.dirname(input_path) for input_path in input_paths])
+  return {
+      input_path: os.path.splitext(
+          os.path.relpath(input_path, common_dir))[0].replace(os.sep, '__')
+      for input_path in input_paths}
+
+
+def run_batch(input_paths: list[str], task_nums: list[int],
+              headset_type: constants.HeadsetType, output_dir: str,
+              formats: str | None = None,
+              worker_num: int | None = None) -> list[BatchItem]:
+  """Parses the logs by the tasks on the pool.
+
+  Returns:
+    Batch items in the order of completion. The trial records of all jobs
+    are aggregated by task into the section statistics of summary.
+  """
+  log = logging.getLogger(__name__)
+  os.makedirs(output_dir, exist_ok=True)
+  names = output_names(input_paths)
+  pool = le_parser_jobs.JobPool(
+      worker_num=worker_num, task_nums=task_nums,
+      headset_types=[headset_type])
+  items = []
+  try:
+    future_2_item = {}
+    for input_path in input_paths:
+      for task_num in task_nums:
+        job = le_parser_jobs.ParseJob(
+            input_path=input_path, task_num=task_num,
+            headset_type=headset_type.value,
+            output_path=os.path.join(
+                output_dir, f'{names[input_path]}_task{task_num}'),
+            formats=formats, return_records=True)
+        future_2_item[pool.submit(job)] = BatchItem(
+            input_path=input_path, task_num=task_num,
+            result=le_parser_jobs.JobResult())
+
+    for done_num, future in enumerate(
+        concurrent.futures.as_completed(future_2_item), 1):
+      item = future_2_item[future]
+      try:
+        item.result = future.result()
+      except Exception as ex:
+        item.result.error = f'{ex.__class__.__name__}: {ex}'
+
+      log.info(
+          '[%s/%s] %s task=%s: ok=%s; found=%s; %.03f sec%s', done_num,
+          len(future_2_item), names[item.input_path], item.task_num,
+          item.result.ok, item.result.found_num, item.result.elapsed_sec,
+          f'; error={item.result.error}' if item.result.error else '')
+      items.append(item)
+  finally:
+    pool.shutdown()
+
+  return items
+
+
+def summarize(items: list[BatchItem], elapsed_sec: float) -> dict:
+  """Aggregates the batch items into the summary.
+
+  The trial records of items are consumed and dropped from the results.
+  """
+  task_2_records = collections.defaultdict(list)
+  for item in items:
+    task_2_records[item.task_num].extend(item.result.records or [])
+    item.result.records = None
+
+  task_summaries = {}
+  for task_num in sorted({item.task_num for item in items}):
+    task_items = [item for item in items if item.task_num == task_num]
+    section_stats = le_section_stats.calc_section_stats(
+        le_section_stats.SectionMatrix.from_trial_records(
+            task_2_records[task_num]))
+    task_summaries[task_num] = {
+        'log_num': len(task_items),
+        'ok_num': sum(item.result.ok for item in task_items),
+        'found_num': sum(item.result.found_num for item in task_items),
+        'drop_num': sum(item.result.drop_num for item in task_items),
+        'section_stats': [
+            dataclasses.asdict(stats) for stats in section_stats
+            if stats.count],
+        'section_table': le_section_stats.format_table(section_stats),
+    }
+
+  return {
+      'elapsed_sec': elapsed_sec,
+      'job_num': len(items),
+      'failed_num': sum(not item.result.ok for item in items),
+      'tasks': task_summaries,
+      'jobs': [
+          {'input_path': item.input_path, 'task_num': item.task_num,
+           **dataclasses.asdict(item.result)}
+          for item in sorted(
+              items, key=lambda item: (item.input_path, item.task_num))],
+  }
+
+
+def add_pattern_arg(parser: argparse.ArgumentParser) -> None:
+  parser.add_argument(
+      '--pattern', type=str, default=','.join(DEFAULT_INPUT_PATTERNS),
+      help=(
+          'Comma separated name patterns of the logs in the input folders.'
+          f' (Default: {",".join(DEFAULT_INPUT_PATTERNS)})'))
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(
+      description='Parse many logs by a pool of worker processes.')
+  parser.add_argument(
+      '--inputs', nargs='+', required=True,
+      help='Folders or glob patterns of logs.')
+  parser.add_argument('--recursive', action='store_true',
+                      help='Search the folders and "**" recursively.')
+  parser.add_argument('--tasks', type=str, required=True,
+                      help='Comma separated task numbers.')
+  add_pattern_arg(parser)
+  parser.add_argument(
+      '--headset', type=str, default=os.getenv('HEADSET_TYPE'),
+      help='Headset type. (Or set environment variable HEADSET_TYPE)')
+  parser.add_argument('--output-dir', type=str, required=True)
+  parser.add_argument(
+      '--formats', type=str, default=None,
+      help=(
+          'Comma separated report formats. (Default:'
+          f' {",".join(constants.DEFAULT_REPORT_FORMATS)} or environment'
+          f' variable {constants.ENV_REPORT_FORMATS})'))
+  parser.add_argument(
+      '--workers', type=int, default=None,
+      help='Number of worker processes. (Default: CPU count)')
+  parser.add_argument(
+      '--verbose', action='store_true',
+      help='Output the log of parsing. Only the progress is logged if not.')
+  args = parser.parse_args()
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S',
+      # The parser logs each hit in INFO level which floods the batch output.
+      level=logging.DEBUG if args.verbose else logging.WARNING)
+  log = logging.getLogger(__name__)
+  log.setLevel(logging.INFO)
+  if not args.headset:
+    parser.error('--headset or environment variable HEADSET_TYPE is needed!')
+
+  input_paths = find_inputs(
+      args.inputs, recursive=args.recursive, patterns=args.pattern.split(','),
+      exclude_dir=args.output_dir)
+  if not input_paths:
+    parser.error(f'No log is found in {args.inputs}!')
+
+  task_nums = [int(task) for task in args.tasks.split(',')]
+  log.info('Parsing %s log(s) by task(s) %s...', len(input_paths), task_nums)
+  started_time = time.perf_counter()
+  items = run_batch(
+      input_paths, task_nums, constants.HeadsetType.from_str(args.headset),
+      args.output_dir, formats=args.formats, worker_num=args.workers)
+  summary = summarize(items, time.perf_counter() - started_time)
+
+  summary_path = os.path.join(args.output_dir, SUMMARY_FILE_NAME)
+  with open(summary_path, 'w') as fw:
+    json.dump(summary, fw, indent=2)
+
+  for task_num, task_summary in summary['tasks'].items():
+    print(
+        f'\n=== Task {task_num}: {task_summary["ok_num"]}/'
+        f'{task_summary["log_num"]} log(s) OK; {task_summary["found_num"]}'
+        f' trial(s) found; {task_summary["drop_num"]} dropped ===')
+    print(task_summary['section_table'])
+
+  print(
+      f'\n{summary["job_num"] - summary["failed_num"]}/{summary["job_num"]}'
+      f' job(s) OK in {summary["elapsed_sec"]:.1f} sec. Summary: '
+      f'{summary_path}')
+  return 1 if summary['failed_num'] else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
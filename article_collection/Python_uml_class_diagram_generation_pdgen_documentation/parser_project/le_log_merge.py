@@ -0,0 +1,134 @@
+"""Module to merge multiple logcat files into one stream ordered by time.
+
+Logcat of each buffer (`-b system -b events -b main`) may be collected into
+separate files, and each of them may be rotated into `logcat`, `logcat.1`,
+..., `logcat.N` where `logcat.N` is the oldest. The rotated files of the same
+log are chained from the oldest to the newest as one stream, then the streams
+are merged lazily by a heap on the timestamp of lines.
+
+Input spec of merged logs is "merge:<path>[,<path>...]".
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import re
+from typing import Iterable, Iterator, Sequence
+
+from le_log_reader import LogSource
+
+
+MERGE_INPUT_PREFIX = 'merge:'
+# Line read from the log source: (source, byte offset, undecoded line)
+RawLine = tuple[LogSource, int, bytes]
+# Fixed width timestamp at the beginning of logcat line. It is compared in
+# bytes directly which keeps the order of time within a year.
+_LINE_TIME_PATTERN = re.compile(rb'\d\d-\d\d \d\d:\d\d:\d\d\.\d+')
+
+
+def is_merge_input(input_file_path: str) -> bool:
+  return input_file_path.startswith(MERGE_INPUT_PREFIX)
+
+
+def parse_merge_input(input_file_path: str) -> list[list[str]]:
+  """Parses the merge input spec into rotated file sets.
+
+  Args:
+    input_file_path: Input spec in format "merge:<path>[,<path>...]".
+
+  Returns:
+    List of rotated file sets. Each set is ordered from the oldest file.
+
+  Raises:
+    Exception: The given log file does not exist.
+  """
+  file_paths = [
+      file_path.strip()
+      for file_path in input_file_path[len(MERGE_INPUT_PREFIX):].split(',')
+      if file_path.strip()]
+  for file_path in file_paths:
+    if not os.path.isfile(file_path):
+      raise Exception(f'Log file={file_path} does not exist!')
+
+  return [rotated_files(file_path) for file_path in file_paths]
+
+
+def rotated_files(file_path: str) -> list[str]:
+  """Gets the rotated files of given log ordered from the oldest to newest.
+
+  The rotated files are named as "<file_path>.<N>" and the larger number is
+  the older one. e.g. ["logcat.10", "logcat.2", "logcat.1", "logcat"]
+  """
+  folder = os.path.dirname(file_path) or '.'
+  rotation_pattern = re.compile(
+      re.escape(os.path.basename(file_path)) + r'\.(\d+)$')
+  rotated_file_names = sorted(
+      ((int(mth.group(1)), file_name)
+       for file_name in os.listdir(folder)
+       if (mth := rotation_pattern.match(file_name))),
+      reverse=True)
+  return [
+      os.path.join(os.path.dirname(file_path), file_name)
+      for _, file_name in rotated_file_names] + [file_path]
+
+
+def iter_rotated_lines(file_paths: Sequence[str]) -> Iterator[RawLine]:
+  """Iterates the lines of rotated files one after another."""
+  for file_path in file_paths:
+    log_source = LogSource(file_path)
+    for offset, raw_line in log_source.iter_raw_lines():
+      yield log_source, offset, raw_line
+
+
+def merge_by_time(streams: Sequence[Iterator[RawLine]]) -> Iterator[RawLine]:
+  """Merges the streams into one stream ordered by the timestamp of lines.
+
+  Only the head line of each stream is kept in the heap. Lines without
+  timestamp follow the previous line of their stream. A stream in local
+  disorder doesn't break the merge: its lines keep their own order and are
+  interleaved with other streams by the timestamp of each line.
+
+  Args:
+    streams: Streams of lines. Each is expected to be ordered by time.
+
+  Yields:
+    Lines of all streams ordered by time. Lines of the same timestamp are
+    ordered by the index of their stream.
+  """
+  last_keys = [b''] * len(streams)
+
+  def next_entry(index: int) -> tuple[bytes, int, RawLine] | None:
+    raw_line = next(streams[index], None)
+    if raw_line is None:
+      return None
+
+    mth = _LINE_TIME_PATTERN.match(raw_line[2])
+    if mth:
+      last_keys[index] = mth.group(0)
+
+    return last_keys[index], index, raw_line
+
+  heap = [
+      entry for entry in map(next_entry, range(len(streams))) if entry]
+  heapq.heapify(heap)
+  while heap:
+    _, index, raw_line = heap[0]
+    yield raw_line
+    entry = next_entry(index)
+    if entry:
+      heapq.heapreplace(heap, entry)
+    else:
+      heapq.heappop(heap)
+
+
+def iter_merged_lines(
+    rotated_file_sets: Iterable[Sequence[str]]) -> Iterator[RawLine]:
+  """Iterates the lines of given rotated file sets merged by time."""
+  return merge_by_time([
+      iter_rotated_lines(file_paths) for file_paths in rotated_file_sets])
+
+
+def total_size(rotated_file_sets: Iterable[Sequence[str]]) -> int:
+  return sum(
+      os.path.getsize(file_path)
+      for file_paths in rotated_file_sets for file_path in file_paths)
@@ -0,0 +1,286 @@
+"""Module to read log lines along with their byte offset in the source.
+
+The lines are read in binary and decoded one by one. Each decoded line is a
+`SourceLine` which remembers its source and byte offset. Thus the matched line
+could be kept as `general_data.LogRef` and be materialized later by `mmap`.
+
+For logs sorted by time, `LogSource.seek_time` binary searches the offset of
+given time so that only the lines in a time range are read.
+"""
+from __future__ import annotations
+
+import datetime
+import mmap
+import os
+import re
+from typing import Iterator
+
+import general_data
+import le_audio_constants
+
+
+Log = general_data.Log
+LogRef = general_data.LogRef
+# Timestamp at the beginning of logcat line. e.g. "02-28 23:59:00.005"
+_LINE_TIME_PATTERN = re.compile(rb'(\d\d-\d\d \d\d:\d\d:\d\d\.\d+)')
+
+
+def parse_log_time(log_time: str) -> datetime.datetime:
+  """Parses the logcat timestamp in the same way as `le_patterns.REPattern`.
+
+  Args:
+    log_time: Timestamp in format "MM-DD HH:MM:SS[.ffffff]".
+
+  Returns:
+    The parsed timestamp. "02-29" is treated as "02-28" since the log has
+    no year.
+  """
+  if '.' not in log_time:
+    log_time += '.0'
+
+  if log_time.startswith('02-29'):
+    return datetime.datetime.strptime(
+        log_time[6:], le_audio_constants.TIME_FMT).replace(month=2, day=28)
+
+  return datetime.datetime.strptime(log_time, le_audio_constants.DATETIME_FMT)
+
+
+class SourceLine(str):
+  """Decoded log line which remembers where it comes from.
+
+  Attributes:
+    source: Source of the line.
+    offset: Byte offset of the line in the source.
+    length: Length of the line in bytes including the line break.
+  """
+
+  source: LogSource
+  offset: int
+  length: int
+
+
+class LogSource:
+  """Log file which supports random access by byte offset through mmap.
+
+  The file is mapped lazily at the first read and is re-mapped if the read
+  reaches beyond the mapped size. (e.g. the collected logcat is still being
+  written)
+
+  Attributes:
+    file_path: Path of the log file.
+  """
+
+  def __init__(self, file_path: str):
+    self.file_path = file_path
+    self._mmap: mmap.mmap | None = None
+
+  def _map(self, size: int) -> mmap.mmap:
+    if self._mmap is None or len(self._mmap) < size:
+      self.close()
+      with open(self.file_path, 'rb') as fo:
+        self._mmap = mmap.mmap(fo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return self._mmap
+
+  def read(self, offset: int, length: int) -> bytes:
+    if length <= 0:
+      return b''
+
+    return self._map(offset + length)[offset:offset + length]
+
+  def close(self) -> None:
+    if self._mmap is not None:
+      self._mmap.close()
+      self._mmap = None
+
+  def new_line(self, line: str, offset: int, length: int) -> SourceLine:
+    """Wraps the decoded line located at `offset` of this source."""
+    source_line = SourceLine(line)
+    source_line.source = self
+    source_line.offset = offset
+    source_line.length = length
+    return source_line
+
+  def size(self) -> int:
+    """Gets the size of the file in bytes."""
+    return os.path.getsize(self.file_path)
+
+  def _probe_time(
+      self, offset: int) -> tuple[int, datetime.datetime | None]:
+    """Finds the first line with timestamp starting at or after `offset`.
+
+    Returns:
+      Tuple of the line offset and its timestamp. The timestamp is None if
+      no such line until the end of file.
+    """
+    data = self._map(self.size())
+    size = len(data)
+    if offset > 0:
+      line_break = data.find(b'\n', offset - 1)
+      offset = size if line_break < 0 else line_break + 1
+
+    while offset < size:
+      line_end = data.find(b'\n', offset)
+      line_end = size if line_end < 0 else line_end + 1
+      mth = _LINE_TIME_PATTERN.match(data, offset, line_end)
+      if mth:
+        try:
+          return offset, parse_log_time(mth.group(1).decode('ascii'))
+        except ValueError:
+          pass
+
+      offset = line_end
+
+    return size, None
+
+  def seek_time(self, target_time: datetime.datetime) -> int:
+    """Binary searches the first line whose timestamp is not before given time.
+
+    The log must be sorted by time. Lines without timestamp (e.g. "---------
+    beginning of main") are skipped while probing.
+
+    Args:
+      target_time: The time to seek.
+
+    Returns:
+      Byte offset of the found line. Size of file if all lines are before
+      `target_time`.
+    """
+    if self.size() == 0:
+      return 0
+
+    low, high = 0, self.size()
+    while low < high:
+      middle = (low + high) // 2
+      line_offset, line_time = self._probe_time(middle)
+      if line_time is None or line_time >= target_time:
+        high = middle
+      else:
+        low = line_offset + 1
+
+    return self._probe_time(low)[0]
+
+  def iter_raw_lines(
+      self, start_offset: int = 0,
+      end_offset: int | None = None) -> Iterator[tuple[int, bytes]]:
+    """Iterates the undecoded lines of the file along with their offset.
+
+    Args:
+      start_offset: Offset of the first line to read.
+      end_offset: Stops before the line starting at or after this offset.
+        Reads until the end of file if None.
+    """
+    offset = start_offset
+    with open(self.file_path, 'rb') as fo:
+      fo.seek(start_offset)
+      for raw_line in fo:
+        if end_offset is not None and offset >= end_offset:
+          break
+
+        yield offset, raw_line
+        offset += len(raw_line)
+
+  def decode_line(self, raw_line: bytes, offset: int) -> SourceLine:
+    """Decodes the line read at `offset` of this source.
+
+    Undecodable bytes are ignored and "\\r\\n" is normalized as "\\n".
+    """
+    line = raw_line.decode('utf-8', errors='ignore')
+    if line.endswith('\r\n'):
+      line = line[:-2] + '\n'
+
+    return self.new_line(line, offset, len(raw_line))
+
+  def iter_lines(self) -> Iterator[SourceLine]:
+    """Iterates the decoded lines of the file from the beginning."""
+    for offset, raw_line in self.iter_raw_lines():
+      yield self.decode_line(raw_line, offset)
+
+  def __deepcopy__(self, memo) -> LogSource:
+    # The mapped file is shared by the records referring to it.
+    return self
+
+  def __repr__(self) -> str:
+    return f'LogSource({self.file_path!r})'
+
+
+def to_log(timestamp, mth: re.Match[str]) -> Log | LogRef:
+  """Keeps the matched line as reference if it is read from `LogSource`.
+
+  Args:
+    timestamp: Timestamp of the matched line.
+    mth: Match object with group "log" holding the message.
+
+  Returns:
+    `LogRef` if the matched line is `SourceLine`. Otherwise `Log` holding the
+    message.
+  """
+  line = mth.string
+  if not isinstance(line, SourceLine):
+    return Log(timestamp=timestamp, message=mth.group('log'))
+
+  return LogRef(
+      timestamp, line.source, line.offset, line.length,
+      message_start=mth.start('log'), message_end=mth.end('log'))
+
+
+def trial_log_windows(
+    output_result: general_data.OutputResult
+) -> list[tuple[LogSource, list[str]]]:
+  """Extracts the log lines between the first and last hit of the trial in
+  each source.
+
+  The hits of a trial parsed from merged input (See `le_log_merge`) may be
+  read from different files and rotated parts, so each source has its own
+  window.
+
+  Args:
+    output_result: The trial record.
+
+  Returns:
+    Source and its log lines from the first matched line to the last matched
+    line of the trial in the source, including the lines not matching any
+    pattern. Sources are ordered by their first hit in the trial. Empty list
+    if the matched lines are not kept as `LogRef`.
+  """
+  source_2_refs: dict[LogSource, list[LogRef]] = {}
+  for val in output_result.raw_data:
+    if isinstance(val, LogRef):
+      source_2_refs.setdefault(val.source, []).append(val)
+
+  windows = []
+  for source, log_refs in source_2_refs.items():
+    start_offset = min(log_ref.offset for log_ref in log_refs)
+    end_offset = max(log_ref.end_offset for log_ref in log_refs)
+    windows.append((
+        source,
+        source.read(start_offset, end_offset - start_offset).decode(
+            'utf-8', errors='ignore').splitlines()))
+
+  return windows
+
+
+def trial_log_window(
+    output_result: general_data.OutputResult) -> list[str]:
+  """Extracts all log lines between the first and last hit of the trial.
+
+  Args:
+    output_result: The trial record.
+
+  Returns:
+    Log lines from the first matched line to the last matched line of the
+    trial, including the lines not matching any pattern. Empty list if the
+    matched lines are not kept as `LogRef`.
+
+  Raises:
+    Exception: The hits of the trial are read from more than one source. Use
+      `trial_log_windows` instead.
+  """
+  windows = trial_log_windows(output_result)
+  if len(windows) > 1:
+    raise Exception(
+        f'Hits of trial#{output_result.trial} are in {len(windows)} sources'
+        f' {[source.file_path for source, _ in windows]}! Use'
+        ' trial_log_windows() instead.')
+
+  return windows[0][1] if windows else []
@@ -0,0 +1,623 @@
+"""Synthetic logcat generator for load and accuracy testing of the parser.
+
+The lines hitting the patterns are synthesized from the regular expressions of
+observer's patterns. Thus any observer could be used to generate the logcat of
+its test without real device log. The ground truth of each generated trial is
+written as JSON Lines alongside the logcat.
+
+Sample usage:
+  $ python le_logcat_generator.py \\
+      --observer observer.le_synthetic_trial_test:SyntheticTrialPattern \\
+      --size 2G --noise-ratio 0.99 --drop-ratio 0.05 \\
+      --output /tmp/synthetic_logcat.txt
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import importlib
+import json
+import logging
+import random
+import re
+import time
+from typing import Any, Iterator
+
+import constants
+import general_data
+
+try:
+  from re import _parser as sre_parse  # Python >= 3.11
+except ImportError:
+  import sre_parse
+
+
+_PatternEnum = general_data.PatternEnum
+
+# Year used to build timestamps. It is a leap year so "02-29" is valid.
+_YEAR = 2024
+# Sentinel to locate the "time" group in the synthesized line.
+_TIME_SENTINEL = '\x00'
+# Number of synthesized variants of each regular expression.
+_VARIANT_NUM = 4
+# Number of noise line templates.
+_NOISE_POOL_SIZE = 256
+# States of pattern which are not part of a normal trial.
+_NON_TRIAL_STATES = frozenset({
+    _PatternEnum.LOG_ERROR, _PatternEnum.FOOL_PROOF, _PatternEnum.RESET,
+    _PatternEnum.PREFIX_DROP})
+_NOISE_TAGS = (
+    'ActivityManager', 'WindowManager', 'bt_btif', 'bt_stack', 'AudioFlinger',
+    'BluetoothAdapter', 'chatty', 'PackageManager', 'ConnectivityService',
+    'SurfaceFlinger', 'wpa_supplicant', 'InputDispatcher', 'audio_hw_primary')
+_NOISE_WORDS = (
+    'update', 'state', 'config', 'session', 'handle', 'binder', 'callback',
+    'queue', 'timer', 'buffer', 'service', 'request', 'result', 'vsync',
+    'frame', 'thermal', 'wakelock', 'scan', 'policy', 'route')
+
+
+class TrialKind(constants.StrEnum):
+  """Kind of generated trial in ground truth."""
+  # Complete trial from start pattern to end pattern.
+  PASS = 'pass'
+  # Start pattern hit again before the end pattern.
+  DROP = 'drop'
+  # End pattern is missing within the search timeout.
+  TIMEOUT = 'timeout'
+  # Reset signal hit before the end pattern.
+  RESET = 'reset'
+
+
+@dataclasses.dataclass
+class GeneratorConfig:
+  """Configuration of synthetic logcat.
+
+  Attributes:
+    trial_num: Number of trials to generate. No limit if None.
+    target_bytes: Stops after writing this size of logcat. No limit if None.
+    line_rate: Number of log lines per second in log time. The noise lines
+      fill the gaps between pattern lines at this rate.
+    noise_ratio: Minimum ratio of noise lines among all lines. Idle noise is
+      added between trials to reach it.
+    duration_mean_sec: Mean of trial duration. Default is 70% of pass criteria.
+    duration_stddev_ratio: Standard deviation of trial duration relative to
+      the mean.
+    drop_ratio: Ratio of trials dropped by hitting start pattern twice.
+    timeout_ratio: Ratio of trials without end pattern within search timeout.
+    reset_ratio: Ratio of trials interrupted by reset signal.
+    optional_ratio: Probability of emitting each optional pattern.
+    out_of_order_ratio: Probability of swapping two adjacent lines, which
+      happens when multiple logcat buffers are interleaved.
+    start_time: Log time of the first line in "MM-DD HH:MM:SS".
+    headset_type: Headset type to apply per-headset pattern variants.
+    seed: Seed of random generator to make the output repeatable.
+  """
+  trial_num: int | None = 100
+  target_bytes: int | None = None
+  line_rate: float = 200.0
+  noise_ratio: float = 0.95
+  duration_mean_sec: float | None = None
+  duration_stddev_ratio: float = 0.15
+  drop_ratio: float = 0.0
+  timeout_ratio: float = 0.0
+  reset_ratio: float = 0.0
+  optional_ratio: float = 0.5
+  out_of_order_ratio: float = 0.0
+  start_time: str = '01-01 08:00:00'
+  headset_type: constants.HeadsetType | None = None
+  seed: int = 0
+
+
+@dataclasses.dataclass
+class TrialTruth:
+  """Ground truth of a generated trial."""
+  trial: int
+  kind: TrialKind
+  start_time: str
+  end_time: str | None
+  duration_sec: float | None
+
+  def to_dict(self) -> dict[str, Any]:
+    return dataclasses.asdict(self)
+
+
+class RegexSynthesizer:
+  """Synthesizes strings matching the given regular expression.
+
+  The group named "time" is left as placeholder so the timestamp could be
+  filled in for each line.
+  """
+
+  def __init__(self, rng: random.Random):
+    self._rng = rng
+    self._group_texts: dict[int, str] = {}
+    self._time_group: int | None = None
+
+  def synthesize(self, regex: re.Pattern[str]) -> tuple[str, str]:
+    """Synthesizes a line matching `regex`.
+
+    Returns:
+      Tuple of text before and after the "time" group.
+    """
+    parsed = sre_parse.parse(regex.pattern, regex.flags)
+    state = getattr(parsed, 'state', None) or parsed.pattern
+    self._time_group = state.groupdict.get('time')
+    self._group_texts = {}
+    text = self._gen(parsed)
+    if _TIME_SENTINEL not in text:
+      # Leads the line with timestamp as logcat does.
+      return '', ' ' + text
+
+    prefix, _, suffix = text.partition(_TIME_SENTINEL)
+    return prefix, suffix
+
+  def _gen(self, items) -> str:
+    return ''.join(self._gen_item(op, av) for op, av in items)
+
+  def _gen_item(self, op, av) -> str:
+    if op == sre_parse.LITERAL:
+      return chr(av)
+    if op == sre_parse.NOT_LITERAL:
+      return 'x' if chr(av) != 'x' else 'y'
+    if op == sre_parse.ANY:
+      return 'x'
+    if op == sre_parse.IN:
+      return self._gen_in(av)
+    if op == sre_parse.BRANCH:
+      return self._gen(self._rng.choice(av[1]))
+    if op == sre_parse.SUBPATTERN:
+      group, _, _, sub_pattern = av
+      if group is not None and group == self._time_group:
+        return _TIME_SENTINEL
+
+      text = self._gen(sub_pattern)
+      if group is not None:
+        self._group_texts[group] = text
+      return text
+    if op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT,
+              getattr(sre_parse, 'POSSESSIVE_REPEAT', None)):
+      min_num, max_num, sub_pattern = av
+      if (min_num == 0 and max_num == sre_parse.MAXREPEAT and
+          list(sub_pattern) == [(sre_parse.ANY, None)]):
+        # e.g. ".*" between tokens.
+        return ' '
+
+      repeat_num = min_num if min_num else min(max_num, 1)
+      return ''.join(self._gen(sub_pattern) for _ in range(repeat_num))
+    if op == sre_parse.GROUPREF:
+      return self._group_texts.get(av, '')
+    if op == getattr(sre_parse, 'ATOMIC_GROUP', None):
+      return self._gen(av)
+    # Anchors and look-around assertions don't consume characters.
+    return ''
+
+  def _gen_in(self, set_items) -> str:
+    if set_items and set_items[0][0] == sre_parse.NEGATE:
+      for char in 'xa0_- .:':
+        if not self._in_set(char, set_items[1:]):
+          return char
+      raise Exception(f'Failed to synthesize negated set {set_items}!')
+
+    op, av = self._rng.choice(set_items)
+    if op == sre_parse.LITERAL:
+      return chr(av)
+    if op == sre_parse.RANGE:
+      return chr(self._rng.randint(*av))
+    if op == sre_parse.CATEGORY:
+      return self._gen_category(av)
+    raise Exception(f'Unsupported set item {op}!')
+
+  def _gen_category(self, category) -> str:
+    if category == sre_parse.CATEGORY_DIGIT:
+      return str(self._rng.randint(0, 9))
+    if category == sre_parse.CATEGORY_SPACE:
+      return ' '
+    if category == sre_parse.CATEGORY_WORD:
+      return self._rng.choice('abcdef0123456789')
+    if category == sre_parse.CATEGORY_NOT_WORD:
+      return '-'
+    return 'x'
+
+  @staticmethod
+  def _in_set(char: str, set_items) -> bool:
+    code = ord(char)
+    for op, av in set_items:
+      if op == sre_parse.LITERAL and code == av:
+        return True
+      if op == sre_parse.RANGE and av[0] <= code <= av[1]:
+        return True
+      if op == sre_parse.CATEGORY:
+        if av == sre_parse.CATEGORY_DIGIT and char.isdigit():
+          return True
+        if av == sre_parse.CATEGORY_SPACE and char.isspace():
+          return True
+        if av == sre_parse.CATEGORY_WORD and (char.isalnum() or char == '_'):
+          return True
+        if av == sre_parse.CATEGORY_NOT_DIGIT and not char.isdigit():
+          return True
+        if av == sre_parse.CATEGORY_NOT_SPACE and not char.isspace():
+          return True
+        if av == sre_parse.CATEGORY_NOT_WORD and not (
+            char.isalnum() or char == '_'):
+          return True
+    return False
+
+
+class _Clock:
+  """Log time clock which formats timestamps in logcat format quickly."""
+
+  def __init__(self, start_time: datetime.datetime):
+    self.now = start_time
+    self._cached_second: datetime.datetime | None = None
+    self._cached_prefix = ''
+
+  def timestamp(self, time_obj: datetime.datetime | None = None) -> str:
+    time_obj = time_obj or self.now
+    second = time_obj.replace(microsecond=0)
+    if second != self._cached_second:
+      self._cached_second = second
+      self._cached_prefix = second.strftime('%m-%d %H:%M:%S')
+
+    return f'{self._cached_prefix}.{time_obj.microsecond // 1000:03d}'
+
+
+def _truncate_ms(time_obj: datetime.datetime) -> datetime.datetime:
+  return time_obj.replace(microsecond=time_obj.microsecond // 1000 * 1000)
+
+
+class LogcatGenerator:
+  """Generator of synthetic logcat from the patterns of an observer.
+
+  Attributes:
+    config: Configuration of the generated logcat.
+    log_pattern_dict: Patterns keyed by state. The trial emits the start
+      pattern, the other patterns in order and then the end pattern.
+    search_timeout_sec: Search timeout of the observer. Timeout trials leave
+      the end pattern missing beyond it.
+    truths: Ground truth of generated trials.
+  """
+
+  def __init__(self, log_pattern_dict: dict[Any, general_data.Pattern],
+               config: GeneratorConfig | None = None,
+               event_pass_criteria_sec: float | None = None,
+               search_timeout_sec: float = constants.PATTERNS_SEARCH_TIMEOUT_SEC):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.config = config or GeneratorConfig()
+    self.log_pattern_dict = log_pattern_dict
+    self.search_timeout_sec = search_timeout_sec
+    self.truths: list[TrialTruth] = []
+    self._rng = random.Random(self.config.seed)
+    self._duration_mean_sec = (
+        self.config.duration_mean_sec or
+        (event_pass_criteria_sec or 5.0) * 0.7)
+    self._state_2_variants = {
+        state: self._synthesize_variants(pattern)
+        for state, pattern in log_pattern_dict.items()
+        if not isinstance(pattern, str)}
+    self._start_states = [
+        state for state in self._state_2_variants
+        if state in {_PatternEnum.START, _PatternEnum.OPTIONAL_START}]
+    self._end_states = [
+        state for state in self._state_2_variants
+        if state == _PatternEnum.END]
+    if not self._start_states or not self._end_states:
+      raise Exception('Start and end patterns are required to generate trial!')
+
+    self._reset_states = [
+        state for state, pattern in log_pattern_dict.items()
+        if state in self._state_2_variants and (
+            state == _PatternEnum.RESET or getattr(pattern, 'reset_signal', False))]
+    self._middle_states = [
+        state for state in self._state_2_variants
+        if state not in _NON_TRIAL_STATES and
+        state not in self._start_states and state not in self._end_states and
+        state not in self._reset_states]
+    self._noise_pool = self._build_noise_pool()
+
+  @classmethod
+  def from_observer(cls, observer,
+                    config: GeneratorConfig | None = None) -> LogcatGenerator:
+    """Creates the generator from the patterns of given observer.
+
+    The per-headset pattern variants are applied by the observer's
+    `update_lea_config_callback` if `config.headset_type` is given.
+    """
+    config = config or GeneratorConfig()
+    if config.headset_type:
+      observer.lea_config = constants.LEAConfig.from_headset_type(
+          config.headset_type)
+      observer.update_lea_config_callback()
+
+    return cls(
+        observer.captured.log_pattern_dict, config=config,
+        event_pass_criteria_sec=observer.captured.event_pass_criteria_sec,
+        search_timeout_sec=observer._search_timeout_sec)
+
+  def _synthesize_variants(
+      self, pattern: general_data.Pattern) -> list[tuple[str, str, re.Pattern]]:
+    synthesizer = RegexSynthesizer(self._rng)
+    sample_time = '01-01 08:00:00.000'
+    variants = []
+    for regex in getattr(pattern, '_patterns', []):
+      for _ in range(_VARIANT_NUM):
+        prefix, suffix = synthesizer.synthesize(regex)
+        if regex.search(prefix + sample_time + suffix):
+          variants.append((prefix, suffix, regex))
+
+      if not variants:
+        self.log.warning('Failed to synthesize line of %s!', regex.pattern)
+
+    return variants
+
+  def _build_noise_pool(self) -> list[str]:
+    regexes = [
+        variant[2] for variants in self._state_2_variants.values()
+        for variant in variants]
+    sample_time = '01-01 08:00:00.000'
+    noise_pool = []
+    while len(noise_pool) < _NOISE_POOL_SIZE:
+      words = ' '.join(
+          self._rng.choice(_NOISE_WORDS)
+          for _ in range(self._rng.randint(2, 10)))
+      noise = (
+          f' {self._rng.randint(100, 32767):5d} '
+          f'{self._rng.randint(100, 32767):5d} '
+          f'{self._rng.choice("VDIWE")} {self._rng.choice(_NOISE_TAGS)}: '
+          f'{words} {self._rng.randint(0, 0xffff):#x}')
+      if not any(regex.search(sample_time + noise) for regex in regexes):
+        noise_pool.append(noise)
+
+    return noise_pool
+
+  def _pattern_line(self, state, clock: _Clock,
+                    time_obj: datetime.datetime) -> str:
+    prefix, suffix, _ = self._rng.choice(self._state_2_variants[state])
+    return f'{prefix}{clock.timestamp(time_obj)}{suffix}'
+
+  def _noise_lines(self, clock: _Clock, until: datetime.datetime,
+                   minimum_num: int = 0) -> Iterator[str]:
+    """Emits noise lines at `line_rate` until the clock reaches `until`."""
+    interval_sec = 1 / self.config.line_rate
+    noise_pool = self._noise_pool
+    rng = self._rng
+    emitted_num = 0
+    while True:
+      next_time = clock.now + datetime.timedelta(
+          seconds=interval_sec * rng.uniform(0.5, 1.5))
+      if next_time >= until and emitted_num >= minimum_num:
+        return
+
+      clock.now = next_time
+      yield clock.timestamp() + rng.choice(noise_pool)
+      emitted_num += 1
+
+  def _trial_kind(self) -> TrialKind:
+    value = self._rng.random()
+    for kind, ratio in (
+        (TrialKind.DROP, self.config.drop_ratio),
+        (TrialKind.TIMEOUT, self.config.timeout_ratio),
+        (TrialKind.RESET, self.config.reset_ratio)):
+      if value < ratio:
+        return kind
+      value -= ratio
+
+    return TrialKind.PASS
+
+  def _trial_events(
+      self, kind: TrialKind,
+      start_time: datetime.datetime) -> tuple[list[tuple[Any, datetime.datetime]],
+                                              datetime.datetime | None]:
+    """Schedules the pattern hits of a trial.
+
+    Returns:
+      Tuple of scheduled (state, time) and the end time of trial. The end time
+      is None if the trial is not complete.
+    """
+    duration_sec = max(
+        self._rng.gauss(
+            self._duration_mean_sec,
+            self._duration_mean_sec * self.config.duration_stddev_ratio),
+        0.01)
+    middle_states = [
+        state for state in self._middle_states
+        if not self.log_pattern_dict[state].is_optional or
+        self._rng.random() < self.config.optional_ratio]
+    offsets = sorted(
+        self._rng.uniform(0, duration_sec) for _ in middle_states)
+    events = [(self._rng.choice(self._start_states), start_time)]
+    events.extend(
+        (state, start_time + datetime.timedelta(seconds=offset))
+        for state, offset in zip(middle_states, offsets))
+    end_time = _truncate_ms(
+        start_time + datetime.timedelta(seconds=duration_sec))
+    match kind:
+      case TrialKind.PASS:
+        events.append((self._end_states[0], end_time))
+        return events, end_time
+      case TrialKind.DROP:
+        # Cut the trial before the end and hit start pattern of next trial.
+        return events[:max(1, len(events) // 2)], None
+      case TrialKind.TIMEOUT:
+        events.append((
+            self._end_states[0],
+            start_time + datetime.timedelta(
+                seconds=self.search_timeout_sec + duration_sec)))
+        return events, None
+      case TrialKind.RESET:
+        events = events[:max(1, len(events) // 2)]
+        if self._reset_states:
+          events.append((
+              self._rng.choice(self._reset_states),
+              events[-1][1] + datetime.timedelta(milliseconds=1)))
+        return events, None
+
+  def lines(self) -> Iterator[str]:
+    """Generates the logcat lines. The ground truth is kept in `truths`."""
+    config = self.config
+    clock = _Clock(
+        datetime.datetime.strptime(
+            f'{_YEAR}-{config.start_time}', '%Y-%m-%d %H:%M:%S'))
+    noise_per_line = config.noise_ratio / max(1 - config.noise_ratio, 1e-9)
+    trial_no = 0
+    self.truths = []
+    while config.trial_num is None or trial_no < config.trial_num:
+      trial_no += 1
+      kind = self._trial_kind()
+      start_time = _truncate_ms(
+          clock.now + datetime.timedelta(seconds=1 / config.line_rate))
+      events, end_time = self._trial_events(kind, start_time)
+      self.truths.append(TrialTruth(
+          trial=trial_no, kind=kind, start_time=clock.timestamp(start_time),
+          end_time=clock.timestamp(end_time) if end_time else None,
+          duration_sec=(
+              round((end_time - start_time).total_seconds(), 3)
+              if end_time else None)))
+      noise_num = 0
+      for state, event_time in events:
+        for noise_line in self._noise_lines(clock, event_time):
+          noise_num += 1
+          yield noise_line
+
+        clock.now = max(clock.now, event_time)
+        yield self._pattern_line(state, clock, event_time)
+
+      # Idle noise between trials to reach the noise ratio.
+      yield from self._noise_lines(
+          clock, clock.now,
+          minimum_num=int(noise_per_line * len(events)) - noise_num)
+
+  def write(self, output_file_path: str,
+            truth_file_path: str | None = None,
+            realtime: bool = False) -> int:
+    """Writes the logcat and the ground truth into files.
+
+    Args:
+      output_file_path: Path of generated logcat.
+      truth_file_path: Path of ground truth in JSON Lines. Default is the
+        logcat path with suffix ".truth.jsonl".
+      realtime: True to pace the output at `line_rate` lines per second in
+        wall time. (e.g. to simulate `adb logcat` into a pipe)
+
+    Returns:
+      Number of written bytes.
+    """
+    truth_file_path = truth_file_path or f'{output_file_path}.truth.jsonl'
+    target_bytes = self.config.target_bytes
+    out_of_order_ratio = self.config.out_of_order_ratio
+    rng = self._rng
+    byte_num = 0
+    line_num = 0
+    held_line: str | None = None
+    start_wall_time = time.monotonic()
+    with open(output_file_path, 'w', encoding='utf-8',
+              buffering=1024 * 1024) as fw:
+      for line in self.lines():
+        if out_of_order_ratio and held_line is None and (
+            rng.random() < out_of_order_ratio):
+          # Holds the line to be written after the next one.
+          held_line = line
+          continue
+
+        fw.write(line + '\n')
+        byte_num += len(line) + 1
+        if held_line is not None:
+          fw.write(held_line + '\n')
+          byte_num += len(held_line) + 1
+          held_line = None
+
+        line_num += 1
+        if realtime and line_num % 64 == 0:
+          fw.flush()
+          sleep_sec = (
+              line_num / self.config.line_rate -
+              (time.monotonic() - start_wall_time))
+          if sleep_sec > 0:
+            time.sleep(sleep_sec)
+
+        if target_bytes and byte_num >= target_bytes:
+          break
+
+      if held_line is not None:
+        fw.write(held_line + '\n')
+        byte_num += len(held_line) + 1
+
+    with open(truth_file_path, 'w') as fw:
+      for truth in self.truths:
+        fw.write(json.dumps(truth.to_dict()) + '\n')
+
+    self.log.info(
+        'Output %s trial(s) in %s bytes to %s (ground truth: %s)',
+        len(self.truths), byte_num, output_file_path, truth_file_path)
+    return byte_num
+
+
+def parse_size(size_str: str) -> int:
+  """Parses size string such as "512K", "100M" and "20G" into bytes."""
+  size_str = size_str.strip().upper()
+  units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+  if size_str and size_str[-1] in units:
+    return int(float(size_str[:-1]) * units[size_str[-1]])
+
+  return int(size_str)
+
+
+def load_observer(observer_path: str):
+  """Creates observer by path in format "<module>:<class>"."""
+  module_name, _, class_name = observer_path.partition(':')
+  return getattr(importlib.import_module(module_name), class_name)()
+
+
+def main():
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S', level=logging.INFO)
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument(
+      '--observer', type=str,
+      default='observer.le_synthetic_trial_test:SyntheticTrialPattern',
+      help='Observer in format "<module>:<class>" to take patterns from.')
+  parser.add_argument('--output', type=str, required=True)
+  parser.add_argument('--truth', type=str, default=None)
+  parser.add_argument('--trials', type=int, default=None)
+  parser.add_argument('--size', type=str, default=None,
+                      help='Target size of logcat. e.g.: 500M, 20G')
+  parser.add_argument('--line-rate', type=float, default=200.0)
+  parser.add_argument('--noise-ratio', type=float, default=0.95)
+  parser.add_argument('--duration-mean-sec', type=float, default=None)
+  parser.add_argument('--drop-ratio', type=float, default=0.0)
+  parser.add_argument('--timeout-ratio', type=float, default=0.0)
+  parser.add_argument('--reset-ratio', type=float, default=0.0)
+  parser.add_argument('--optional-ratio', type=float, default=0.5)
+  parser.add_argument('--out-of-order-ratio', type=float, default=0.0)
+  parser.add_argument('--start-time', type=str, default='01-01 08:00:00')
+  parser.add_argument('--leap-day', action='store_true',
+                      help='Start the log at 02-29.')
+  parser.add_argument('--headset-type', type=str, default=None)
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--realtime', action='store_true')
+  args = parser.parse_args()
+
+  config = GeneratorConfig(
+      trial_num=args.trials if args.trials or args.size else 100,
+      target_bytes=parse_size(args.size) if args.size else None,
+      line_rate=args.line_rate,
+      noise_ratio=args.noise_ratio,
+      duration_mean_sec=args.duration_mean_sec,
+      drop_ratio=args.drop_ratio,
+      timeout_ratio=args.timeout_ratio,
+      reset_ratio=args.reset_ratio,
+      optional_ratio=args.optional_ratio,
+      out_of_order_ratio=args.out_of_order_ratio,
+      start_time='02-29 00:00:00' if args.leap_day else args.start_time,
+      headset_type=(
+          constants.HeadsetType.from_str(args.headset_type)
+          if args.headset_type else None),
+      seed=args.seed)
+  generator = LogcatGenerator.from_observer(
+      load_observer(args.observer), config=config)
+  generator.write(args.output, args.truth, realtime=args.realtime)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,637 @@
+"""Cluster mode to distribute parse jobs across machines.
+
+The coordinator finds the logs on a filesystem shared by all machines and
+serves a queue of (log, task) jobs over TCP by `multiprocessing.managers`.
+Workers connect to the coordinator, pull the jobs and run them on a pool of
+warm worker processes (See `le_parser_jobs`). The reports of each job are
+written into the shared output folder by the worker, and the compact output
+of the job (records without raw log lines) is sent back. The coordinator
+aggregates the outputs of all jobs into one `CollectOutputResult` and writes
+the summary with the section statistics of each task. (See `le_batch`)
+
+The coordinator builds the observers of the tasks too, and pins the
+fingerprint of their patterns on the jobs. A worker whose patterns differ
+(e.g. another checkout or Python version) fails the jobs instead of parsing
+with other patterns. (See `le_parser_jobs.ParseJob.pattern_fingerprint`)
+
+A pulled job is leased to the worker, which renews its leases by heartbeat
+while running them. The jobs of a worker which is gone are queued again when
+their leases expire. The coordinator fails with the missing jobs if no result
+arrives within `--result-timeout`.
+
+Usage:
+  $ export LE_AUDIO_PERF_CLUSTER_AUTHKEY=<secret>
+  $ python le_parser_cluster.py coordinator --address 0.0.0.0:50050 \\
+      --inputs /mnt/soak/ --recursive --tasks 1 --headset Sony \\
+      --output-dir /mnt/soak_reports
+  $ python le_parser_cluster.py worker --address coordinator-host:50050 \\
+      --workers 16
+
+  # Coordinator and 4 workers on localhost.
+  $ python le_parser_cluster.py local --workers 4 --inputs /data/logs/ \\
+      --tasks 1 --headset Sony --output-dir /tmp/reports
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import multiprocessing
+from multiprocessing import managers
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+import constants
+import le_audio_parsing_data
+import le_batch
+import le_parser_jobs
+import le_report_export
+
+
+DEFAULT_PORT = 50050
+# Interval for workers to check if the coordinator is done when no job.
+_POLL_SEC = 1.0
+# Time for workers to keep trying to connect to the coordinator.
+_CONNECT_TIMEOUT_SEC = 30.0
+# Time for the lease of a job to expire if the worker doesn't renew it.
+DEFAULT_LEASE_SEC = 60.0
+# Max time for the coordinator to wait for the next result.
+DEFAULT_RESULT_TIMEOUT_SEC = 3600.0
+
+
+class ClusterManager(managers.BaseManager):
+  """Manager serving the queues of coordinator to the workers."""
+
+
+ClusterManager.register('get_job_board')
+ClusterManager.register('get_result_queue')
+ClusterManager.register('get_done_event', proxytype=managers.EventProxy)
+
+
+class _CoordinatorManager(ClusterManager):
+  """Manager of the coordinator process which owns the queues."""
+
+
+class JobBoard:
+  """Queue of jobs which are leased to the workers pulling them.
+
+  Attributes:
+    lease_sec: Time for a lease to expire if it is not renewed.
+  """
+
+  def __init__(self, lease_sec: float = DEFAULT_LEASE_SEC):
+    self.lease_sec = lease_sec
+    self._condition = threading.Condition()
+    self._jobs: dict[int, le_parser_jobs.ParseJob] = {}
+    self._pending_ids: collections.deque[int] = collections.deque()
+    # Worker name and expiry time of each leased job keyed by job ID.
+    self._leases: dict[int, tuple[str, float]] = {}
+
+  def add(self, job_id: int, job: le_parser_jobs.ParseJob) -> None:
+    with self._condition:
+      self._jobs[job_id] = job
+      self._pending_ids.append(job_id)
+      self._condition.notify()
+
+  def lease(self, worker_name: str, timeout_sec: float | None = None
+            ) -> tuple[int, le_parser_jobs.ParseJob] | None:
+    """Leases the next job to the worker.
+
+    Returns:
+      Job ID and the job. None if no job is pending in time.
+    """
+    with self._condition:
+      if not self._condition.wait_for(
+          lambda: self._pending_ids, timeout=timeout_sec):
+        return None
+
+      job_id = self._pending_ids.popleft()
+      self._leases[job_id] = (worker_name, time.monotonic() + self.lease_sec)
+      return job_id, self._jobs[job_id]
+
+  def renew(self, worker_name: str) -> float:
+    """Renews the leases of all jobs run by the worker.
+
+    Returns:
+      Time for the renewed leases to expire.
+    """
+    expiry_time = time.monotonic() + self.lease_sec
+    with self._condition:
+      for job_id, (lease_worker_name, _) in self._leases.items():
+        if lease_worker_name == worker_name:
+          self._leases[job_id] = (worker_name, expiry_time)
+
+    return self.lease_sec
+
+  def release(self, job_id: int) -> None:
+    """Releases the lease of the finished job."""
+    with self._condition:
+      self._leases.pop(job_id, None)
+
+  def requeue_expired(self) -> list[tuple[int, str]]:
+    """Queues the jobs of expired leases again.
+
+    Returns:
+      Job ID and worker name of each expired lease.
+    """
+    now = time.monotonic()
+    with self._condition:
+      expired_leases = [
+          (job_id, worker_name)
+          for job_id, (worker_name, expiry_time) in self._leases.items()
+          if expiry_time < now]
+      for job_id, _ in expired_leases:
+        del self._leases[job_id]
+        # Retried before the jobs never run.
+        self._pending_ids.appendleft(job_id)
+
+      self._condition.notify_all()
+
+    return expired_leases
+
+
+@dataclasses.dataclass
+class ClusterResult:
+  """Result of the jobs run by the cluster.
+
+  Attributes:
+    output: Aggregated output of all jobs. The records don't keep their raw
+      log lines.
+    items: Results of each job in the order of completion.
+    worker_2_job_num: Number of jobs run by each worker.
+  """
+  output: le_audio_parsing_data.CollectOutputResult
+  items: list[le_batch.BatchItem]
+  worker_2_job_num: dict[str, int]
+
+
+def parse_address(address: str) -> tuple[str, int]:
+  """Parses address in format "[host:]port"."""
+  host, _, port = address.rpartition(':')
+  return host or '127.0.0.1', int(port)
+
+
+def get_authkey(authkey: str | None = None) -> bytes:
+  authkey = authkey or os.getenv(constants.ENV_CLUSTER_AUTHKEY)
+  if not authkey:
+    raise Exception(
+        f'Authkey is needed! (Set environment variable'
+        f' {constants.ENV_CLUSTER_AUTHKEY})')
+
+  return authkey.encode()
+
+
+class Coordinator:
+  """Server of the job queue which collects the results of workers.
+
+  Only one coordinator is run by a process since the queues are registered to
+  the manager class.
+
+  Attributes:
+    address: Address of the server.
+    jobs: Jobs to run keyed by job ID.
+  """
+
+  def __init__(self, address: tuple[str, int], authkey: bytes,
+               lease_sec: float = DEFAULT_LEASE_SEC):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.jobs: dict[int, le_parser_jobs.ParseJob] = {}
+    self._job_board = JobBoard(lease_sec)
+    self._result_queue = queue.Queue()
+    self._done_event = threading.Event()
+    _CoordinatorManager.register(
+        'get_job_board', callable=lambda: self._job_board)
+    _CoordinatorManager.register(
+        'get_result_queue', callable=lambda: self._result_queue)
+    _CoordinatorManager.register(
+        'get_done_event', callable=lambda: self._done_event,
+        proxytype=managers.EventProxy)
+    manager = _CoordinatorManager(address=address, authkey=authkey)
+    # Served by a thread so the coordinator uses the queues directly.
+    self._server = manager.get_server()
+    self.address = self._server.address
+    threading.Thread(target=self._server.serve_forever, daemon=True).start()
+    self.log.info('Serving jobs on %s:%s', *self.address)
+
+  def add_job(self, job: le_parser_jobs.ParseJob) -> None:
+    job_id = len(self.jobs) + 1
+    self.jobs[job_id] = job
+    self._job_board.add(job_id, job)
+
+  def collect(self, result_timeout_sec: float | None = (
+      DEFAULT_RESULT_TIMEOUT_SEC)) -> ClusterResult:
+    """Waits for the results of all jobs and aggregates them.
+
+    The jobs of expired leases are queued again while waiting.
+
+    Args:
+      result_timeout_sec: Max time to wait for the next result. Waits forever
+        if None.
+
+    Raises:
+      Exception: No result arrives in time.
+    """
+    result = ClusterResult(
+        output=le_audio_parsing_data.CollectOutputResult(), items=[],
+        worker_2_job_num={})
+    pending_ids = set(self.jobs)
+    last_result_time = time.monotonic()
+    while pending_ids:
+      try:
+        job_id, worker_name, job_result = self._result_queue.get(
+            timeout=_POLL_SEC)
+      except queue.Empty:
+        for job_id, worker_name in self._job_board.requeue_expired():
+          self.log.warning(
+              'Lease of %s by %s expired. Queued again.',
+              os.path.basename(self.jobs[job_id].input_path), worker_name)
+
+        if (result_timeout_sec is not None and
+            time.monotonic() - last_result_time > result_timeout_sec):
+          raise Exception(
+              f'No result in {result_timeout_sec} sec. Missing jobs:'
+              f' {[str(self.jobs[job_id]) for job_id in sorted(pending_ids)]}'
+          ) from None
+
+        continue
+
+      self._job_board.release(job_id)
+      last_result_time = time.monotonic()
+      # The result of a job queued again may arrive twice.
+      if job_id not in pending_ids:
+        continue
+
+      pending_ids.remove(job_id)
+      job = self.jobs[job_id]
+      if job_result.output:
+        result.output.extend(job_result.output.collection)
+        result.output.drop_num += job_result.output.drop_num
+        job_result.records = [
+            le_report_export.to_trial_record(output_result)
+            for output_result in job_result.output.collection]
+        job_result.output = None
+
+      result.items.append(le_batch.BatchItem(
+          input_path=job.input_path, task_num=job.task_num,
+          result=job_result))
+      result.worker_2_job_num[worker_name] = (
+          result.worker_2_job_num.get(worker_name, 0) + 1)
+      self.log.info(
+          '[%s/%s] %s task=%s by %s: ok=%s; found=%s; %.03f sec%s',
+          len(self.jobs) - len(pending_ids), len(self.jobs),
+          os.path.basename(job.input_path), job.task_num, worker_name,
+          job_result.ok, job_result.found_num, job_result.elapsed_sec,
+          f'; error={job_result.error}' if job_result.error else '')
+
+    return result
+
+  def close(self) -> None:
+    """Tells the workers to stop and stops serving."""
+    self._done_event.set()
+    # Gives the polling workers the time to see the event.
+    time.sleep(_POLL_SEC * 2)
+    self._server.listener.close()
+
+
+def connect(address: tuple[str, int], authkey: bytes,
+            timeout_sec: float = _CONNECT_TIMEOUT_SEC) -> ClusterManager:
+  """Connects to the coordinator. Retries until it is up or timeout."""
+  manager = ClusterManager(address=address, authkey=authkey)
+  deadline = time.monotonic() + timeout_sec
+  while True:
+    try:
+      manager.connect()
+      return manager
+    except ConnectionRefusedError:
+      if time.monotonic() > deadline:
+        raise
+
+      time.sleep(_POLL_SEC)
+
+
+def run_worker(address: tuple[str, int], authkey: bytes,
+               worker_num: int | None = None,
+               task_nums: list[int] | None = None,
+               headset_types: list[constants.HeadsetType] | None = None,
+               ) -> int:
+  """Pulls and runs the jobs until the coordinator is done.
+
+  Args:
+    address: Address of the coordinator.
+    authkey: Key to authenticate the connection.
+    worker_num: Number of worker processes. CPU count if None.
+    task_nums: Tasks to preload. All tasks if None.
+    headset_types: Headset types to preload. All types if None.
+
+  Returns:
+    Number of run jobs.
+  """
+  log = logging.getLogger(__name__)
+  pool = le_parser_jobs.JobPool(
+      worker_num=worker_num, task_nums=task_nums, headset_types=headset_types)
+  manager = connect(address, authkey)
+  worker_name = f'{socket.gethostname()}:{os.getpid()}'
+  log.info('Worker %s connected to %s:%s', worker_name, *address)
+  job_nums = []
+  stop_event = threading.Event()
+
+  def pull_jobs():
+    # Proxies keep a connection per thread.
+    job_board = manager.get_job_board()
+    result_queue = manager.get_result_queue()
+    done_event = manager.get_done_event()
+    job_num = 0
+    try:
+      while not done_event.is_set() and not stop_event.is_set():
+        leased_job = job_board.lease(worker_name, _POLL_SEC)
+        if leased_job is None:
+          continue
+
+        job_id, job = leased_job
+        try:
+          job_result = pool.run(job, keep_output=True)
+        except Exception as ex:
+          job_result = le_parser_jobs.JobResult(
+              error=f'{ex.__class__.__name__}: {ex}')
+          if isinstance(ex, concurrent.futures.BrokenExecutor):
+            log.error('Worker processes are broken. Stop pulling jobs.')
+            stop_event.set()
+
+        result_queue.put((job_id, worker_name, job_result))
+        job_num += 1
+    except (ConnectionError, EOFError) as ex:
+      log.info('Coordinator is gone: %s', ex)
+
+    job_nums.append(job_num)
+
+  def renew_leases():
+    job_board = manager.get_job_board()
+    renew_interval_sec = 0
+    try:
+      while not stop_event.wait(renew_interval_sec):
+        renew_interval_sec = job_board.renew(worker_name) / 3
+    except (ConnectionError, EOFError):
+      pass
+
+  # One puller per process keeps every process busy.
+  threads = [
+      threading.Thread(target=pull_jobs, daemon=True)
+      for _ in range(pool.worker_num)]
+  threading.Thread(target=renew_leases, daemon=True).start()
+  try:
+    for thread in threads:
+      thread.start()
+
+    for thread in threads:
+      thread.join()
+  finally:
+    stop_event.set()
+    pool.shutdown()
+
+  log.info('Worker %s ran %s job(s)', worker_name, sum(job_nums))
+  return sum(job_nums)
+
+
+def run_coordinator(
+    coordinator: Coordinator, input_paths: list[str], task_nums: list[int],
+    headset_type: constants.HeadsetType, output_dir: str,
+    formats: str | None = None,
+    result_timeout_sec: float | None = DEFAULT_RESULT_TIMEOUT_SEC
+) -> ClusterResult:
+  """Queues the jobs of logs and tasks and collects their results.
+
+  The input and output paths must be the same on all machines.
+  """
+  log = logging.getLogger(__name__)
+  os.makedirs(output_dir, exist_ok=True)
+  names = le_batch.output_names(input_paths)
+  observers = le_parser_jobs.WarmObservers()
+  task_2_fingerprint = {}
+  for task_num in task_nums:
+    try:
+      task_2_fingerprint[task_num] = observers.fingerprint_of(
+          task_num, headset_type)
+    except Exception as ex:
+      log.warning(
+          'Patterns of task %s are not checked on the workers since its'
+          ' observer fails to be created: %s', task_num, ex)
+
+  for input_path in input_paths:
+    for task_num in task_nums:
+      coordinator.add_job(le_parser_jobs.ParseJob(
+          input_path=input_path, task_num=task_num,
+          headset_type=headset_type.value,
+          output_path=os.path.join(
+              output_dir, f'{names[input_path]}_task{task_num}'),
+          formats=formats,
+          pattern_fingerprint=task_2_fingerprint.get(task_num)))
+
+  try:
+    return coordinator.collect(result_timeout_sec)
+  finally:
+    coordinator.close()
+
+
+def _run_local_worker(address: tuple[str, int], authkey: bytes,
+                      worker_num: int, task_nums: list[int],
+                      headset_types: list[constants.HeadsetType]) -> None:
+  run_worker(address, authkey, worker_num=worker_num, task_nums=task_nums,
+             headset_types=headset_types)
+
+
+def _add_job_args(parser: argparse.ArgumentParser) -> None:
+  parser.add_argument(
+      '--inputs', nargs='+', required=True,
+      help='Folders or glob patterns of logs on the shared filesystem.')
+  parser.add_argument('--recursive', action='store_true',
+                      help='Search the folders and "**" recursively.')
+  le_batch.add_pattern_arg(parser)
+  parser.add_argument('--tasks', type=str, required=True,
+                      help='Comma separated task numbers.')
+  parser.add_argument(
+      '--headset', type=str, default=os.getenv('HEADSET_TYPE'),
+      help='Headset type. (Or set environment variable HEADSET_TYPE)')
+  parser.add_argument('--output-dir', type=str, required=True,
+                      help='Output folder on the shared filesystem.')
+  parser.add_argument(
+      '--formats', type=str, default=None,
+      help=(
+          'Comma separated report formats. (Default:'
+          f' {",".join(constants.DEFAULT_REPORT_FORMATS)} or environment'
+          f' variable {constants.ENV_REPORT_FORMATS})'))
+  parser.add_argument(
+      '--result-timeout', type=float, default=DEFAULT_RESULT_TIMEOUT_SEC,
+      help=(
+          'Max seconds to wait for the next result. 0 to wait forever.'
+          f' (Default: {DEFAULT_RESULT_TIMEOUT_SEC:.0f})'))
+  parser.add_argument(
+      '--lease-timeout', type=float, default=DEFAULT_LEASE_SEC,
+      help=(
+          'Seconds for the job of a worker without heartbeat to be queued'
+          f' again. (Default: {DEFAULT_LEASE_SEC:.0f})'))
+
+
+def _coordinate(args, parser: argparse.ArgumentParser,
+                coordinator: Coordinator, start_workers=None) -> int:
+  """Runs the jobs of arguments by the coordinator and outputs the summary.
+
+  `start_workers` starts the local worker processes for the tasks and headset
+  types if given.
+  """
+  log = logging.getLogger(__name__)
+  if not args.headset:
+    parser.error('--headset or environment variable HEADSET_TYPE is needed!')
+
+  input_paths = le_batch.find_inputs(
+      args.inputs, recursive=args.recursive, patterns=args.pattern.split(','),
+      exclude_dir=args.output_dir)
+  if not input_paths:
+    parser.error(f'No log is found in {args.inputs}!')
+
+  task_nums = [int(task) for task in args.tasks.split(',')]
+  headset_type = constants.HeadsetType.from_str(args.headset)
+  log.info('Parsing %s log(s) by task(s) %s...', len(input_paths), task_nums)
+  started_time = time.perf_counter()
+  processes = (
+      start_workers(task_nums, [headset_type]) if start_workers else [])
+  try:
+    result = run_coordinator(
+        coordinator, input_paths, task_nums, headset_type, args.output_dir,
+        formats=args.formats,
+        result_timeout_sec=args.result_timeout or None)
+  finally:
+    for process in processes:
+      process.join()
+
+  summary = le_batch.summarize(
+      result.items, time.perf_counter() - started_time)
+  summary['workers'] = result.worker_2_job_num
+  summary_path = os.path.join(args.output_dir, le_batch.SUMMARY_FILE_NAME)
+  with open(summary_path, 'w') as fw:
+    json.dump(summary, fw, indent=2)
+
+  for task_num, task_summary in summary['tasks'].items():
+    print(
+        f'\n=== Task {task_num}: {task_summary["ok_num"]}/'
+        f'{task_summary["log_num"]} log(s) OK; {task_summary["found_num"]}'
+        f' trial(s) found; {task_summary["drop_num"]} dropped ===')
+    print(task_summary['section_table'])
+
+  print(
+      f'\n{summary["job_num"] - summary["failed_num"]}/{summary["job_num"]}'
+      f' job(s) OK by {len(result.worker_2_job_num)} worker(s) in'
+      f' {summary["elapsed_sec"]:.1f} sec; {len(result.output.collection)}'
+      f' trial(s) collected. Summary: {summary_path}')
+  return 1 if summary['failed_num'] else 0
+
+
+def coordinate(args, parser: argparse.ArgumentParser) -> int:
+  coordinator = Coordinator(
+      parse_address(args.address), get_authkey(args.authkey),
+      lease_sec=args.lease_timeout)
+  return _coordinate(args, parser, coordinator)
+
+
+def work(args, parser: argparse.ArgumentParser) -> int:
+  run_worker(
+      parse_address(args.address), get_authkey(args.authkey),
+      worker_num=args.workers,
+      task_nums=(
+          [int(task) for task in args.tasks.split(',')] if args.tasks
+          else None),
+      headset_types=(
+          [constants.HeadsetType.from_str(headset.strip())
+           for headset in args.headsets.split(',')] if args.headsets
+          else None))
+  return 0
+
+
+def run_local(args, parser: argparse.ArgumentParser) -> int:
+  """Runs the coordinator and workers on localhost."""
+  authkey = os.urandom(16)
+  # Port 0 binds a free port.
+  coordinator = Coordinator(
+      ('127.0.0.1', 0), authkey, lease_sec=args.lease_timeout)
+
+  def start_workers(task_nums, headset_types):
+    processes = []
+    for _ in range(args.workers):
+      process = multiprocessing.get_context('spawn').Process(
+          target=_run_local_worker,
+          args=(coordinator.address, authkey, args.processes, task_nums,
+                headset_types))
+      process.start()
+      processes.append(process)
+
+    return processes
+
+  return _coordinate(args, parser, coordinator, start_workers)
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(
+      description='Parse logs by a cluster of workers.')
+  parser.add_argument(
+      '--authkey', type=str, default=None,
+      help=(
+          'Key to authenticate the connections. (Or set environment variable'
+          f' {constants.ENV_CLUSTER_AUTHKEY})'))
+  parser.add_argument(
+      '--verbose', action='store_true',
+      help='Output the log of parsing. Only the progress is logged if not.')
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  coordinator_parser = subparsers.add_parser(
+      'coordinator', help='Serve the jobs and collect the results.')
+  coordinator_parser.add_argument(
+      '--address', type=str, default=f'0.0.0.0:{DEFAULT_PORT}',
+      help='Address to serve in format "[host:]port".')
+  _add_job_args(coordinator_parser)
+  coordinator_parser.set_defaults(func=coordinate)
+
+  worker_parser = subparsers.add_parser(
+      'worker', help='Pull and run the jobs of coordinator.')
+  worker_parser.add_argument(
+      '--address', type=str, default=f'127.0.0.1:{DEFAULT_PORT}',
+      help='Address of coordinator in format "[host:]port".')
+  worker_parser.add_argument(
+      '--workers', type=int, default=None,
+      help='Number of worker processes. (Default: CPU count)')
+  worker_parser.add_argument(
+      '--tasks', type=str, default=None,
+      help='Comma separated task numbers to preload. (Default: all)')
+  worker_parser.add_argument(
+      '--headsets', type=str, default=None,
+      help='Comma separated headset types to preload. (Default: all)')
+  worker_parser.set_defaults(func=work)
+
+  local_parser = subparsers.add_parser(
+      'local', help='Run the coordinator and workers on localhost.')
+  local_parser.add_argument('--workers', type=int, default=2,
+                            help='Number of workers.')
+  local_parser.add_argument('--processes', type=int, default=1,
+                            help='Number of processes of each worker.')
+  _add_job_args(local_parser)
+  local_parser.set_defaults(func=run_local)
+
+  args = parser.parse_args()
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S',
+      # The parser logs each hit in INFO level which floods the cluster output.
+      level=logging.DEBUG if args.verbose else logging.WARNING)
+  for name in (__name__, Coordinator.__name__):
+    logging.getLogger(name).setLevel(logging.INFO)
+
+  return args.func(args, parser)
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,310 @@
+"""Long-running parser daemon serving parse jobs over local sockets.
+
+The daemon pays the imports and the construction of observers (including the
+compilation of their patterns) once at start up, then runs the jobs on a pool
+of warm worker processes. (See `le_parser_jobs`)
+
+Protocols:
+  Unix socket: One JSON request per line and one JSON response per line on
+    the same connection. The request carries the fields of
+    `le_parser_jobs.ParseJob` or {"command": "ping"}. The response carries the
+    fields of `le_parser_jobs.JobResult`.
+  HTTP on localhost: POST the same JSON request to /parse. GET /ping checks
+    the daemon.
+
+The daemon builds its patterns once at start up, so it keeps parsing with
+them after the code is changed. The ping response carries the fingerprint of
+the patterns of each preloaded task; a client pins it by the
+"pattern_fingerprint" field of the job to fail the job if the daemon parses
+with other patterns.
+
+Usage:
+  $ python le_parser_daemon.py serve --socket /tmp/le_parser.sock --workers 8
+  $ python le_parser_daemon.py serve --port 8765 --tasks 1 --headsets Sony
+
+  $ python le_parser_daemon.py submit --socket /tmp/le_parser.sock \\
+      --input logcat.txt --task 1 --headset Sony --output /tmp/report_1
+  $ curl -d '{"input_path": "logcat.txt", "task_num": 1,
+      "headset_type": "Sony"}' http://127.0.0.1:8765/parse
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import http.server
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import Any
+
+import constants
+import le_parser_jobs
+from le_pattern_bundle import BUNDLE
+
+
+DEFAULT_SOCKET_PATH = '/tmp/le_parser_daemon.sock'
+# Only local clients are served.
+_HTTP_HOST = '127.0.0.1'
+
+
+def is_valid_request(request: Any) -> bool:
+  """Checks the decoded JSON request is an object."""
+  return isinstance(request, dict)
+
+
+class ParserDaemon:
+  """Dispatcher of requests to the job pool.
+
+  Attributes:
+    pool: Pool of warm workers to run the jobs.
+    job_num: Number of handled jobs.
+  """
+
+  def __init__(self, pool: le_parser_jobs.JobPool):
+    self.pool = pool
+    self.job_num = 0
+    self.log = logging.getLogger(self.__class__.__name__)
+    self._lock = threading.Lock()
+
+  def handle(self, request: Any) -> dict[str, Any]:
+    """Handles the decoded JSON request and returns the response."""
+    if not is_valid_request(request):
+      self.log.warning('Invalid request %r', request)
+      return dataclasses.asdict(le_parser_jobs.JobResult(
+          error=f'Request must be a JSON object, got {request!r}'))
+
+    if request.get('command') == 'ping':
+      return {'ok': True, 'worker_num': self.pool.worker_num,
+              'job_num': self.job_num, 'pid': os.getpid(),
+              'pattern_bundle': BUNDLE.info(),
+              'pattern_fingerprints': self.pool.fingerprints()}
+
+    try:
+      job = le_parser_jobs.ParseJob.from_dict(request)
+      with self._lock:
+        self.job_num += 1
+        job_id = self.job_num
+    except Exception as ex:
+      self.log.warning('Invalid request %s: %s', request, ex)
+      return dataclasses.asdict(le_parser_jobs.JobResult(error=str(ex)))
+
+    self.log.info('Job-%s: %s', job_id, job)
+    try:
+      result = self.pool.run(job)
+    except Exception as ex:
+      self.log.error('Job-%s failed in pool: %s', job_id, ex)
+      return dataclasses.asdict(le_parser_jobs.JobResult(
+          error=f'{ex.__class__.__name__}: {ex}'))
+
+    self.log.info(
+        'Job-%s done in %.03f sec: ok=%s; found=%s', job_id,
+        result.elapsed_sec, result.ok, result.found_num)
+    return dataclasses.asdict(result)
+
+
+class _UnixRequestHandler(socketserver.StreamRequestHandler):
+
+  def handle(self):
+    for line in self.rfile:
+      if not line.strip():
+        continue
+
+      try:
+        request = json.loads(line)
+      except ValueError as ex:
+        response = {'ok': False, 'error': f'Invalid JSON: {ex}'}
+      else:
+        response = self.server.parser_daemon.handle(request)
+
+      self.wfile.write(json.dumps(response).encode() + b'\n')
+      self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+  daemon_threads = True
+
+  def __init__(self, socket_path: str, parser_daemon: ParserDaemon):
+    if os.path.exists(socket_path):
+      os.remove(socket_path)
+
+    super().__init__(socket_path, _UnixRequestHandler)
+    self.parser_daemon = parser_daemon
+
+
+class _HttpRequestHandler(http.server.BaseHTTPRequestHandler):
+
+  def do_GET(self):
+    if self.path != '/ping':
+      self.send_error(404)
+      return
+
+    self._send_json(self.server.parser_daemon.handle({'command': 'ping'}))
+
+  def do_POST(self):
+    if self.path != '/parse':
+      self.send_error(404)
+      return
+
+    try:
+      request = json.loads(
+          self.rfile.read(int(self.headers.get('Content-Length', 0))))
+    except ValueError as ex:
+      self._send_json({'ok': False, 'error': f'Invalid JSON: {ex}'}, 400)
+      return
+
+    response = self.server.parser_daemon.handle(request)
+    self._send_json(response, 200 if is_valid_request(request) else 400)
+
+  def _send_json(self, response: dict[str, Any], status: int = 200):
+    body = json.dumps(response).encode()
+    self.send_response(status)
+    self.send_header('Content-Type', 'application/json')
+    self.send_header('Content-Length', str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args):
+    logging.getLogger(self.__class__.__name__).debug(format, *args)
+
+
+class _HttpServer(http.server.ThreadingHTTPServer):
+  daemon_threads = True
+
+  def __init__(self, port: int, parser_daemon: ParserDaemon):
+    super().__init__((_HTTP_HOST, port), _HttpRequestHandler)
+    self.parser_daemon = parser_daemon
+
+
+def request(payload: dict[str, Any],
+            socket_path: str = DEFAULT_SOCKET_PATH) -> dict[str, Any]:
+  """Sends a request to the daemon by Unix socket and waits for response."""
+  with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.connect(socket_path)
+    with sock.makefile('rwb') as stream:
+      stream.write(json.dumps(payload).encode() + b'\n')
+      stream.flush()
+      return json.loads(stream.readline())
+
+
+def _raise_interrupt(signum, frame):
+  raise KeyboardInterrupt()
+
+
+def serve(args) -> int:
+  logging.basicConfig(
+      format='%(asctime)s %(levelname)-4s [%(filename)s:%(lineno)d] %(message)s',
+      datefmt='%H:%M:%S', level=args.log_level)
+  pool = le_parser_jobs.JobPool(
+      worker_num=args.workers,
+      task_nums=(
+          [int(task) for task in args.tasks.split(',')] if args.tasks
+          else None),
+      headset_types=(
+          [constants.HeadsetType.from_str(headset.strip())
+           for headset in args.headsets.split(',')] if args.headsets
+          else None))
+  parser_daemon = ParserDaemon(pool)
+  log = logging.getLogger(__name__)
+  for task_headset, fingerprint in pool.fingerprints().items():
+    log.info('Patterns of %s: %s', task_headset, fingerprint)
+
+  # Installed after the workers are forked, so only the daemon handles it.
+  signal.signal(signal.SIGTERM, _raise_interrupt)
+  servers = [_UnixServer(args.socket, parser_daemon)]
+  if args.port:
+    servers.append(_HttpServer(args.port, parser_daemon))
+
+  log.info('Serving on unix:%s%s', args.socket,
+           f' and http://{_HTTP_HOST}:{args.port}' if args.port else '')
+  threads = [
+      threading.Thread(target=server.serve_forever, daemon=True)
+      for server in servers]
+  for thread in threads:
+    thread.start()
+
+  try:
+    for thread in threads:
+      thread.join()
+  except KeyboardInterrupt:
+    log.info('Shutting down...')
+  finally:
+    for server in servers:
+      server.shutdown()
+      server.server_close()
+
+    pool.shutdown()
+    if os.path.exists(args.socket):
+      os.remove(args.socket)
+
+  return 0
+
+
+def submit(args) -> int:
+  payload = {'command': 'ping'} if args.ping else dataclasses.asdict(
+      le_parser_jobs.ParseJob(
+          input_path=os.path.abspath(args.input), task_num=args.task,
+          headset_type=args.headset,
+          output_path=os.path.abspath(args.output), formats=args.formats,
+          since=args.since, until=args.until,
+          return_records=args.records,
+          pattern_fingerprint=args.pattern_fingerprint))
+  response = request(payload, args.socket)
+  print(json.dumps(response, indent=2))
+  return 0 if response.get('ok') else 1
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(
+      description='LE audio parser daemon and its client.')
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  serve_parser = subparsers.add_parser('serve', help='Run the daemon.')
+  serve_parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH)
+  serve_parser.add_argument(
+      '--port', type=int, default=None,
+      help=f'Also serve HTTP on {_HTTP_HOST} at this port.')
+  serve_parser.add_argument(
+      '--workers', type=int, default=None,
+      help='Number of worker processes. (Default: CPU count)')
+  serve_parser.add_argument(
+      '--tasks', type=str, default=None,
+      help='Comma separated task numbers to preload. (Default: all)')
+  serve_parser.add_argument(
+      '--headsets', type=str, default=None,
+      help='Comma separated headset types to preload. (Default: all)')
+  serve_parser.add_argument('--log-level', type=str, default='INFO')
+  serve_parser.set_defaults(func=serve)
+
+  submit_parser = subparsers.add_parser(
+      'submit', help='Submit a job to the daemon.')
+  submit_parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET_PATH)
+  submit_parser.add_argument('--ping', action='store_true',
+                             help='Only check the daemon.')
+  submit_parser.add_argument('--input', type=str, default='')
+  submit_parser.add_argument('--task', type=int, default=1)
+  submit_parser.add_argument('--headset', type=str,
+                             default=constants.HeadsetType.Sony.value)
+  submit_parser.add_argument('--output', type=str, default='report')
+  submit_parser.add_argument('--formats', type=str, default=None)
+  submit_parser.add_argument('--since', type=str, default=None)
+  submit_parser.add_argument('--until', type=str, default=None)
+  submit_parser.add_argument('--records', action='store_true',
+                             help='Return the found trial records.')
+  submit_parser.add_argument(
+      '--pattern-fingerprint', type=str, default=None,
+      help=(
+          'Fail the job if the daemon parses the task with other patterns.'
+          ' (See "pattern_fingerprints" of --ping)'))
+  submit_parser.set_defaults(func=submit)
+
+  args = parser.parse_args()
+  return args.func(args)
+
+
+if __name__ == '__main__':
+  sys.exit(main())
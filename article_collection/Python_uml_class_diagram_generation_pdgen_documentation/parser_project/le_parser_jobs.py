@@ -0,0 +1,294 @@
+"""Module to run parse jobs on a pool of warm worker processes.
+
+The observers of requested tasks and headset types are built once before the
+workers are forked, which compiles all their patterns, and kept as
+prototypes. The forked workers share them copy-on-write. A job then deep
+copies the prototype instead of constructing the observer again. The compiled
+patterns are shared by the copies since `re.Pattern` is immutable.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import copy
+import dataclasses
+import importlib
+import logging
+import multiprocessing
+import os
+import time
+import traceback
+from typing import Any, Iterable
+
+import constants
+import le_audio_log_event_publisher
+import le_audio_parsing_data
+import le_log_reader
+import le_parser_registry
+from le_pattern_bundle import BUNDLE
+import le_report_export
+
+
+# Modules imported on first use by the parsing, which are imported before
+# forking so the jobs don't pay for them.
+_WARM_MODULES = ('numpy', 'le_section_stats', 'le_run_history')
+# Warm observers inherited by the forked workers. (See `JobPool`)
+_worker_observers: WarmObservers | None = None
+
+
+@dataclasses.dataclass
+class ParseJob:
+  """Request to parse a log.
+
+  Attributes:
+    input_path: Path of log to parse. Same as the logcat filename of
+      `main.py`.
+    task_num: Number of parser task. (See `le_parser_registry`)
+    headset_type: Type of headset. (See `constants.HeadsetType`)
+    output_path: File path without extension to output the reports. The raw
+      dump of format "raw" is written into "<output_path>_raw.txt".
+    formats: Comma separated report formats. e.g.: "txt,csv". Default formats
+      are used if None.
+    since: Only parses the lines from this time in format
+      "MM-DD HH:MM:SS[.ffffff]".
+    until: Only parses the lines until this time in the same format.
+    return_records: True to return the found trial records in the result.
+    pattern_fingerprint: Fingerprint of the patterns the submitter expects
+      the task to parse with. (See `WarmObservers.fingerprint_of`) The job
+      fails if the worker's patterns differ. Not checked if None.
+  """
+  input_path: str
+  task_num: int
+  headset_type: str
+  output_path: str = 'report'
+  formats: str | None = None
+  since: str | None = None
+  until: str | None = None
+  return_records: bool = False
+  pattern_fingerprint: str | None = None
+
+  @classmethod
+  def from_dict(cls, data: dict[str, Any]) -> ParseJob:
+    """Creates the job from the decoded JSON request."""
+    field_names = {field.name for field in dataclasses.fields(cls)}
+    unknown_names = set(data) - field_names
+    if unknown_names:
+      raise Exception(f'Unknown job fields: {sorted(unknown_names)}!')
+
+    return cls(**data)
+
+
+@dataclasses.dataclass
+class JobResult:
+  """Result of a parse job.
+
+  Attributes:
+    ok: True if the log is parsed and trials are found.
+    elapsed_sec: Time to run the job in the worker.
+    found_num: Number of found trials.
+    drop_num: Number of dropped trials.
+    report_paths: Paths of the output reports.
+    records: Found trial records (See `le_report_export.to_trial_record`)
+      if requested.
+    error: Error message if the job failed.
+    output: Compact output of the job if requested by `run_job`. The records
+      don't keep their raw log lines. Only for callers in Python since it
+      is not JSON serializable.
+  """
+  ok: bool = False
+  elapsed_sec: float = 0.0
+  found_num: int = 0
+  drop_num: int = 0
+  report_paths: list[str] = dataclasses.field(default_factory=list)
+  records: list[dict[str, Any]] | None = None
+  error: str | None = None
+  output: le_audio_parsing_data.CollectOutputResult | None = None
+
+
+class WarmObservers:
+  """Prototypes of observers created ahead of the jobs.
+
+  Attributes:
+    prototypes: Prototype observers keyed by task number and headset type.
+    fingerprints: Fingerprints of the patterns of each prototype with the
+      same keys. (See `le_pattern_bundle.PatternBundle.fingerprint_of`)
+  """
+
+  def __init__(self):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.prototypes: dict[tuple[int, constants.HeadsetType], Any] = {}
+    self.fingerprints: dict[tuple[int, constants.HeadsetType], str] = {}
+
+  def preload(self, task_nums: Iterable[int],
+              headset_types: Iterable[constants.HeadsetType]) -> None:
+    """Creates the prototypes of the given tasks and headset types.
+
+    The observers failing to be created are skipped. Their jobs will fail
+    with the same error. The headset types not supported by the task are
+    skipped as well.
+    """
+    headset_types = list(headset_types)
+    for task_num in task_nums:
+      for headset_type in headset_types:
+        try:
+          if le_parser_registry.get_task(task_num).supports(headset_type):
+            self._prototype(task_num, headset_type)
+        except Exception as ex:
+          self.log.warning(
+              'Failed to preload task=%s; headset=%s: %s', task_num,
+              headset_type.value, ex)
+
+    self.log.info(
+        'Preloaded %s observer(s) with %s compiled pattern(s) (bundle %s)',
+        len(self.prototypes), len(BUNDLE), BUNDLE.fingerprint()[:12])
+
+  def _prototype(self, task_num: int, headset_type: constants.HeadsetType):
+    key = (task_num, headset_type)
+    if key not in self.prototypes:
+      with BUNDLE.record() as pattern_keys:
+        self.prototypes[key] = le_parser_registry.get_task(
+            task_num).create_observer(headset_type)
+      self.fingerprints[key] = BUNDLE.fingerprint_of(pattern_keys)
+
+    return self.prototypes[key]
+
+  def fingerprint_of(self, task_num: int,
+                     headset_type: constants.HeadsetType) -> str:
+    """Gets the fingerprint of the patterns the task parses with.
+
+    Unlike the fingerprint of whole bundle, it only depends on the patterns
+    of the task, so processes preloading different tasks can compare it.
+    """
+    self._prototype(task_num, headset_type)
+    return self.fingerprints[(task_num, headset_type)]
+
+  def create(self, task_num: int, headset_type: constants.HeadsetType):
+    """Creates a fresh observer by copying the prototype."""
+    return copy.deepcopy(self._prototype(task_num, headset_type))
+
+
+def run_job(job: ParseJob, observers: WarmObservers,
+            keep_output: bool = False) -> JobResult:
+  """Parses the log of the job in current process.
+
+  Args:
+    job: The job to run.
+    observers: Warm observers to create the observer of the job.
+    keep_output: True to keep the output in the result. The records don't
+      keep their matched lines which are written into the reports already.
+  """
+  started_time = time.perf_counter()
+  result = JobResult()
+  publisher = le_audio_log_event_publisher.LogEventPublisher(
+      formats=constants.ReportFormat.from_str_list(job.formats),
+      keep_raw_data=False,
+      # Concurrent jobs must not share the raw dump in `/tmp`.
+      raw_data_file_path=f'{job.output_path}_raw.txt')
+  try:
+    headset_type = constants.HeadsetType.from_str(job.headset_type)
+    observer = observers.create(job.task_num, headset_type)
+    if job.pattern_fingerprint:
+      fingerprint = observers.fingerprint_of(job.task_num, headset_type)
+      if fingerprint != job.pattern_fingerprint:
+        raise Exception(
+            f'Patterns of task {job.task_num} differ from the submitter:'
+            f' fingerprint {fingerprint[:12]} !='
+            f' {job.pattern_fingerprint[:12]}!')
+
+    publisher.register_observer(observer)
+    publisher.start_to_search(
+        job.input_path, output_file_path=job.output_path,
+        since=le_log_reader.parse_log_time(job.since) if job.since else None,
+        until=le_log_reader.parse_log_time(job.until) if job.until else None)
+    result.ok = True
+  except Exception as ex:
+    result.error = f'{ex.__class__.__name__}: {ex}'
+    logging.getLogger(__name__).debug(traceback.format_exc())
+
+  result.found_num = len(publisher.output.collection)
+  result.drop_num = publisher.output.drop_num
+  result.report_paths = [
+      os.path.abspath(file_path) for file_path in publisher.report_file_paths]
+  if (constants.ReportFormat.RAW in publisher.formats and
+      os.path.isfile(publisher.raw_data_file_path)):
+    result.report_paths.append(os.path.abspath(publisher.raw_data_file_path))
+  if job.return_records:
+    result.records = [
+        le_report_export.to_trial_record(output_result)
+        for output_result in publisher.output.collection]
+  if keep_output:
+    result.output = publisher.output
+
+  result.elapsed_sec = time.perf_counter() - started_time
+  return result
+
+
+def _run_worker_job(job: ParseJob, keep_output: bool) -> JobResult:
+  return run_job(job, _worker_observers, keep_output=keep_output)
+
+
+class JobPool:
+  """Pool of worker processes with warm observers.
+
+  Attributes:
+    worker_num: Number of worker processes.
+    task_nums: Tasks preloaded by each worker.
+    headset_types: Headset types preloaded by each worker.
+  """
+
+  def __init__(self, worker_num: int | None = None,
+               task_nums: Iterable[int] | None = None,
+               headset_types: Iterable[constants.HeadsetType] | None = None):
+    """Starts the workers.
+
+    Args:
+      worker_num: Number of worker processes. CPU count if None.
+      task_nums: Tasks to preload. All tasks if None. Other tasks are still
+        loaded on the first job.
+      headset_types: Headset types to preload. All types if None.
+    """
+    self.worker_num = worker_num or os.cpu_count() or 1
+    self.task_nums = list(
+        le_parser_registry.tasks() if task_nums is None else task_nums)
+    self.headset_types = list(
+        constants.HeadsetType if headset_types is None else headset_types)
+    self.log = logging.getLogger(self.__class__.__name__)
+    for module_name in _WARM_MODULES:
+      importlib.import_module(module_name)
+
+    global _worker_observers
+    _worker_observers = WarmObservers()
+    _worker_observers.preload(self.task_nums, self.headset_types)
+    self._executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=self.worker_num,
+        # Forked workers inherit the imported modules and the prototypes.
+        mp_context=multiprocessing.get_context('fork'))
+    # Starts all workers now so the first jobs don't wait for the fork.
+    concurrent.futures.wait([
+        self._executor.submit(time.sleep, 0)
+        for _ in range(self.worker_num)])
+    self.log.info(
+        'Started %s worker(s) with task(s) %s', self.worker_num,
+        self.task_nums)
+
+  def fingerprints(self) -> dict[str, str]:
+    """Gets the pattern fingerprints of the preloaded tasks.
+
+    Returns:
+      Fingerprints keyed by "<task number>/<headset type>".
+    """
+    return {
+        f'{task_num}/{headset_type.value}': fingerprint
+        for (task_num, headset_type), fingerprint in (
+            _worker_observers.fingerprints.items())}
+
+  def submit(self, job: ParseJob,
+             keep_output: bool = False) -> concurrent.futures.Future:
+    """Submits the job. The future returns `JobResult`."""
+    return self._executor.submit(_run_worker_job, job, keep_output)
+
+  def run(self, job: ParseJob, keep_output: bool = False) -> JobResult:
+    """Runs the job and waits for its result."""
+    return self.submit(job, keep_output=keep_output).result()
+
+  def shutdown(self) -> None:
+    self._executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,259 @@
+"""Registry of parser tasks with lazy loading of observers.
+
+Observers declare their task by decorator:
+
+  @le_parser_registry.register_task(
+      1, 'Generic: Pair and connection',
+      category=le_parser_registry.CATEGORY_CONNECTION)
+  class PairPattern(LeAudioLogObserver):
+    ...
+
+The decorators are found by parsing the source of observer packages with
+`ast` instead of importing them. Thus all tasks can be listed at startup while
+the module of an observer is only imported when its task is selected. The
+index of tasks is cached in temporary folder, one file per project folder and
+interpreter, and rebuilt when any module of the packages is changed.
+"""
+from __future__ import annotations
+
+import ast
+import dataclasses
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Callable
+
+import constants
+
+
+CATEGORY_CONNECTION = 'Performance - Connection'
+CATEGORY_CONTROL = 'Performance - Media/Call control'
+CATEGORY_CONTENT_SWITCH = 'Performance - Content type switching'
+CATEGORY_PATH_SWITCH = 'Performance - Audio path switching'
+CATEGORY_MULTI_CONNECTION = (
+    'Performance - Multi-connections with BR/EDR device')
+CATEGORY_OTHERS = 'Others'
+# Order of categories in the menu.
+CATEGORIES = (
+    CATEGORY_CONNECTION, CATEGORY_CONTROL, CATEGORY_CONTENT_SWITCH,
+    CATEGORY_PATH_SWITCH, CATEGORY_MULTI_CONNECTION, CATEGORY_OTHERS)
+# Packages scanned for the observers declaring tasks.
+PLUGIN_PACKAGES = ('observer',)
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Keyed by project folder and interpreter so that checkouts and virtual
+# environments sharing the temporary folder don't overwrite each other's index.
+_INDEX_CACHE_PATH = os.path.join(
+    tempfile.gettempdir(),
+    'le_parser_task_index_{}.json'.format(hashlib.sha1(
+        f'{_PROJECT_DIR}\0{sys.executable}\0{sys.version}'.encode()
+    ).hexdigest()[:16]))
+_DECORATOR_NAME = 'register_task'
+
+# Tasks registered by the decorator of imported observers.
+_registered_tasks: dict[int, LEParserTask] = {}
+# Tasks found by scanning the plugin packages.
+_indexed_tasks: dict[int, LEParserTask] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class LEParserTask:
+  """Parser task.
+
+  Attributes:
+    task_id: Number of the task.
+    observer_path: Observer class in format "<module>:<class>".
+    description: Description of the task.
+    category: Category of the task in the menu.
+    headset_types: Supported headset types. (See `constants.HeadsetType`)
+      All types are supported if None.
+  """
+  task_id: int
+  observer_path: str
+  description: str
+  category: str = CATEGORY_OTHERS
+  headset_types: tuple[str, ...] | None = None
+
+  @property
+  def observer_cls(self) -> type:
+    """Imports the module of observer and gets the class."""
+    module_name, _, class_name = self.observer_path.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+  def supports(self, headset_type: constants.HeadsetType | str) -> bool:
+    return (
+        self.headset_types is None or
+        getattr(headset_type, 'value', headset_type) in self.headset_types)
+
+  def create_observer(self, headset_type: constants.HeadsetType):
+    """Creates the observer of the task for the headset type."""
+    if not self.supports(headset_type):
+      raise Exception(
+          f'Task {self.task_id} does not support headset={headset_type.value}!'
+          f' (Supported: {", ".join(self.headset_types)})')
+
+    observer = self.observer_cls()
+    observer.lea_config = constants.LEAConfig.from_headset_type(headset_type)
+    observer.task_num = self.task_id
+    return observer
+
+
+def register_task(
+    task_id: int, description: str, category: str = CATEGORY_OTHERS,
+    headset_types: tuple[str, ...] | None = None) -> Callable[[type], type]:
+  """Decorator to register the decorated observer class as parser task.
+
+  The arguments must be literals or the constants of this module, so they can
+  be read from the source without importing the observer.
+  """
+
+  def decorate_cls(cls: type) -> type:
+    task = LEParserTask(
+        task_id=task_id, observer_path=f'{cls.__module__}:{cls.__qualname__}',
+        description=description, category=category,
+        headset_types=tuple(headset_types) if headset_types else None)
+    registered_task = _registered_tasks.get(task_id)
+    if registered_task and registered_task.observer_path != task.observer_path:
+      raise Exception(
+          f'Task {task_id} is registered by {registered_task.observer_path}'
+          ' already!')
+
+    _registered_tasks[task_id] = task
+    return cls
+
+  return decorate_cls
+
+
+def _eval_arg(node: ast.expr) -> Any:
+  """Evaluates literal or the name of constant in this module."""
+  if isinstance(node, ast.Attribute):
+    return getattr(sys.modules[__name__], node.attr)
+
+  if isinstance(node, ast.Name):
+    return getattr(sys.modules[__name__], node.id)
+
+  return ast.literal_eval(node)
+
+
+def _is_register_decorator(node: ast.expr) -> bool:
+  func = node.func if isinstance(node, ast.Call) else None
+  return (
+      (isinstance(func, ast.Attribute) and func.attr == _DECORATOR_NAME) or
+      (isinstance(func, ast.Name) and func.id == _DECORATOR_NAME))
+
+
+def scan_module(file_path: str, module_name: str) -> list[LEParserTask]:
+  """Finds the tasks declared in the module by parsing its source."""
+  with open(file_path, encoding='utf-8') as fo:
+    tree = ast.parse(fo.read(), filename=file_path)
+
+  tasks = []
+  for node in tree.body:
+    if not isinstance(node, ast.ClassDef):
+      continue
+
+    for decorator in filter(_is_register_decorator, node.decorator_list):
+      arg_names = ('task_id', 'description', 'category', 'headset_types')
+      kwargs = dict(zip(arg_names, map(_eval_arg, decorator.args)))
+      kwargs.update({
+          keyword.arg: _eval_arg(keyword.value)
+          for keyword in decorator.keywords})
+      if kwargs.get('headset_types'):
+        kwargs['headset_types'] = tuple(kwargs['headset_types'])
+
+      tasks.append(LEParserTask(
+          observer_path=f'{module_name}:{node.name}', **kwargs))
+
+  return tasks
+
+
+def _package_sources() -> dict[str, int]:
+  """Gets the modules of plugin packages with their modification time."""
+  sources = {}
+  for package in PLUGIN_PACKAGES:
+    package_dir = os.path.join(_PROJECT_DIR, *package.split('.'))
+    for file_name in sorted(os.listdir(package_dir)):
+      if file_name.endswith('.py') and file_name != '__init__.py':
+        file_path = os.path.join(package_dir, file_name)
+        sources[file_path] = os.stat(file_path).st_mtime_ns
+
+  return sources
+
+
+def _load_index() -> dict[int, LEParserTask]:
+  """Loads the index from cache or rebuilds it by scanning the packages."""
+  log = logging.getLogger(__name__)
+  sources = _package_sources()
+  try:
+    with open(_INDEX_CACHE_PATH) as fo:
+      cache = json.load(fo)
+
+    if cache['sources'] == sources:
+      return {
+          task['task_id']: LEParserTask(**{
+              **task,
+              'headset_types': (
+                  tuple(task['headset_types']) if task['headset_types']
+                  else None)})
+          for task in cache['tasks']}
+  except (OSError, ValueError, KeyError, TypeError):
+    pass
+
+  tasks = {}
+  for file_path in sources:
+    module_name = os.path.splitext(
+        os.path.relpath(file_path, _PROJECT_DIR))[0].replace(os.sep, '.')
+    for task in scan_module(file_path, module_name):
+      if task.task_id in tasks:
+        raise Exception(
+            f'Task {task.task_id} is declared by both'
+            f' {tasks[task.task_id].observer_path} and {task.observer_path}!')
+
+      tasks[task.task_id] = task
+
+  log.debug('Indexed %s task(s) from %s module(s)', len(tasks), len(sources))
+  # Written to a temporary file and renamed, so concurrent runs never read
+  # a partially written index.
+  tmp_path = None
+  try:
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(_INDEX_CACHE_PATH), suffix='.tmp')
+    with os.fdopen(fd, 'w') as fw:
+      json.dump(
+          {'sources': sources,
+           'tasks': [dataclasses.asdict(task) for task in tasks.values()]},
+          fw)
+    os.replace(tmp_path, _INDEX_CACHE_PATH)
+  except OSError as ex:
+    log.debug('Failed to cache task index: %s', ex)
+    if tmp_path is not None and os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+  return tasks
+
+
+def tasks() -> dict[int, LEParserTask]:
+  """Gets all tasks ordered by category and task ID."""
+  global _indexed_tasks
+  if _indexed_tasks is None:
+    _indexed_tasks = _load_index()
+
+  all_tasks = {**_indexed_tasks, **_registered_tasks}
+  return dict(sorted(
+      all_tasks.items(),
+      key=lambda item: (
+          CATEGORIES.index(item[1].category)
+          if item[1].category in CATEGORIES else len(CATEGORIES),
+          item[0])))
+
+
+def get_task(task_id: int) -> LEParserTask:
+  """Gets the task by ID without importing its observer."""
+  task = _registered_tasks.get(task_id) or tasks().get(task_id)
+  if task is None:
+    raise Exception(f'Invalid task number={task_id}!')
+
+  return task
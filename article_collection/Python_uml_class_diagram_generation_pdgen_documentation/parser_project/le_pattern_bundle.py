@@ -0,0 +1,134 @@
+"""Module to share the compiled patterns among all observers of a process.
+
+`REPattern` compiles its regular expressions through the bundle, so the same
+expression is compiled only once no matter how many observers, prototypes or
+jobs use it. Unlike the cache of `re` which holds 512 entries at most, the
+bundle never evicts, so hundreds of patterns of all tasks stay compiled.
+
+`GroupREPattern` borrows the compiled patterns of other pattern classes from
+the bundle instead of instantiating those classes every time.
+
+Compiled patterns can't be saved to disk (pickling `re.Pattern` compiles it
+again on loading), so the bundle is shared in memory: the parent process
+builds it before forking the workers of parallel modes, which inherit it.
+The fingerprint of the patterns recorded while building an observer (See
+`PatternBundle.record`) identifies what the observer parses with, so
+processes which build their bundles separately (e.g. the coordinator and the
+workers of `le_parser_cluster` on other machines) can check they parse a task
+with the same patterns. (See `le_parser_jobs.WarmObservers.fingerprint_of`)
+The fingerprint of whole bundle depends on which observers were built, so it
+is only for logging.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import re
+import sys
+from typing import Any, Iterable, Iterator
+
+# Version of the bundle format. Bump it if the way of compiling is changed.
+BUNDLE_VERSION = 1
+
+
+class PatternBundle:
+  """Compiled patterns keyed by expression and flags.
+
+  Attributes:
+    hit_num: Number of compilations served by the bundle.
+  """
+
+  def __init__(self):
+    self._patterns: dict[tuple[str, int], re.Pattern] = {}
+    # Compiled patterns and their keys of each pattern class.
+    self._class_patterns: dict[
+        type, tuple[list[re.Pattern], set[tuple[str, int]]]] = {}
+    # Keys requested in the context of `record`. None if not recording.
+    self._recorded_keys: set[tuple[str, int]] | None = None
+    self.hit_num = 0
+
+  def __len__(self) -> int:
+    return len(self._patterns)
+
+  def compile(self, pattern: str | re.Pattern, flags: int = 0) -> re.Pattern:
+    """Gets the compiled pattern shared in the bundle."""
+    if isinstance(pattern, re.Pattern):
+      return pattern
+
+    key = (pattern, flags)
+    if self._recorded_keys is not None:
+      self._recorded_keys.add(key)
+
+    compiled_pattern = self._patterns.get(key)
+    if compiled_pattern is None:
+      compiled_pattern = self._patterns[key] = re.compile(pattern, flags)
+    else:
+      self.hit_num += 1
+
+    return compiled_pattern
+
+  def patterns_of(self, pattern_cls: type) -> list[re.Pattern]:
+    """Gets the compiled patterns of the pattern class.
+
+    The class is instantiated only at the first time.
+    """
+    class_patterns = self._class_patterns.get(pattern_cls)
+    if class_patterns is None:
+      with self.record() as keys:
+        patterns = list(pattern_cls()._patterns)
+      class_patterns = self._class_patterns[pattern_cls] = (patterns, keys)
+    elif self._recorded_keys is not None:
+      self._recorded_keys.update(class_patterns[1])
+
+    return class_patterns[0]
+
+  @contextlib.contextmanager
+  def record(self) -> Iterator[set[tuple[str, int]]]:
+    """Records the keys of all patterns requested in the context.
+
+    The patterns already compiled are recorded as well, so the recorded keys
+    don't depend on what was built before. The contexts can be nested.
+
+    Yields:
+      Set of keys (expression, flags) filled in the context.
+    """
+    outer_keys = self._recorded_keys
+    keys = self._recorded_keys = set()
+    try:
+      yield keys
+    finally:
+      self._recorded_keys = outer_keys
+      if outer_keys is not None:
+        outer_keys.update(keys)
+
+  @staticmethod
+  def fingerprint_of(keys: Iterable[tuple[str, int]]) -> str:
+    """Gets the fingerprint of the patterns and Python version."""
+    sha1 = hashlib.sha1(
+        f'{BUNDLE_VERSION}/{sys.version_info[:2]}'.encode())
+    for pattern, flags in sorted(keys):
+      sha1.update(f'{flags}:{pattern}\0'.encode())
+
+    return sha1.hexdigest()
+
+  def fingerprint(self) -> str:
+    """Gets the fingerprint of the bundle content and Python version."""
+    return self.fingerprint_of(self._patterns)
+
+  def info(self) -> dict[str, Any]:
+    """Gets the summary of the bundle."""
+    return {
+        'version': BUNDLE_VERSION,
+        'pattern_num': len(self._patterns),
+        'hit_num': self.hit_num,
+        'fingerprint': self.fingerprint(),
+    }
+
+  def clear(self) -> None:
+    self._patterns.clear()
+    self._class_patterns.clear()
+    self.hit_num = 0
+
+
+# Bundle shared by all patterns of the process.
+BUNDLE = PatternBundle()
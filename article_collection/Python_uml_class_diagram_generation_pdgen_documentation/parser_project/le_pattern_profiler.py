@@ -0,0 +1,138 @@
+"""Module to profile the hit count and cost of log patterns.
+
+The profiler replaces the `search` method of each registered pattern object
+with a timed wrapper. Nothing is wrapped when the profiler is disabled, so the
+search path costs nothing extra by default.
+"""
+from __future__ import annotations
+
+import dataclasses
+import json
+import logging
+import os
+import time
+from typing import Any
+
+import constants
+import general_data
+
+
+@dataclasses.dataclass
+class PatternStats:
+  """Profiling statistics of a single pattern.
+
+  Attributes:
+    name: Name of the pattern as "<state>:<pattern class>".
+    regexes: Regular expressions of the pattern.
+    eval_num: Number of evaluated lines.
+    hit_num: Number of matched lines.
+    total_sec: Cumulative search time in seconds.
+    worst_sec: Longest search time of a single line in seconds.
+    worst_line: The line which took the longest search time.
+  """
+  name: str
+  regexes: list[str] = dataclasses.field(default_factory=list)
+  eval_num: int = 0
+  hit_num: int = 0
+  total_sec: float = 0.0
+  worst_sec: float = 0.0
+  worst_line: str | None = None
+
+  @property
+  def avg_usec(self) -> float:
+    return self.total_sec / self.eval_num * 1e6 if self.eval_num else 0.0
+
+
+def is_enabled_by_env() -> bool:
+  return os.environ.get(constants.ENV_PATTERN_PROFILE, '0') == '1'
+
+
+class PatternProfiler:
+  """Profiler to collect the cost of each pattern in search path.
+
+  Attributes:
+    stats: Statistics of instrumented patterns keyed by pattern name.
+  """
+
+  def __init__(self):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.stats: dict[str, PatternStats] = {}
+    self._instrumented_patterns: list[general_data.Pattern] = []
+
+  def instrument(self, log_pattern_dict: dict[Any, general_data.Pattern]):
+    """Wraps the `search` method of given patterns with timing."""
+    for state, pattern in log_pattern_dict.items():
+      if isinstance(pattern, str) or 'search' in vars(pattern):
+        continue
+
+      name = f'{getattr(state, "name", state)}:{pattern.__class__.__name__}'
+      stats = self.stats.setdefault(
+          name,
+          PatternStats(
+              name=name,
+              regexes=[
+                  regex.pattern
+                  for regex in getattr(pattern, '_patterns', [])]))
+      pattern.search = self._timed_search(pattern.search, stats)
+      self._instrumented_patterns.append(pattern)
+
+  @staticmethod
+  def _timed_search(search_func, stats: PatternStats):
+    def timed_search(line: str):
+      start_time = time.perf_counter()
+      mth = search_func(line)
+      cost_sec = time.perf_counter() - start_time
+      stats.eval_num += 1
+      stats.total_sec += cost_sec
+      if mth is not None:
+        stats.hit_num += 1
+
+      if cost_sec > stats.worst_sec:
+        stats.worst_sec = cost_sec
+        stats.worst_line = str(line).rstrip('\n')
+
+      return mth
+
+    return timed_search
+
+  def uninstrument(self) -> None:
+    """Restores the original `search` method of instrumented patterns."""
+    for pattern in self._instrumented_patterns:
+      del pattern.search
+
+    self._instrumented_patterns = []
+
+  def sorted_stats(self) -> list[PatternStats]:
+    """Gets the statistics sorted by cumulative time in descending order."""
+    return sorted(
+        self.stats.values(), key=lambda stats: stats.total_sec, reverse=True)
+
+  def summary_table(self) -> str:
+    total_sec = sum(stats.total_sec for stats in self.stats.values())
+    lines = [
+        f'{"Pattern":<48} {"Evals":>10} {"Hits":>8} {"Total(ms)":>10} '
+        f'{"Share":>6} {"Avg(us)":>8} {"Worst(us)":>10}']
+    for stats in self.sorted_stats():
+      share = stats.total_sec / total_sec * 100 if total_sec else 0
+      lines.append(
+          f'{stats.name[:48]:<48} {stats.eval_num:>10} {stats.hit_num:>8} '
+          f'{stats.total_sec * 1e3:>10.2f} {share:>5.1f}% '
+          f'{stats.avg_usec:>8.2f} {stats.worst_sec * 1e6:>10.1f}')
+
+    return '\n'.join(lines)
+
+  def save_json(self, file_path: str) -> None:
+    with open(file_path, 'w') as fw:
+      json.dump(
+          [dataclasses.asdict(stats) for stats in self.sorted_stats()],
+          fw, indent=2)
+
+  def report(self, output_file_path: str) -> None:
+    """Logs the summary table and writes the profile into JSON file."""
+    if not self.stats:
+      return
+
+    json_file_path = f'{output_file_path}_pattern_profile.json'
+    self.log.info('Pattern profile:\n%s', self.summary_table())
+    self.log.info('Output pattern profile to %s...', json_file_path)
+    self.save_json(json_file_path)
@@ -8,6 +8,8 @@ from constants import Color
 import general_data
 import le_audio_constants
 import le_audio_parsing_data
+import le_log_reader
+from le_pattern_bundle import BUNDLE
 
 
 Log = general_data.Log
@@ -29,11 +31,11 @@ class REPattern(general_data.Pattern):
     self._ever_match = False
     self._match_count = 0
     self._cached_count = 0
-    self._patterns: list[re.Pattern] = []
+    # Compiled patterns are shared by all patterns in process.
     if isinstance(patterns, str):
-      self._patterns.append(re.compile(patterns))
+      self._patterns: list[re.Pattern] = [BUNDLE.compile(patterns)]
     else:
-      self._patterns = [re.compile(pattern) for pattern in patterns]
+      self._patterns = [BUNDLE.compile(pattern) for pattern in patterns]
 
     self._message = message
     self._timestamp = None
@@ -84,7 +86,7 @@ class REPattern(general_data.Pattern):
     mth = self.search(line)
     if mth:
       cached_output.raw_data.append(
-          Log(timestamp=self.timestamp, message=mth.group('log')))
+          le_log_reader.to_log(self.timestamp, mth))
 
       if self.reset_signal or state == _PatternEnum.RESET:
         if not reset_func:
@@ -199,14 +201,27 @@ class GroupREPattern(REPattern):
       reset_signal: bool = False):
     _patterns: list[re.Pattern] = []
     for pattern_cls in pattern_cls_list:
-      pttern_obj = pattern_cls()
-      _patterns.extend(pttern_obj._patterns)
+      _patterns.extend(BUNDLE.patterns_of(pattern_cls))
 
     super().__init__(
         patterns=_patterns, message=message, is_state=is_state,
         round_check=round_check, is_optional=is_optional, reset_signal=reset_signal)
 
 
+class GeneralLogError(REPattern):
+  """Error logs of Bluetooth stack which are reported by all observers.
+
+  It is optional since a log without errors is expected.
+  """
+
+  def __init__(self):
+    super().__init__(
+        patterns=(
+            r'(?P<time>\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})\s+\d+\s+\d+ E '
+            r'(?P<log>bt_\w+\s*:.*)'),
+        is_optional=True)
+
+
 
 class UserClickToConnectLe_v3(REPattern):
   pass
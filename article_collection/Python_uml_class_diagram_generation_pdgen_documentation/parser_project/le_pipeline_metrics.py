@@ -0,0 +1,174 @@
+"""Module to collect the stage timing and throughput of parsing pipeline."""
+from __future__ import annotations
+
+import json
+import logging
+import sys
+import time
+from datetime import timedelta
+
+import constants
+
+try:
+  import resource
+except ImportError:
+  # Not available on Windows.
+  resource = None
+
+
+# Minimum interval in seconds between two progress lines.
+PROGRESS_INTERVAL_SEC = 10.0
+# Number of lines between two checks of progress interval.
+_PROGRESS_CHECK_LINES = 4096
+
+
+class Stage(constants.StrEnum):
+  """Stages of the parsing pipeline."""
+  # Reading lines from log file or device.
+  READ = 'read'
+  # Decoding bytes into lines.
+  DECODE = 'decode'
+  # Pattern matching and state machine of observer.
+  MATCH = 'match'
+  # Writing records into reports.
+  REPORT = 'report'
+
+
+def peak_rss_mb() -> float | None:
+  """Gets the peak resident set size of this process in MB."""
+  if resource is None:
+    return None
+
+  max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # The unit is byte on macOS and KB on Linux.
+  return max_rss / 1024 / 1024 if sys.platform == 'darwin' else max_rss / 1024
+
+
+class PipelineMetrics:
+  """Metrics of a single parsing run.
+
+  The wall time of each stage is accumulated by `lap`, which charges the time
+  since the previous lap to the given stage. The CPU time is collected per
+  phase by `start_phase`/`end_phase` since reading CPU clock per line is too
+  expensive.
+
+  Attributes:
+    total_bytes: Size of the input in bytes. None if unknown. (e.g. logcat
+      from device)
+    stage_sec: Accumulated wall time in seconds of each stage.
+    phase_cpu_sec: CPU time in seconds of each phase.
+    line_num: Number of processed lines.
+    byte_num: Number of processed bytes.
+    hit_num: Number of pattern hits.
+    record_num: Number of found records.
+  """
+
+  def __init__(self, total_bytes: int | None = None,
+               progress_interval_sec: float = PROGRESS_INTERVAL_SEC):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.total_bytes = total_bytes
+    self.stage_sec: dict[Stage, float] = dict.fromkeys(Stage, 0.0)
+    self.phase_cpu_sec: dict[str, float] = {}
+    self.line_num = 0
+    self.byte_num = 0
+    self.hit_num = 0
+    self.record_num = 0
+    self._progress_interval_sec = progress_interval_sec
+    self._start_time = time.perf_counter()
+    self._end_time: float | None = None
+    self._last_lap_time = self._start_time
+    self._last_progress_time = self._start_time
+    self._phase_2_cpu_start: dict[str, float] = {}
+
+  @property
+  def elapsed_sec(self) -> float:
+    return (self._end_time or time.perf_counter()) - self._start_time
+
+  def lap(self, stage: Stage) -> None:
+    """Charges the wall time since the previous lap to the given stage."""
+    now = time.perf_counter()
+    self.stage_sec[stage] += now - self._last_lap_time
+    self._last_lap_time = now
+
+  def count_line(self, byte_num: int) -> None:
+    """Counts a processed line and logs the progress periodically."""
+    self.line_num += 1
+    self.byte_num += byte_num
+    if self.line_num % _PROGRESS_CHECK_LINES == 0:
+      now = time.perf_counter()
+      if now - self._last_progress_time >= self._progress_interval_sec:
+        self._last_progress_time = now
+        self.log.info(self.progress_summary())
+
+  def start_phase(self, phase: str) -> None:
+    self._phase_2_cpu_start[phase] = time.process_time()
+
+  def end_phase(self, phase: str) -> None:
+    self.phase_cpu_sec[phase] = (
+        self.phase_cpu_sec.get(phase, 0.0) +
+        time.process_time() - self._phase_2_cpu_start.pop(phase))
+
+  def finish(self) -> None:
+    self._end_time = time.perf_counter()
+
+  def progress_summary(self) -> str:
+    elapsed_sec = self.elapsed_sec
+    lines_per_sec = self.line_num / elapsed_sec if elapsed_sec else 0
+    if not self.total_bytes:
+      return (
+          f'Progress: {self.line_num} lines, {lines_per_sec:.0f} lines/s')
+
+    ratio = min(self.byte_num / self.total_bytes, 1.0)
+    eta_sec = elapsed_sec / ratio - elapsed_sec if ratio else 0
+    return (
+        f'Progress: {ratio * 100:.1f}% ({self.byte_num}/{self.total_bytes} '
+        f'bytes), {lines_per_sec:.0f} lines/s, '
+        f'ETA {timedelta(seconds=round(eta_sec))}')
+
+  def to_dict(self) -> dict[str, object]:
+    elapsed_sec = self.elapsed_sec
+    return {
+        'elapsed_sec': elapsed_sec,
+        'stage_sec': {
+            stage.value: stage_sec
+            for stage, stage_sec in self.stage_sec.items()},
+        'phase_cpu_sec': self.phase_cpu_sec,
+        'line_num': self.line_num,
+        'byte_num': self.byte_num,
+        'hit_num': self.hit_num,
+        'record_num': self.record_num,
+        'lines_per_sec': self.line_num / elapsed_sec if elapsed_sec else 0,
+        'bytes_per_sec': self.byte_num / elapsed_sec if elapsed_sec else 0,
+        'hits_per_1k_lines': (
+            self.hit_num / self.line_num * 1000 if self.line_num else 0),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+  def summary(self) -> str:
+    metrics = self.to_dict()
+    lines = [
+        f'Elapsed {metrics["elapsed_sec"]:.2f}s for {self.line_num} lines '
+        f'({self.byte_num} bytes), {self.hit_num} pattern hits, '
+        f'{self.record_num} records']
+    for stage, stage_sec in self.stage_sec.items():
+      share = (
+          stage_sec / metrics['elapsed_sec'] * 100
+          if metrics['elapsed_sec'] else 0)
+      lines.append(f'  {stage.value:<8} {stage_sec:>10.3f}s {share:>5.1f}%')
+
+    for phase, cpu_sec in self.phase_cpu_sec.items():
+      lines.append(f'  CPU of {phase}: {cpu_sec:.3f}s')
+
+    lines.append(
+        f'  Throughput: {metrics["lines_per_sec"]:.0f} lines/s, '
+        f'{metrics["bytes_per_sec"] / 1024 / 1024:.2f} MB/s')
+    lines.append(
+        f'  Match density: {metrics["hits_per_1k_lines"]:.2f} hits/1k lines')
+    if metrics['peak_rss_mb'] is not None:
+      lines.append(f'  Peak RSS: {metrics["peak_rss_mb"]:.1f} MB')
+
+    return '\n'.join(lines)
+
+  def save_json(self, file_path: str) -> None:
+    with open(file_path, 'w') as fw:
+      json.dump(self.to_dict(), fw, indent=2)
@@ -0,0 +1,82 @@
+"""Module to hold the append-only sink of matched raw lines."""
+from __future__ import annotations
+
+import collections
+import logging
+from typing import Iterator, TextIO
+
+
+# Number of recent raw hits kept in memory for context.
+DEFAULT_RING_SIZE = 256
+# Size of write buffer in bytes before the raw hits are flushed to disk.
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class RawHitSink:
+  """Append-only sink of raw lines which match the log patterns.
+
+  The raw hits are streamed into the spill file with buffered writes and only
+  the most recent hits are kept in memory. Thus the memory usage is constant
+  no matter how long the parsing session runs.
+
+  Attributes:
+    file_path: Path of the spill file. None if the sink is not opened and only
+      the recent hits are kept.
+    recent: Ring of the most recent raw hits.
+    hit_num: Number of raw hits appended so far.
+  """
+
+  def __init__(self, ring_size: int = DEFAULT_RING_SIZE,
+               buffer_size: int = DEFAULT_BUFFER_SIZE):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.file_path: str | None = None
+    self.recent: collections.deque[str] = collections.deque(maxlen=ring_size)
+    self.hit_num = 0
+    self._buffer_size = buffer_size
+    self._fw: TextIO | None = None
+
+  def open(self, file_path: str) -> None:
+    """Opens the spill file. The existing content will be truncated."""
+    self.close()
+    self.log.info('Output collection of captured message to %s...', file_path)
+    self.file_path = file_path
+    self._fw = open(
+        file_path, 'w', buffering=self._buffer_size, encoding='utf-8')
+
+  def append(self, raw_hit: str) -> None:
+    """Appends a raw hit."""
+    self.hit_num += 1
+    self.recent.append(raw_hit)
+    if self._fw is not None:
+      self._fw.write(f'{raw_hit}\n')
+
+  def flush(self) -> None:
+    if self._fw is not None:
+      self._fw.flush()
+
+  def close(self) -> None:
+    if self._fw is not None:
+      self._fw.close()
+      self._fw = None
+
+  def __len__(self) -> int:
+    return self.hit_num
+
+  def __iter__(self) -> Iterator[str]:
+    """Iterates all raw hits from the spill file.
+
+    Only the recent hits are iterated if the spill file is never opened.
+    """
+    if self.file_path is None:
+      yield from list(self.recent)
+      return
+
+    self.flush()
+    with open(self.file_path, 'r', encoding='utf-8') as fo:
+      for line in fo:
+        yield line.rstrip('\n')
+
+  def __deepcopy__(self, memo) -> RawHitSink:
+    # The opened spill file can't be copied. Hands over a fresh sink instead.
+    return RawHitSink(
+        ring_size=self.recent.maxlen, buffer_size=self._buffer_size)
@@ -0,0 +1,456 @@
+"""Module to detect regressions of durations between two sets of runs.
+
+The durations of a baseline and a candidate (e.g. two builds) are grouped by
+task and headset type, then all groups are compared at once:
+  - Mann-Whitney U test (normal approximation with tie correction) on the
+    whole distributions.
+  - Deltas of P50 and P95.
+  - KPI check against the pass criteria stored with the trials, which are
+    the thresholds of `le_audio_constants` used by the observers, and against
+    the pass rates.
+
+The ranks, percentiles and test statistics of all groups are calculated by
+vectorized operations over the concatenated samples, so hundreds of groups
+are compared in one pass. The only exception is the p-values: without scipy,
+`math.erfc` is applied to the z-scores by a Python loop over the groups.
+
+Usage:
+  # Compares two builds recorded in the run history. (See `le_run_history`)
+  $ python le_regression_check.py --db history.db \\
+      --baseline-build A --candidate-build B
+
+  # Compares the columnar reports. The groups are the titles of records.
+  $ python le_regression_check.py \\
+      --baseline-files base1.npz base2.npz --candidate-files cand.npz
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import datetime
+import json
+import math
+import sys
+
+import numpy as np
+
+try:
+  from scipy import special
+except ImportError:
+  # Optional. `_erfc` falls back to a Python loop.
+  special = None
+
+import le_report_export
+import le_run_history
+import le_section_stats
+
+
+DEFAULT_ALPHA = 0.01
+# Tolerance of floating point error when comparing the ratios.
+_EPSILON = 1e-9
+# Minimum relative increase of P50 or P95 to report a regression.
+DEFAULT_MIN_DELTA_RATIO = 0.05
+# Maximum allowed drop of pass rate.
+DEFAULT_MAX_PASS_RATE_DROP = 0.05
+# Vectorized erfc of scipy if available. Otherwise `np.frompyfunc`, which
+# calls `math.erfc` once per element in a Python loop (one call per group).
+if special is not None:
+  _erfc = special.erfc
+else:
+  _erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+@dataclasses.dataclass
+class Samples:
+  """Durations of trials labeled by group.
+
+  Attributes:
+    groups: Group of each trial. e.g. "task1/Sony"
+    durations: Duration of each trial in seconds.
+    passed: Pass flag of each trial. (See `le_report_export.PASS_FLAG_UNKNOWN`)
+    pass_criteria_sec: Pass criteria of each trial. NaN if unknown.
+  """
+  groups: np.ndarray
+  durations: np.ndarray
+  passed: np.ndarray
+  pass_criteria_sec: np.ndarray
+
+  def valid(self) -> Samples:
+    """Gets the samples having duration."""
+    mask = ~np.isnan(self.durations)
+    return Samples(
+        groups=self.groups[mask], durations=self.durations[mask],
+        passed=self.passed[mask],
+        pass_criteria_sec=self.pass_criteria_sec[mask])
+
+  @classmethod
+  def from_history(
+      cls, run_history: le_run_history.RunHistory, section: str,
+      **filters) -> Samples:
+    """Loads the samples from run history grouped by task and headset.
+
+    Args:
+      run_history: The run history.
+      section: Section to compare.
+      **filters: Filters of `le_run_history.RunHistory.query_durations`.
+    """
+    columns = run_history.query_durations(section=section, **filters)
+    groups = np.char.add(
+        np.char.add('task', columns['task_num'].astype(str)),
+        np.char.add('/', columns['headset_type']))
+    return cls(
+        groups=groups, durations=columns['duration_sec'],
+        passed=columns['passed'],
+        pass_criteria_sec=columns['pass_criteria_sec'])
+
+  @classmethod
+  def from_columnar_files(cls, file_paths: list[str], section: str) -> Samples:
+    """Loads the samples from columnar reports grouped by title."""
+    groups, durations, passed, pass_criteria_sec = [], [], [], []
+    for file_path in file_paths:
+      columns = le_report_export.load_columnar(file_path)
+      matrix = le_section_stats.SectionMatrix.from_columns(columns)
+      if section not in matrix.names:
+        continue
+
+      index = matrix.names.index(section)
+      groups.append(columns['title'].astype(str))
+      durations.append(matrix.durations[:, index])
+      passed.append(matrix.passed[:, index])
+      # Reports exported before the pass criteria column have it unknown.
+      pass_criteria_column_name = (
+          'pass_criteria_sec' if section == le_section_stats.EVENT_SECTION
+          else f'{section}_pass_criteria_sec')
+      pass_criteria_sec.append(
+          columns[pass_criteria_column_name].astype(np.float64)
+          if pass_criteria_column_name in columns
+          else np.full(len(columns['title']), np.nan))
+
+    if not groups:
+      return cls(
+          groups=np.array([], dtype=str), durations=np.array([]),
+          passed=np.array([], dtype=np.int8), pass_criteria_sec=np.array([]))
+
+    return cls(
+        groups=np.concatenate(groups), durations=np.concatenate(durations),
+        passed=np.concatenate(passed),
+        pass_criteria_sec=np.concatenate(pass_criteria_sec))
+
+
+@dataclasses.dataclass
+class GroupComparison:
+  """Comparison result of a group.
+
+  Attributes:
+    group: Name of the group.
+    baseline_num: Number of baseline trials.
+    candidate_num: Number of candidate trials.
+    baseline_p50: P50 of baseline.
+    candidate_p50: P50 of candidate.
+    baseline_p95: P95 of baseline.
+    candidate_p95: P95 of candidate.
+    baseline_pass_rate: Pass rate of baseline. NaN if not judged.
+    candidate_pass_rate: Pass rate of candidate. NaN if not judged.
+    pass_criteria_sec: Pass criteria of the group. NaN if unknown.
+    p_value: Two-sided p-value of Mann-Whitney U test.
+    effect_size: Rank-biserial correlation in [-1, 1]. Positive if the
+      candidate tends to be slower.
+    slower: True if the candidate is significantly slower.
+    kpi_breach: True if the candidate newly breaks the KPI.
+  """
+  group: str
+  baseline_num: int
+  candidate_num: int
+  baseline_p50: float
+  candidate_p50: float
+  baseline_p95: float
+  candidate_p95: float
+  baseline_pass_rate: float
+  candidate_pass_rate: float
+  pass_criteria_sec: float
+  p_value: float
+  effect_size: float
+  slower: bool
+  kpi_breach: bool
+
+  @property
+  def regressed(self) -> bool:
+    return self.slower or self.kpi_breach
+
+  @property
+  def p50_delta_ratio(self) -> float:
+    return self.candidate_p50 / self.baseline_p50 - 1
+
+  @property
+  def p95_delta_ratio(self) -> float:
+    return self.candidate_p95 / self.baseline_p95 - 1
+
+
+def _group_percentiles(group_ids: np.ndarray, values: np.ndarray,
+                       group_num: int,
+                       percentiles: list[float]) -> list[np.ndarray]:
+  """Calculates percentiles of each group as `np.percentile` does."""
+  counts = np.bincount(group_ids, minlength=group_num)
+  if not len(values):
+    return [np.full(group_num, np.nan) for _ in percentiles]
+
+  sorted_values = values[np.lexsort((values, group_ids))]
+  starts = np.cumsum(counts) - counts
+  has_values = counts > 0
+  results = []
+  for percentile in percentiles:
+    position = np.maximum(counts - 1, 0) * percentile / 100
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+    lower_values = sorted_values[np.where(has_values, starts + lower, 0)]
+    upper_values = sorted_values[np.where(has_values, starts + upper, 0)]
+    results.append(np.where(
+        has_values,
+        lower_values + (position - lower) * (upper_values - lower_values),
+        np.nan))
+
+  return results
+
+
+def _group_pass_rates(group_ids: np.ndarray, passed: np.ndarray,
+                      group_num: int) -> np.ndarray:
+  judged = passed != le_report_export.PASS_FLAG_UNKNOWN
+  judged_nums = np.bincount(group_ids[judged], minlength=group_num)
+  pass_nums = np.bincount(group_ids[passed == 1], minlength=group_num)
+  with np.errstate(invalid='ignore', divide='ignore'):
+    return np.where(judged_nums > 0, pass_nums / judged_nums, np.nan)
+
+
+def mann_whitney_u(group_ids: np.ndarray, values: np.ndarray,
+                   is_candidate: np.ndarray,
+                   group_num: int) -> tuple[np.ndarray, np.ndarray]:
+  """Runs Mann-Whitney U test of all groups at once.
+
+  The values are ranked within each group with ties averaged. The p-value is
+  from normal approximation with tie and continuity correction.
+
+  Args:
+    group_ids: Group index of each value.
+    values: The values of both baseline and candidate.
+    is_candidate: True if the value belongs to candidate.
+    group_num: Number of groups.
+
+  Returns:
+    Tuple of two-sided p-values and rank-biserial correlations of groups.
+    NaN for the groups lacking baseline or candidate values.
+  """
+  if not len(values):
+    return np.full(group_num, np.nan), np.full(group_num, np.nan)
+
+  order = np.lexsort((values, group_ids))
+  sorted_groups = group_ids[order]
+  sorted_values = values[order]
+  sorted_is_candidate = is_candidate[order].astype(np.float64)
+  value_num = len(sorted_values)
+  counts = np.bincount(group_ids, minlength=group_num)
+  starts = np.cumsum(counts) - counts
+
+  # Runs of tied values within the same group.
+  is_run_start = np.ones(value_num, dtype=bool)
+  is_run_start[1:] = (
+      (sorted_groups[1:] != sorted_groups[:-1]) |
+      (sorted_values[1:] != sorted_values[:-1]))
+  run_starts = np.flatnonzero(is_run_start)
+  run_lengths = np.diff(np.append(run_starts, value_num))
+  run_ids = np.cumsum(is_run_start) - 1
+  run_first_ranks = run_starts - starts[sorted_groups[run_starts]] + 1
+  ranks = (run_first_ranks + (run_lengths - 1) / 2)[run_ids]
+
+  candidate_nums = np.bincount(
+      sorted_groups, weights=sorted_is_candidate, minlength=group_num)
+  baseline_nums = counts - candidate_nums
+  candidate_rank_sums = np.bincount(
+      sorted_groups, weights=ranks * sorted_is_candidate, minlength=group_num)
+  tie_terms = np.bincount(
+      sorted_groups[run_starts],
+      weights=(run_lengths ** 3 - run_lengths).astype(np.float64),
+      minlength=group_num)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    u_stats = candidate_rank_sums - candidate_nums * (candidate_nums + 1) / 2
+    pair_nums = baseline_nums * candidate_nums
+    mean_u = pair_nums / 2
+    var_u = pair_nums / 12 * (
+        (counts + 1) - tie_terms / (counts * (counts - 1)))
+    deviations = np.maximum(np.abs(u_stats - mean_u) - 0.5, 0)
+    z_scores = deviations / np.sqrt(var_u)
+    p_values = np.where(
+        var_u > 0,
+        _erfc(np.nan_to_num(z_scores) / math.sqrt(2)).astype(np.float64),
+        1.0)
+    effect_sizes = 2 * u_stats / pair_nums - 1
+
+  has_both = pair_nums > 0
+  return (np.where(has_both, p_values, np.nan),
+          np.where(has_both, effect_sizes, np.nan))
+
+
+def compare(baseline: Samples, candidate: Samples,
+            alpha: float = DEFAULT_ALPHA,
+            min_delta_ratio: float = DEFAULT_MIN_DELTA_RATIO,
+            max_pass_rate_drop: float = DEFAULT_MAX_PASS_RATE_DROP,
+            ) -> list[GroupComparison]:
+  """Compares the candidate with the baseline group by group.
+
+  A group is reported as slower if the test is significant at `alpha`, the
+  candidate tends to be slower and P50 or P95 increases by at least
+  `min_delta_ratio`. The KPI is breached if the candidate P95 exceeds the
+  pass criteria which the baseline met, or the pass rate drops more than
+  `max_pass_rate_drop`.
+
+  Returns:
+    Comparison of the groups present in both baseline and candidate.
+  """
+  baseline, candidate = baseline.valid(), candidate.valid()
+  group_names, group_ids = np.unique(
+      np.concatenate([baseline.groups, candidate.groups]),
+      return_inverse=True)
+  group_num = len(group_names)
+  baseline_ids = group_ids[:len(baseline.groups)]
+  candidate_ids = group_ids[len(baseline.groups):]
+
+  baseline_p50, baseline_p95 = _group_percentiles(
+      baseline_ids, baseline.durations, group_num, [50, 95])
+  candidate_p50, candidate_p95 = _group_percentiles(
+      candidate_ids, candidate.durations, group_num, [50, 95])
+  baseline_pass_rates = _group_pass_rates(
+      baseline_ids, baseline.passed, group_num)
+  candidate_pass_rates = _group_pass_rates(
+      candidate_ids, candidate.passed, group_num)
+  pass_criteria_sec = np.full(group_num, np.nan)
+  np.fmax.at(
+      pass_criteria_sec, group_ids,
+      np.concatenate([baseline.pass_criteria_sec, candidate.pass_criteria_sec]))
+  p_values, effect_sizes = mann_whitney_u(
+      group_ids, np.concatenate([baseline.durations, candidate.durations]),
+      np.arange(len(group_ids)) >= len(baseline.groups), group_num)
+
+  with np.errstate(invalid='ignore', divide='ignore'):
+    delta_ratios = np.fmax(
+        candidate_p50 / baseline_p50, candidate_p95 / baseline_p95) - 1
+  slower = (
+      (p_values < alpha) & (effect_sizes > 0) &
+      (delta_ratios >= min_delta_ratio - _EPSILON))
+  kpi_breach = (
+      ((candidate_p95 > pass_criteria_sec) &
+       (baseline_p95 <= pass_criteria_sec)) |
+      (baseline_pass_rates - candidate_pass_rates >
+       max_pass_rate_drop + _EPSILON))
+  baseline_nums = np.bincount(baseline_ids, minlength=group_num)
+  candidate_nums = np.bincount(candidate_ids, minlength=group_num)
+
+  return [
+      GroupComparison(
+          group=str(group_names[index]),
+          baseline_num=int(baseline_nums[index]),
+          candidate_num=int(candidate_nums[index]),
+          baseline_p50=float(baseline_p50[index]),
+          candidate_p50=float(candidate_p50[index]),
+          baseline_p95=float(baseline_p95[index]),
+          candidate_p95=float(candidate_p95[index]),
+          baseline_pass_rate=float(baseline_pass_rates[index]),
+          candidate_pass_rate=float(candidate_pass_rates[index]),
+          pass_criteria_sec=float(pass_criteria_sec[index]),
+          p_value=float(p_values[index]),
+          effect_size=float(effect_sizes[index]),
+          slower=bool(slower[index]),
+          kpi_breach=bool(kpi_breach[index]))
+      for index in np.flatnonzero((baseline_nums > 0) & (candidate_nums > 0))]
+
+
+def format_table(comparisons: list[GroupComparison]) -> str:
+  """Formats the comparisons as a text table."""
+  lines = [
+      f'{"Group":<28}{"Base/Cand":>14}{"P50 base->cand":>20}'
+      f'{"P95 base->cand":>20}{"Pass rate":>18}{"p-value":>10}{"Verdict":>18}']
+  for comparison in comparisons:
+    verdicts = []
+    if comparison.slower:
+      verdicts.append('SLOWER')
+    if comparison.kpi_breach:
+      verdicts.append('KPI')
+
+    lines.append(
+        f'{comparison.group:<28}'
+        f'{f"{comparison.baseline_num}/{comparison.candidate_num}":>14}'
+        f'{f"{comparison.baseline_p50:.3f}->{comparison.candidate_p50:.3f}":>20}'
+        f'{f"{comparison.baseline_p95:.3f}->{comparison.candidate_p95:.3f}":>20}'
+        f'{f"{comparison.baseline_pass_rate:.1%}->{comparison.candidate_pass_rate:.1%}":>18}'
+        f'{comparison.p_value:>10.2g}'
+        f'{",".join(verdicts) or "OK":>18}')
+
+  return '\n'.join(lines)
+
+
+def main() -> int:
+  parser = argparse.ArgumentParser(
+      description='Detect regressions between baseline and candidate runs.')
+  parser.add_argument('--db', type=str, default=None,
+                      help='SQLite run history database.')
+  parser.add_argument('--baseline-build', type=str, default=None)
+  parser.add_argument('--candidate-build', type=str, default=None)
+  for name in ('baseline', 'candidate'):
+    for bound in ('since', 'until'):
+      parser.add_argument(
+          f'--{name}-{bound}', type=datetime.datetime.fromisoformat,
+          default=None,
+          help=f'Only {name} runs started {bound} this ISO time.')
+  parser.add_argument('--task', type=int, default=None)
+  parser.add_argument('--headset', type=str, default=None)
+  parser.add_argument('--baseline-files', nargs='*', default=None,
+                      help='Columnar reports of baseline.')
+  parser.add_argument('--candidate-files', nargs='*', default=None,
+                      help='Columnar reports of candidate.')
+  parser.add_argument('--section', type=str,
+                      default=le_section_stats.EVENT_SECTION)
+  parser.add_argument('--alpha', type=float, default=DEFAULT_ALPHA)
+  parser.add_argument('--min-delta', type=float,
+                      default=DEFAULT_MIN_DELTA_RATIO)
+  parser.add_argument('--max-pass-rate-drop', type=float,
+                      default=DEFAULT_MAX_PASS_RATE_DROP)
+  parser.add_argument('--json', type=str, default=None,
+                      help='Output the comparisons into JSON file.')
+  args = parser.parse_args()
+
+  if args.baseline_files is not None or args.candidate_files is not None:
+    baseline = Samples.from_columnar_files(
+        args.baseline_files or [], args.section)
+    candidate = Samples.from_columnar_files(
+        args.candidate_files or [], args.section)
+  elif args.db:
+    with le_run_history.RunHistory(args.db) as run_history:
+      baseline, candidate = [
+          Samples.from_history(
+              run_history, args.section, task_num=args.task,
+              headset_type=args.headset, build=build, since=since,
+              until=until)
+          for build, since, until in (
+              (args.baseline_build, args.baseline_since,
+               args.baseline_until),
+              (args.candidate_build, args.candidate_since,
+               args.candidate_until))]
+  else:
+    parser.error('Either --db or --baseline-files/--candidate-files is needed!')
+
+  comparisons = compare(
+      baseline, candidate, alpha=args.alpha, min_delta_ratio=args.min_delta,
+      max_pass_rate_drop=args.max_pass_rate_drop)
+  print(format_table(comparisons))
+  if args.json:
+    with open(args.json, 'w') as fw:
+      json.dump(
+          [dataclasses.asdict(comparison) for comparison in comparisons],
+          fw, indent=2)
+
+  regressed_num = sum(comparison.regressed for comparison in comparisons)
+  print(f'{regressed_num}/{len(comparisons)} groups regressed.')
+  return 1 if regressed_num else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
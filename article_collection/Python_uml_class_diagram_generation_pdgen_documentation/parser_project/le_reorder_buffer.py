@@ -0,0 +1,163 @@
+"""Module to reorder slightly out-of-order log lines by their timestamp.
+
+Logcat from several buffers or CPUs may arrive with small timestamp
+inversions. e.g.:
+  01-02 10:00:00.120 ... (start)
+  01-02 10:00:00.118 ... (end of previous trial)
+
+`ReorderBuffer` holds the lines within a bounded window in a min-heap and
+releases them in timestamp order. The window is bounded both by number of
+lines and by time span, so the added latency is limited.
+"""
+from __future__ import annotations
+
+import dataclasses
+import heapq
+import os
+import re
+from typing import Callable, Generic, Iterable, Iterator, TypeVar
+
+import constants
+
+
+T = TypeVar('T')
+# Timestamp at the beginning of logcat line. e.g. "02-28 23:59:00.005"
+_LINE_TIME_PATTERN = re.compile(
+    r'(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)\.(\d+)')
+
+
+def line_time_ms(line: str | bytes) -> int | None:
+  """Gets the timestamp of logcat line in milliseconds.
+
+  The value is only used to compare and measure the distance of timestamps,
+  so every month is counted as 31 days.
+
+  Args:
+    line: Decoded or undecoded log line.
+
+  Returns:
+    Milliseconds of the timestamp. None if the line has no timestamp.
+  """
+  if isinstance(line, bytes):
+    line = line[:32].decode('ascii', errors='ignore')
+
+  mth = _LINE_TIME_PATTERN.match(line)
+  if not mth:
+    return None
+
+  month, day, hour, minute, second, fraction = mth.groups()
+  total_sec = (
+      (((int(month) * 31 + int(day)) * 24 + int(hour)) * 60 + int(minute))
+      * 60 + int(second))
+  return total_sec * 1000 + int(fraction[:3].ljust(3, '0'))
+
+
+@dataclasses.dataclass(frozen=True)
+class ReorderWindow:
+  """Window of reordering.
+
+  Attributes:
+    max_lines: Maximum number of lines held in the buffer. None if unbounded.
+    max_delay_ms: Lines are held until a line newer by this time span
+      arrives. None if unbounded.
+  """
+  max_lines: int | None = None
+  max_delay_ms: int | None = None
+
+  @classmethod
+  def from_env(cls) -> ReorderWindow | None:
+    """Gets the window from environment variables. None if not set."""
+    max_lines = os.environ.get(constants.ENV_REORDER_WINDOW_LINES)
+    max_delay_ms = os.environ.get(constants.ENV_REORDER_WINDOW_MS)
+    if not max_lines and not max_delay_ms:
+      return None
+
+    return cls(
+        max_lines=int(max_lines) if max_lines else None,
+        max_delay_ms=int(max_delay_ms) if max_delay_ms else None)
+
+
+class ReorderBuffer(Generic[T]):
+  """Bounded min-heap to release log lines in timestamp order.
+
+  A line is released when the buffer holds more than `max_lines` lines or
+  the newest line is at least `max_delay_ms` later than it. Lines without
+  timestamp follow the previous line in arrival order. Lines of the same
+  timestamp keep their arrival order.
+
+  Attributes:
+    window: Window of reordering.
+    inversion_num: Number of lines which arrived earlier than a previous
+      line. They are the lines being reordered.
+    late_num: Number of lines which arrived later than the window and were
+      released out of order.
+  """
+
+  def __init__(self, window: ReorderWindow,
+               line_of: Callable[[T], str | bytes] = lambda item: item):
+    """Initializes the buffer.
+
+    Args:
+      window: Window of reordering. At least one bound should be set,
+        otherwise all lines are held until `flush`.
+      line_of: Function to get the log line from the buffered item.
+    """
+    self.window = window
+    self._line_of = line_of
+    self._heap: list[tuple[int, int, T]] = []
+    self._seq = 0
+    self._last_time_ms = 0
+    self._newest_time_ms = 0
+    self._released_time_ms = 0
+    self.inversion_num = 0
+    self.late_num = 0
+
+  def __len__(self) -> int:
+    return len(self._heap)
+
+  def push(self, item: T) -> list[T]:
+    """Buffers the item.
+
+    Returns:
+      The released items out of the window in order.
+    """
+    time_ms = line_time_ms(self._line_of(item))
+    if time_ms is None:
+      time_ms = self._last_time_ms
+    elif time_ms < self._newest_time_ms:
+      self.inversion_num += 1
+      if time_ms < self._released_time_ms:
+        self.late_num += 1
+
+    self._last_time_ms = time_ms
+    self._newest_time_ms = max(self._newest_time_ms, time_ms)
+    heapq.heappush(self._heap, (time_ms, self._seq, item))
+    self._seq += 1
+
+    released_items = []
+    max_lines = self.window.max_lines
+    max_delay_ms = self.window.max_delay_ms
+    while self._heap and (
+        (max_lines is not None and len(self._heap) > max_lines) or
+        (max_delay_ms is not None and
+         self._newest_time_ms - self._heap[0][0] >= max_delay_ms)):
+      released_items.append(self._pop())
+
+    return released_items
+
+  def flush(self) -> Iterator[T]:
+    """Releases all the buffered items in order."""
+    while self._heap:
+      yield self._pop()
+
+  def reorder(self, items: Iterable[T]) -> Iterator[T]:
+    """Iterates the given items in timestamp order within the window."""
+    for item in items:
+      yield from self.push(item)
+
+    yield from self.flush()
+
+  def _pop(self) -> T:
+    time_ms, _, item = heapq.heappop(self._heap)
+    self._released_time_ms = max(self._released_time_ms, time_ms)
+    return item
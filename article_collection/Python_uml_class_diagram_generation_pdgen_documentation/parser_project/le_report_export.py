@@ -0,0 +1,221 @@
+"""Module to export parsing records in machine readable formats.
+
+Two formats are supported:
+  - JSON Lines: One JSON object per trial. (See `to_trial_record`)
+  - Columnar: One column per field, stored as NumPy `.npz` or as Apache
+    Parquet when `pyarrow` is available. (See `export_columnar`)
+"""
+from __future__ import annotations
+
+import enum
+import functools
+import logging
+from typing import Any, Iterable, TYPE_CHECKING
+
+import general_data
+from le_audio_constants import DATETIME_FMT
+import le_audio_parsing_data
+
+if TYPE_CHECKING:
+  import numpy as np
+
+
+OutputResult = general_data.OutputResult
+EndResult = general_data.EndResult
+TASK_TYPE_2_REPORT_SECT_MAP = le_audio_parsing_data.TASK_TYPE_2_REPORT_SECT_MAP
+
+# Columns of columnar export which hold text.
+_STR_COLUMNS = frozenset({
+    'title', 'output_format', 'event_start_time', 'event_end_time'})
+# Value of pass flag in columnar export when there is no pass criteria.
+PASS_FLAG_UNKNOWN = -1
+
+
+@functools.cache
+def _load_pyarrow():
+  """Imports `pyarrow` on first use. None if it is not available."""
+  try:
+    import pyarrow
+    import pyarrow.parquet
+  except ImportError:
+    return None
+
+  return pyarrow
+
+
+def _datetime_str(datetime_obj) -> str | None:
+  return datetime_obj.strftime(DATETIME_FMT) if datetime_obj else None
+
+
+def _to_str(value: Any) -> str:
+  if value is None:
+    return ''
+
+  return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+def _is_pass(duration_sec: float | None,
+             pass_criteria_sec: float | None) -> bool | None:
+  if duration_sec is None or not pass_criteria_sec:
+    return None
+
+  return duration_sec <= pass_criteria_sec
+
+
+def _event_passed(event_end_result: EndResult | None) -> bool | None:
+  if event_end_result == EndResult.PASS:
+    return True
+
+  if event_end_result == EndResult.FAIL:
+    return False
+
+  return None
+
+
+def to_trial_record(output_result: OutputResult) -> dict[str, Any]:
+  """Converts a record into JSON serializable dictionary.
+
+  Args:
+    output_result: The record to convert.
+
+  Returns:
+    Dictionary of the trial with event time, duration and pass flag of the
+    event and of each report section of the record's output format.
+  """
+  sections = {}
+  for report_sect in TASK_TYPE_2_REPORT_SECT_MAP.get(
+      output_result.output_format, ()):
+    start_time = getattr(
+        output_result, f'{report_sect.performance_index}_start_time')
+    end_time = getattr(
+        output_result, f'{report_sect.performance_index}_end_time')
+    duration_sec = (
+        (end_time - start_time).total_seconds()
+        if start_time and end_time else None)
+    pass_criteria_sec = getattr(output_result, report_sect.pass_criteria_name)
+    sections[report_sect.performance_index] = {
+        'name': report_sect.section_name,
+        'start_time': _datetime_str(start_time),
+        'end_time': _datetime_str(end_time),
+        'duration_sec': duration_sec,
+        'pass_criteria_sec': pass_criteria_sec,
+        'passed': _is_pass(duration_sec, pass_criteria_sec),
+    }
+
+  duration_sec = (
+      output_result.start_to_end_duration_in_sec
+      if output_result.start_to_end_duration else None)
+  return {
+      'title': output_result.title,
+      'trial': output_result.trial,
+      'output_format': output_result.output_format,
+      'event_start_time': _datetime_str(output_result.event_start_time),
+      'event_end_time': _datetime_str(output_result.event_end_time),
+      'duration_sec': duration_sec,
+      'pass_criteria_sec': output_result.event_pass_criteria_sec,
+      'event_end_result': output_result.event_end_result,
+      'passed': _event_passed(output_result.event_end_result),
+      'sections': sections,
+  }
+
+
+def to_flat_row(trial_record: dict[str, Any]) -> dict[str, Any]:
+  """Flattens the trial record into one row of columnar export.
+
+  Section fields are named as "<performance index>_duration_sec",
+  "<performance index>_pass_criteria_sec" and "<performance index>_passed".
+  """
+  row = {
+      key: value for key, value in trial_record.items()
+      if key not in {'sections', 'event_end_result'}}
+  for performance_index, section in trial_record['sections'].items():
+    row[f'{performance_index}_duration_sec'] = section['duration_sec']
+    row[f'{performance_index}_pass_criteria_sec'] = section['pass_criteria_sec']
+    row[f'{performance_index}_passed'] = section['passed']
+
+  return row
+
+
+def to_columns(rows: Iterable[dict[str, Any]]) -> dict[str, np.ndarray]:
+  """Converts flat rows into columns.
+
+  Missing durations are filled with NaN and missing pass flags are filled with
+  `PASS_FLAG_UNKNOWN`. Pass flags are stored as int8 (1: pass, 0: fail).
+  """
+  import numpy as np
+
+  rows = list(rows)
+  column_names: dict[str, None] = {}
+  for row in rows:
+    column_names.update(dict.fromkeys(row))
+
+  columns = {}
+  for column_name in column_names:
+    values = [row.get(column_name) for row in rows]
+    if column_name in _STR_COLUMNS:
+      columns[column_name] = np.array(
+          [_to_str(value) for value in values])
+    elif column_name == 'passed' or column_name.endswith('_passed'):
+      columns[column_name] = np.array(
+          [PASS_FLAG_UNKNOWN if value is None else int(value)
+           for value in values], dtype=np.int8)
+    elif column_name == 'trial':
+      columns[column_name] = np.array(
+          [-1 if value is None else value for value in values], dtype=np.int64)
+    else:
+      columns[column_name] = np.array(
+          [np.nan if value is None else value for value in values],
+          dtype=np.float64)
+
+  return columns
+
+
+def export_columnar(rows: Iterable[dict[str, Any]], file_path: str) -> str:
+  """Exports flat rows into columnar file.
+
+  Apache Parquet is used if `file_path` ends with ".parquet" and `pyarrow` is
+  available. Otherwise the columns are saved by `numpy.savez`. The fall back
+  of a ".parquet" path is saved as "<path>.parquet.npz" so it doesn't
+  overwrite the ".npz" report of the same output path.
+
+  Args:
+    rows: Flat rows generated by `to_flat_row`.
+    file_path: Path of the exported file.
+
+  Returns:
+    The path of exported file.
+  """
+  import numpy as np
+
+  log = logging.getLogger(__name__)
+  columns = to_columns(rows)
+  if file_path.endswith('.parquet'):
+    pyarrow = _load_pyarrow()
+    if pyarrow is not None:
+      pyarrow.parquet.write_table(pyarrow.table(columns), file_path)
+      return file_path
+
+    log.warning('pyarrow is not available. Fall back to NumPy .npz format!')
+    file_path += '.npz'
+
+  # Uncompressed for loading speed.
+  np.savez(file_path, **columns)
+  return file_path
+
+
+def load_columnar(file_path: str) -> dict[str, np.ndarray]:
+  """Loads the columns exported by `export_columnar`."""
+  import numpy as np
+
+  if file_path.endswith('.parquet'):
+    pyarrow = _load_pyarrow()
+    if pyarrow is None:
+      raise Exception('pyarrow is required to load Parquet file!')
+
+    table = pyarrow.parquet.read_table(file_path)
+    return {
+        column_name: table.column(column_name).to_numpy()
+        for column_name in table.column_names}
+
+  with np.load(file_path) as npz_file:
+    return {column_name: npz_file[column_name] for column_name in npz_file}
@@ -1,12 +1,13 @@
 """Module to hold utility to generate performance report."""
 import constants
-import numpy as np
 import os
 import re
 import utils
 
 from typing_extensions import Protocol
 
+from general_data import OutputFormat
+from general_data import OutputResult
 from le_audio_constants import DATETIME_FMT
 from le_report_data import ReportSection, ReportRawData
 
@@ -40,6 +41,15 @@ class ReportGen(Protocol):
 
     return str(total_seconds)
 
+  def seconds_of(self, duration, rounded: bool = False):
+    if duration is None:
+      return '?'
+
+    if rounded:
+      return round(duration.total_seconds(), utils.get_round_digit())
+
+    return duration.total_seconds()
+
   def gen(self, report_raw_data: ReportRawData):
     ...
 
@@ -51,12 +61,28 @@ class CsvReportGen(ReportGen):
     self._sections = sections
 
   def gen(self, csv_writer: object, report_raw_data: ReportRawData) -> list[str]:
+    for row in self.header_rows():
+      csv_writer.writerow(row)
+
+    duration_list = []
+    try:
+      for output_result in report_raw_data:
+        csv_writer.writerow(self.gen_row(output_result))
+        duration_list.append(output_result.start_to_end_duration_in_sec)
+    except AttributeError as err:
+      print(f'Somewhere went wrong while generating CSV report: {err}')
+      csv_writer.writerow("")
+
+    utils.print_p95(duration_list)
+
+  def header_rows(self) -> list[list[str]]:
+    """Generates the header rows of CSV report."""
     row = ['Time interval']
     for sect_num, report_sect in enumerate(self._sections, start=1):
       row.extend([f'Section {sect_num} - {report_sect.section_name}', '', ''])
 
     row.extend(['Event time info', '', '', ''])
-    csv_writer.writerow(row)
+    header_rows = [row]
     row = ['Round']
     for report_sect in self._sections:
       if report_sect.pass_criteria_name != 'none':
@@ -65,39 +91,34 @@ class CsvReportGen(ReportGen):
         row.extend(['Start time', 'End time', 'Duration'])
 
     row.extend(['Start time', 'End time', 'Duration', 'Test result (Pass/Fail)'])
-    csv_writer.writerow(row)
-    duration_list = []
-    try:
-      for output_result in report_raw_data:
-        row = [str(output_result.trial)]
-        for report_sect in self._sections:
-          start_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_start_time')
-          row.append(self.datetime_str(start_datetime_obj))
-          end_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_end_time')
-          row.append(self.datetime_str(end_datetime_obj))
-          duration_str = (
-              self.duration_str(
-                  start_datetime_obj, end_datetime_obj,
-                  getattr(output_result, report_sect.pass_criteria_name)))
-
-          mth = re.match(r'([.0-9]+)(\([A-Za-z]+\))', duration_str)
-          if mth:
-            row.append(mth.group(1))
-            row.append(mth.group(2))
-          else:
-            row.append(duration_str)
-
-        row.append(output_result.event_start_time.strftime(DATETIME_FMT))
-        row.append(output_result.event_end_time.strftime(DATETIME_FMT))
-        row.append(output_result.start_to_end_duration_in_sec)
-        duration_list.append(output_result.start_to_end_duration_in_sec)
-        row.append(output_result.event_end_result)
-        csv_writer.writerow(row)
-    except AttributeError as err:
-      print(f'Somewhere went wrong while generating CSV report: {err}')
-      csv_writer.writerow("")
+    header_rows.append(row)
+    return header_rows
 
-    utils.print_p95(duration_list)
+  def gen_row(self, output_result: OutputResult) -> list[str]:
+    """Generates the CSV row of a single record."""
+    row = [str(output_result.trial)]
+    for report_sect in self._sections:
+      start_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_start_time')
+      row.append(self.datetime_str(start_datetime_obj))
+      end_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_end_time')
+      row.append(self.datetime_str(end_datetime_obj))
+      duration_str = (
+          self.duration_str(
+              start_datetime_obj, end_datetime_obj,
+              getattr(output_result, report_sect.pass_criteria_name)))
+
+      mth = re.match(r'([.0-9]+)(\([A-Za-z]+\))', duration_str)
+      if mth:
+        row.append(mth.group(1))
+        row.append(mth.group(2))
+      else:
+        row.append(duration_str)
+
+    row.append(output_result.event_start_time.strftime(DATETIME_FMT))
+    row.append(output_result.event_end_time.strftime(DATETIME_FMT))
+    row.append(output_result.start_to_end_duration_in_sec)
+    row.append(output_result.event_end_result)
+    return row
 
 
 class TxtReportGen(ReportGen):
@@ -109,50 +130,224 @@ class TxtReportGen(ReportGen):
   def gen(self, report_raw_data: ReportRawData) -> list[str]:
     output_messages: list[str] = []
     for output_result in report_raw_data:
-      output_messages.append(
-            '-' * 50 + '|' + str(output_result.trial) + '|' + '-' * 50)
-      output_messages.append('')
-      for val in output_result.raw_data:
-        if isinstance(val, str):
-          output_messages.append(f'MESSAGE: {val}')
-        else:
-          output_messages.append(val.timestamp.strftime(DATETIME_FMT) + val.message)
-
-      for sect_num, report_sect in enumerate(self._sections, start=1):
-        output_messages.append('')
-        output_messages.append(f'--Section {sect_num} - {report_sect.section_name}--')
-        start_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_start_time')
-        if not start_datetime_obj:
-          print(f'Failed in accessing "{report_sect.performance_index}_start_time"!')
-
-        datetime_str = self.datetime_str(start_datetime_obj)
-        output_messages.append(f'Start time:{datetime_str}')
-
-        end_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_end_time')
-        if not end_datetime_obj:
-          print(f'Failed in accessing "{report_sect.performance_index}_end_time"!')
-
-        datetime_str = self.datetime_str(end_datetime_obj)
-        output_messages.append(f'End time:{datetime_str}')
-
-        duration_str =(
-            self.duration_str(
-                start_datetime_obj, end_datetime_obj,
-                getattr(output_result, report_sect.pass_criteria_name)))
-        output_messages.append(f'Duration:{duration_str}')
+      output_messages.extend(self.gen_record(output_result))
 
+    return output_messages
+
+  def gen_record(self, output_result: OutputResult) -> list[str]:
+    """Generates the text block of a single record."""
+    output_messages = self.gen_raw_data(output_result)
+    for sect_num, report_sect in enumerate(self._sections, start=1):
       output_messages.append('')
-      output_messages.append('--Event time--')
-      output_messages.append(
-          'Start time:'
-          + output_result.event_start_time.strftime(DATETIME_FMT))
-      output_messages.append(
-          'End time:'
-          + output_result.event_end_time.strftime(DATETIME_FMT))
-      output_messages.append(
-          'Duration:'
-          + str(output_result.start_to_end_duration_in_sec)
-          + output_result.event_end_result)
-      output_messages.append('')
+      output_messages.append(f'--Section {sect_num} - {report_sect.section_name}--')
+      start_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_start_time')
+      if not start_datetime_obj:
+        print(f'Failed in accessing "{report_sect.performance_index}_start_time"!')
+
+      datetime_str = self.datetime_str(start_datetime_obj)
+      output_messages.append(f'Start time:{datetime_str}')
+
+      end_datetime_obj = getattr(output_result, f'{report_sect.performance_index}_end_time')
+      if not end_datetime_obj:
+        print(f'Failed in accessing "{report_sect.performance_index}_end_time"!')
+
+      datetime_str = self.datetime_str(end_datetime_obj)
+      output_messages.append(f'End time:{datetime_str}')
+
+      duration_str =(
+          self.duration_str(
+              start_datetime_obj, end_datetime_obj,
+              getattr(output_result, report_sect.pass_criteria_name)))
+      output_messages.append(f'Duration:{duration_str}')
+
+    output_messages.append('')
+    output_messages.extend(self.gen_event_time(output_result))
+    return output_messages
+
+  def gen_raw_data(self, output_result: OutputResult) -> list[str]:
+    """Generates the round line and the matched lines of a single record."""
+    output_messages: list[str] = []
+    output_messages.append(
+          '-' * 50 + '|' + str(output_result.trial) + '|' + '-' * 50)
+    output_messages.append('')
+    for val in output_result.raw_data:
+      if isinstance(val, str):
+        output_messages.append(f'MESSAGE: {val}')
+      else:
+        output_messages.append(val.timestamp.strftime(DATETIME_FMT) + val.message)
+
+    return output_messages
+
+  def gen_event_time(self, output_result: OutputResult) -> list[str]:
+    """Generates the event time section of a single record."""
+    return [
+        '--Event time--',
+        'Start time:' + output_result.event_start_time.strftime(DATETIME_FMT),
+        'End time:' + output_result.event_end_time.strftime(DATETIME_FMT),
+        'Duration:'
+        + str(output_result.start_to_end_duration_in_sec)
+        + output_result.event_end_result,
+        '',
+    ]
+
+
+class PairCsvReportGen(CsvReportGen):
+  """Utility to generate CSV based report of pairing template.
+
+  The event duration is reported with and without the time of pairing dialog.
+  """
+
+  def __init__(self):
+    super().__init__(sections=())
+
+  def header_rows(self) -> list[list[str]]:
+    return [
+        ['Time interval', '', 'Section 1 - Dialog process time', '',
+         'Event time'],
+        ['Round', 'Start time', 'End time', 'Duration', 'Start time',
+         'End time', 'Duration', 'Event duration - Dialog press duration',
+         'Test result (Pass/Fail)'],
+    ]
+
+  def gen_row(self, output_result: OutputResult) -> list[str]:
+    return [
+        str(output_result.trial),
+        self.datetime_str(output_result.dialog_start_time),
+        self.datetime_str(output_result.dialog_end_time),
+        self.seconds_of(output_result.dialog_process_duration),
+        self.datetime_str(output_result.event_start_time),
+        self.datetime_str(output_result.event_end_time),
+        self.seconds_of(output_result.start_to_end_duration),
+        self.seconds_of(output_result.final_duration),
+        output_result.event_end_result,
+    ]
+
+
+class AudioPathSwitchCsvReportGen(CsvReportGen):
+  """Utility to generate CSV based report of audio path switch templates.
+
+  Each section is reported by the attributes of its start time, end time and
+  duration. (See `SECTIONS`)
+  """
+
+  SECTIONS = {
+      OutputFormat.AUDIO_PATH_SWITCH_A: (
+          ('event_start_time', 'audio_routing_start_time',
+           'stream_stop_duration'),
+          ('audio_routing_start_time', 'stream_create_start_time',
+           'audio_routing_duration'),
+          ('stream_create_start_time', 'send_audio_start_time',
+           'stream_create_duration'),
+          ('send_audio_start_time', 'event_end_time', 'send_audio_duration'),
+      ),
+      OutputFormat.AUDIO_PATH_SWITCH_B: (
+          ('event_start_time', 'audio_routing_start_time',
+           'stream_stop_duration'),
+          ('audio_routing_start_time', 'stream_create_start_time',
+           'audio_routing_duration'),
+          ('stream_create_start_time', 'event_end_time',
+           'stream_create_duration'),
+      ),
+      OutputFormat.AUDIO_PATH_SWITCH_C: (
+          ('event_start_time', 'audio_routing_start_time',
+           'stream_stop_duration'),
+          ('audio_routing_start_time', 'event_end_time', 'send_audio_duration'),
+      ),
+  }
+  _SECTION_HEADER_ROWS = {
+      OutputFormat.AUDIO_PATH_SWITCH_A: [
+          'Time interval', '', 'Section 1 - Stop stream time', '', '',
+          'Section 2 - Audio routing time', '', '',
+          'Section 3 - Create stream time', '', '',
+          'Section 4 - Start audio data time', '', 'Event time'],
+      OutputFormat.AUDIO_PATH_SWITCH_B: [
+          'Time interval', '', 'Section 1 - Stop stream time', '', '',
+          'Section 2 - Audio routing time', '', '',
+          'Section 3 - Create stream time', '', 'Event time'],
+      OutputFormat.AUDIO_PATH_SWITCH_C: [
+          'Time interval', '', 'Section 1 - Stop stream time', '', '',
+          'Section 2 - Start audio data time', '', 'Event time'],
+  }
+
+  def __init__(self, output_format: OutputFormat):
+    super().__init__(sections=())
+    self._output_format = output_format
+
+  def header_rows(self) -> list[list[str]]:
+    section_num = len(self.SECTIONS[self._output_format]) + 1
+    return [
+        self._SECTION_HEADER_ROWS[self._output_format],
+        ['Round'] + ['Start time', 'End time', 'Duration'] * section_num
+        + ['Test result (Pass/Fail)'],
+    ]
+
+  def gen_row(self, output_result: OutputResult) -> list[str]:
+    row = [str(output_result.trial)]
+    for start_name, end_name, duration_name in self.SECTIONS[self._output_format]:
+      row.append(self.datetime_str(getattr(output_result, start_name)))
+      row.append(self.datetime_str(getattr(output_result, end_name)))
+      row.append(self.seconds_of(getattr(output_result, duration_name)))
+
+    row.append(self.datetime_str(output_result.event_start_time))
+    row.append(self.datetime_str(output_result.event_end_time))
+    row.append(self.seconds_of(output_result.start_to_end_duration))
+    row.append(output_result.event_end_result)
+    return row
+
+
+class AudioPathSwitchTxtReportGen(TxtReportGen):
+  """Utility to generate text based report of audio path switch templates.
+
+  The sections depend on the stages hit by each record instead of the
+  output format.
+  """
+
+  def __init__(self):
+    super().__init__(sections=())
+
+  def _gen_section(self, section_name, start_datetime_obj, end_datetime_obj,
+                   duration) -> list[str]:
+    return [
+        f'--{section_name}--',
+        f'Start time:{self.datetime_str(start_datetime_obj)}',
+        f'End time:{self.datetime_str(end_datetime_obj)}',
+        f'Duration:{self.seconds_of(duration, rounded=True)}',
+        '',
+    ]
+
+  def gen_record(self, output_result: OutputResult) -> list[str]:
+    output_messages = self.gen_raw_data(output_result)
+    output_messages.append('')
+    output_messages.extend(self._gen_section(
+        'Section 1 - Stop stream', output_result.event_start_time,
+        output_result.audio_routing_start_time,
+        output_result.stream_stop_duration))
+    if output_result.stream_create_start_time:
+      output_messages.extend(self._gen_section(
+          'Section 2 - Audio routing', output_result.audio_routing_start_time,
+          output_result.stream_create_start_time,
+          output_result.audio_routing_duration))
+      if output_result.send_audio_start_time:
+        output_messages.extend(self._gen_section(
+            'Section 3 - Create audio stream',
+            output_result.stream_create_start_time,
+            output_result.send_audio_start_time,
+            output_result.stream_create_duration))
+        output_messages.extend(self._gen_section(
+            'Section 4 - Start audio data time',
+            output_result.send_audio_start_time, output_result.event_end_time,
+            output_result.send_audio_duration))
+      else:
+        output_messages.extend(self._gen_section(
+            'Section 3 - Create audio stream',
+            output_result.stream_create_start_time,
+            output_result.event_end_time,
+            output_result.stream_create_duration))
+    else:
+      output_messages.extend(self._gen_section(
+          'Section 2 - Start audio data time',
+          output_result.audio_routing_start_time, output_result.event_end_time,
+          output_result.send_audio_duration))
 
+    output_messages.extend(self.gen_event_time(output_result))
     return output_messages
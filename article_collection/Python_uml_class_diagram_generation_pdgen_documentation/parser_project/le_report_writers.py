@@ -0,0 +1,233 @@
+"""Module to hold writers which stream parsing records into report files."""
+from __future__ import annotations
+
+import csv
+import json
+import logging
+from typing import Protocol, TextIO
+
+import le_audio_parsing_data
+from le_audio_parsing_data import OutputFormat
+from le_audio_parsing_data import OutputResult
+import le_report_export
+from le_report_gen_utils import CsvReportGen, TxtReportGen
+import utils
+
+
+class ReportWriter(Protocol):
+  """Protocol of writer which streams records into a report sink."""
+
+  def write(self, output_result: OutputResult) -> None:
+    """Writes a completed record into the report sink."""
+
+  def close(self, drop_num: int = 0) -> None:
+    """Writes the summary footer and closes the report sink."""
+
+
+class FileReportWriter(ReportWriter):
+  """Base of report writer which streams records into a file.
+
+  The report file is opened in append mode when the first record arrives and
+  every record is flushed right after being written. Thus the records found so
+  far are kept in the report even if the parsing is interrupted.
+
+  Attributes:
+    file_path: Path of the report file.
+  """
+
+  file_extension: str = ''
+
+  def __init__(self, output_file_path: str):
+    self.file_path = f'{output_file_path}.{self.file_extension}'
+    self.log = logging.getLogger(self.__class__.__name__)
+    self._fw: TextIO | None = None
+    self._title_2_output_format: dict[str, OutputFormat] = {}
+    self._title_2_durations: dict[str, list[float]] = {}
+
+  def _open(self) -> TextIO:
+    if self._fw is None:
+      self.log.info('Output report to %s...', self.file_path)
+      self._fw = open(self.file_path, 'a', newline='', encoding='utf-8')
+
+    return self._fw
+
+  def write(self, output_result: OutputResult) -> None:
+    title = output_result.title
+    if title not in self._title_2_output_format:
+      self._title_2_output_format[title] = output_result.output_format
+      self._title_2_durations[title] = []
+      self.write_title(self._open(), title, output_result.output_format)
+
+    self.write_record(self._open(), output_result)
+    self._title_2_durations[title].append(
+        output_result.start_to_end_duration_in_sec)
+    self._fw.flush()
+
+  def close(self, drop_num: int = 0) -> None:
+    for title, durations in self._title_2_durations.items():
+      self.write_footer(self._open(), title, durations, drop_num)
+
+    if self._fw is not None:
+      self._fw.close()
+      self._fw = None
+
+  def write_title(
+      self, fw: TextIO, title: str, output_format: OutputFormat) -> None:
+    """Writes the title section before the first record of given title."""
+
+  def write_record(self, fw: TextIO, output_result: OutputResult) -> None:
+    """Writes a single record."""
+    raise NotImplementedError
+
+  def write_footer(
+      self, fw: TextIO, title: str, durations: list[float],
+      drop_num: int) -> None:
+    """Writes the summary of given title after the last record."""
+
+
+class TxtReportWriter(FileReportWriter):
+  """Writer to stream records into text based report."""
+
+  file_extension = 'txt'
+
+  def __init__(self, output_file_path: str):
+    super().__init__(output_file_path)
+    self._title_2_report_gen: dict[str, TxtReportGen] = {}
+
+  def write_title(self, fw, title, output_format):
+    self._title_2_report_gen[title] = le_audio_parsing_data.txt_report_gen_of(
+        output_format)
+    fw.write('=' * 150 + '\n')
+    fw.write('*' * 3 + title + '\n')
+
+  def write_record(self, fw, output_result):
+    report_gen = self._title_2_report_gen[output_result.title]
+    fw.write('\n'.join(report_gen.gen_record(output_result)) + '\n')
+
+  def write_footer(self, fw, title, durations, drop_num):
+    fw.write('*' * 3 + title + '\n')
+    fw.write(utils.success_rate_summary(len(durations), drop_num) + '\n')
+    if durations:
+      fw.write(utils.p95_summary(durations) + '\n')
+
+
+class CsvReportWriter(FileReportWriter):
+  """Writer to stream records into CSV based report."""
+
+  file_extension = 'csv'
+
+  def __init__(self, output_file_path: str):
+    super().__init__(output_file_path)
+    self._csv_writer = None
+    self._title_2_report_gen: dict[str, CsvReportGen] = {}
+
+  def _get_csv_writer(self, fw: TextIO):
+    if self._csv_writer is None:
+      self._csv_writer = csv.writer(fw)
+
+    return self._csv_writer
+
+  def write_title(self, fw, title, output_format):
+    csv_writer = self._get_csv_writer(fw)
+    report_gen = le_audio_parsing_data.csv_report_gen_of(output_format)
+    self._title_2_report_gen[title] = report_gen
+    csv_writer.writerow(["'" + '=' * 150])
+    csv_writer.writerow(['*' * 3 + title])
+    for row in report_gen.header_rows():
+      csv_writer.writerow(row)
+
+  def write_record(self, fw, output_result):
+    report_gen = self._title_2_report_gen[output_result.title]
+    self._get_csv_writer(fw).writerow(report_gen.gen_row(output_result))
+
+  def write_footer(self, fw, title, durations, drop_num):
+    csv_writer = self._get_csv_writer(fw)
+    csv_writer.writerow(['*' * 3 + title])
+    csv_writer.writerow([utils.success_rate_summary(len(durations), drop_num)])
+    if durations:
+      csv_writer.writerow([utils.p95_summary(durations)])
+      utils.print_p95(durations)
+
+
+class JsonReportWriter(FileReportWriter):
+  """Writer to stream records into JSON Lines based report.
+
+  Each record is written as one JSON object per line, so every line of the
+  report is a trial record. The summaries of titles are written into a
+  separate JSON file at closing.
+
+  Attributes:
+    summary_file_path: Path of the JSON file to hold the summaries.
+  """
+
+  file_extension = 'json'
+
+  def __init__(self, output_file_path: str):
+    super().__init__(output_file_path)
+    self.summary_file_path = f'{output_file_path}.summary.json'
+    self._summaries: list[dict] = []
+
+  def write_record(self, fw, output_result):
+    fw.write(
+        json.dumps(le_report_export.to_trial_record(output_result)) + '\n')
+
+  def write_footer(self, fw, title, durations, drop_num):
+    summary = {
+        'title': title,
+        'found_num': len(durations),
+        'drop_num': drop_num,
+    }
+    if durations:
+      stat_info = utils.calc_p95_info(durations)
+      summary.update({
+          'p95': float(stat_info.p95),
+          'upper_bound': float(stat_info.upper_bound),
+          'max': max(durations),
+      })
+
+    self._summaries.append(summary)
+
+  def close(self, drop_num: int = 0) -> None:
+    super().close(drop_num)
+    if self._summaries:
+      self.log.info('Output report summary to %s...', self.summary_file_path)
+      with open(self.summary_file_path, 'w') as fw:
+        json.dump(self._summaries, fw, indent=2)
+
+      self._summaries = []
+
+
+class ColumnarReportWriter(ReportWriter):
+  """Writer to export records into columnar file at closing.
+
+  Only the flat rows of section durations and pass flags are kept in memory.
+  (See `le_report_export.to_flat_row`)
+  """
+
+  def __init__(self, output_file_path: str, file_extension: str = 'npz'):
+    self.file_path = f'{output_file_path}.{file_extension}'
+    self.log = logging.getLogger(self.__class__.__name__)
+    self._rows: list[dict] = []
+
+  def write(self, output_result: OutputResult) -> None:
+    self._rows.append(
+        le_report_export.to_flat_row(
+            le_report_export.to_trial_record(output_result)))
+
+  def close(self, drop_num: int = 0) -> None:
+    if not self._rows:
+      return
+
+    # The format may fall back to .parquet.npz.
+    self.file_path = le_report_export.export_columnar(
+        self._rows, self.file_path)
+    self.log.info(
+        'Output %s trial(s) to %s', len(self._rows), self.file_path)
+    self._rows = []
+
+
+class ParquetReportWriter(ColumnarReportWriter):
+  """Writer to export records into Parquet file at closing."""
+
+  def __init__(self, output_file_path: str):
+    super().__init__(output_file_path, file_extension='parquet')
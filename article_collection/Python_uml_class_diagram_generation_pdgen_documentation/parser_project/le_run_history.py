@@ -0,0 +1,317 @@
+"""Module to keep the history of parsing runs in a local SQLite database.
+
+Each run is stored along with its parameters (task number, headset type, LEA
+configuration, build label and fingerprint of input log) and the durations
+and pass criteria of the event and every report section of each trial. Runs
+can then be compared over time by indexed queries instead of parsing the old
+text reports.
+
+Tables:
+  runs: One row per run.
+  trials: One row per trial of a run.
+  trial_sections: One row per section of a trial. The overall event is
+    stored as section `le_section_stats.EVENT_SECTION`.
+"""
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from typing import Any, Iterable
+
+import numpy as np
+
+import le_report_export
+import le_section_stats
+
+
+# Size of the head and tail read from the input log to fingerprint it.
+_FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+  run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  started_at TEXT NOT NULL,
+  task_num INTEGER,
+  headset_type TEXT,
+  lea_config TEXT,
+  observer TEXT,
+  input_path TEXT,
+  input_hash TEXT,
+  found_num INTEGER,
+  drop_num INTEGER,
+  build TEXT
+);
+CREATE TABLE IF NOT EXISTS trials (
+  run_id INTEGER NOT NULL REFERENCES runs(run_id),
+  trial INTEGER NOT NULL,
+  title TEXT,
+  event_start_time TEXT,
+  event_end_time TEXT,
+  passed INTEGER,
+  PRIMARY KEY (run_id, trial)
+);
+CREATE TABLE IF NOT EXISTS trial_sections (
+  run_id INTEGER NOT NULL REFERENCES runs(run_id),
+  trial INTEGER NOT NULL,
+  section TEXT NOT NULL,
+  duration_sec REAL,
+  passed INTEGER,
+  pass_criteria_sec REAL,
+  PRIMARY KEY (run_id, trial, section)
+);
+'''
+_INDEXES = '''
+CREATE INDEX IF NOT EXISTS runs_task_idx ON runs(task_num, started_at);
+CREATE INDEX IF NOT EXISTS runs_headset_idx ON runs(headset_type, started_at);
+CREATE INDEX IF NOT EXISTS runs_started_at_idx ON runs(started_at);
+CREATE INDEX IF NOT EXISTS runs_build_idx ON runs(build, task_num);
+CREATE INDEX IF NOT EXISTS trial_sections_section_idx
+  ON trial_sections(section, run_id);
+'''
+
+
+def fingerprint_file(file_path: str) -> str:
+  """Fingerprints the file by its size, head and tail.
+
+  Reading the whole multi-GB log only to identify it is too slow, so only the
+  first and last chunks are hashed.
+  """
+  file_size = os.path.getsize(file_path)
+  sha1 = hashlib.sha1(str(file_size).encode())
+  with open(file_path, 'rb') as fo:
+    sha1.update(fo.read(_FINGERPRINT_CHUNK_SIZE))
+    if file_size > 2 * _FINGERPRINT_CHUNK_SIZE:
+      fo.seek(-_FINGERPRINT_CHUNK_SIZE, os.SEEK_END)
+      sha1.update(fo.read())
+
+  return sha1.hexdigest()
+
+
+@dataclasses.dataclass
+class RunInfo:
+  """Parameters and summary of a parsing run.
+
+  Attributes:
+    task_num: Number of parser task.
+    headset_type: Type of headset. (See `constants.HeadsetType`)
+    lea_config: LEA configuration as dictionary.
+    observer: Class name of observer.
+    input_path: Path of input log.
+    input_hash: Fingerprint of input log. (See `fingerprint_file`)
+    build: Label of the build under test. e.g. build ID of DUT.
+    found_num: Number of found trials.
+    drop_num: Number of dropped trials.
+    started_at: Time when the run started.
+    run_id: ID of the run in database. None before the run is recorded.
+  """
+  task_num: int | None = None
+  headset_type: str | None = None
+  lea_config: dict[str, Any] | None = None
+  observer: str | None = None
+  input_path: str | None = None
+  input_hash: str | None = None
+  build: str | None = None
+  found_num: int = 0
+  drop_num: int = 0
+  started_at: datetime.datetime = dataclasses.field(
+      default_factory=datetime.datetime.now)
+  run_id: int | None = None
+
+
+def _to_passed_flag(passed: bool | None) -> int | None:
+  return None if passed is None else int(passed)
+
+
+class RunHistory:
+  """SQLite store of parsing runs.
+
+  Attributes:
+    db_path: Path of SQLite database file.
+  """
+
+  def __init__(self, db_path: str):
+    self.db_path = db_path
+    self.log = logging.getLogger(self.__class__.__name__)
+    self._conn = sqlite3.connect(db_path)
+    self._conn.execute('PRAGMA journal_mode=WAL')
+    # Safe with WAL and avoids fsync on every transaction.
+    self._conn.execute('PRAGMA synchronous=NORMAL')
+    self._conn.executescript(_SCHEMA)
+    self._conn.executescript(_INDEXES)
+
+  def close(self) -> None:
+    self._conn.close()
+
+  def __enter__(self) -> RunHistory:
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
+
+  def record_run(self, run_info: RunInfo,
+                 trial_records: Iterable[dict[str, Any]]) -> int:
+    """Inserts the run and its trials in one transaction.
+
+    Args:
+      run_info: Parameters and summary of the run.
+      trial_records: Records generated by `le_report_export.to_trial_record`.
+
+    Returns:
+      ID of the inserted run.
+    """
+    trial_rows, section_rows = [], []
+    for trial_record in trial_records:
+      trial = trial_record['trial']
+      trial_rows.append((
+          trial, trial_record['title'], trial_record['event_start_time'],
+          trial_record['event_end_time'],
+          _to_passed_flag(trial_record['passed'])))
+      section_rows.append((
+          trial, le_section_stats.EVENT_SECTION,
+          trial_record['duration_sec'],
+          _to_passed_flag(trial_record['passed']),
+          trial_record['pass_criteria_sec']))
+      for performance_index, section in trial_record['sections'].items():
+        section_rows.append((
+            trial, performance_index, section['duration_sec'],
+            _to_passed_flag(section['passed']), section['pass_criteria_sec']))
+
+    with self._conn:
+      cursor = self._conn.execute(
+          'INSERT INTO runs (started_at, task_num, headset_type, lea_config,'
+          ' observer, input_path, input_hash, found_num, drop_num, build)'
+          ' VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+          (run_info.started_at.isoformat(), run_info.task_num,
+           run_info.headset_type,
+           json.dumps(run_info.lea_config) if run_info.lea_config else None,
+           run_info.observer, run_info.input_path, run_info.input_hash,
+           run_info.found_num, run_info.drop_num, run_info.build))
+      run_id = cursor.lastrowid
+      self._conn.executemany(
+          'INSERT INTO trials (run_id, trial, title, event_start_time,'
+          ' event_end_time, passed) VALUES (?, ?, ?, ?, ?, ?)',
+          ((run_id, *row) for row in trial_rows))
+      self._conn.executemany(
+          'INSERT INTO trial_sections (run_id, trial, section, duration_sec,'
+          ' passed, pass_criteria_sec) VALUES (?, ?, ?, ?, ?, ?)',
+          ((run_id, *row) for row in section_rows))
+
+    run_info.run_id = run_id
+    self.log.info(
+        'Recorded run=%s with %s trials into %s', run_id, len(trial_rows),
+        self.db_path)
+    return run_id
+
+  @staticmethod
+  def _run_filter(
+      task_num: int | None, headset_type: str | None,
+      since: datetime.datetime | None,
+      until: datetime.datetime | None,
+      build: str | None = None) -> tuple[str, list[Any]]:
+    conditions, params = [], []
+    if build is not None:
+      conditions.append('runs.build = ?')
+      params.append(build)
+    if task_num is not None:
+      conditions.append('runs.task_num = ?')
+      params.append(task_num)
+    if headset_type is not None:
+      conditions.append('runs.headset_type = ?')
+      params.append(getattr(headset_type, 'value', headset_type))
+    if since is not None:
+      conditions.append('runs.started_at >= ?')
+      params.append(since.isoformat())
+    if until is not None:
+      conditions.append('runs.started_at < ?')
+      params.append(until.isoformat())
+
+    return ' AND '.join(conditions) or '1', params
+
+  def query_runs(
+      self, task_num: int | None = None, headset_type: str | None = None,
+      since: datetime.datetime | None = None,
+      until: datetime.datetime | None = None,
+      build: str | None = None) -> list[RunInfo]:
+    """Gets the runs matching the filters ordered by start time."""
+    where_clause, params = self._run_filter(
+        task_num, headset_type, since, until, build)
+    rows = self._conn.execute(
+        'SELECT run_id, started_at, task_num, headset_type, lea_config,'
+        ' observer, input_path, input_hash, found_num, drop_num, build'
+        f' FROM runs WHERE {where_clause} ORDER BY started_at', params)
+    return [
+        RunInfo(
+            run_id=run_id,
+            started_at=datetime.datetime.fromisoformat(started_at),
+            task_num=task_num, headset_type=headset_type,
+            lea_config=json.loads(lea_config) if lea_config else None,
+            observer=observer, input_path=input_path, input_hash=input_hash,
+            found_num=found_num, drop_num=drop_num, build=build)
+        for (run_id, started_at, task_num, headset_type, lea_config,
+             observer, input_path, input_hash, found_num, drop_num,
+             build) in rows]
+
+  def query_durations(
+      self, section: str = le_section_stats.EVENT_SECTION,
+      task_num: int | None = None, headset_type: str | None = None,
+      since: datetime.datetime | None = None,
+      until: datetime.datetime | None = None,
+      build: str | None = None) -> dict[str, np.ndarray]:
+    """Gets the durations of a section of the runs matching the filters.
+
+    Args:
+      section: Performance index of the section or
+        `le_section_stats.EVENT_SECTION`.
+      task_num: Number of parser task. All if None.
+      headset_type: Type of headset. All if None.
+      since: Only the runs started from this time.
+      until: Only the runs started before this time.
+      build: Label of build. All if None.
+
+    Returns:
+      Columns "run_id", "started_at" (datetime64), "task_num" (-1 if
+      missing), "headset_type", "build", "trial", "duration_sec" (NaN if
+      missing), "passed" (`le_report_export.PASS_FLAG_UNKNOWN` if not judged)
+      and "pass_criteria_sec" (NaN if missing) ordered by run start time and
+      trial.
+    """
+    where_clause, params = self._run_filter(
+        task_num, headset_type, since, until, build)
+    rows = self._conn.execute(
+        'SELECT runs.run_id, runs.started_at, runs.task_num,'
+        ' runs.headset_type, runs.build, trial_sections.trial,'
+        ' trial_sections.duration_sec, trial_sections.passed,'
+        ' trial_sections.pass_criteria_sec'
+        ' FROM trial_sections JOIN runs USING (run_id)'
+        f' WHERE trial_sections.section = ? AND {where_clause}'
+        ' ORDER BY runs.started_at, trial_sections.trial',
+        [section, *params]).fetchall()
+    (run_ids, started_ats, task_nums, headset_types, builds, trials,
+     durations, passed, pass_criteria_secs) = (
+         zip(*rows) if rows else ((),) * 9)
+    return {
+        'run_id': np.array(run_ids, dtype=np.int64),
+        'started_at': np.array(started_ats, dtype='datetime64[us]'),
+        'task_num': np.array(
+            [-1 if value is None else value for value in task_nums],
+            dtype=np.int64),
+        'headset_type': np.array(
+            [value or '' for value in headset_types], dtype=str),
+        'build': np.array([value or '' for value in builds], dtype=str),
+        'trial': np.array(trials, dtype=np.int64),
+        'duration_sec': np.array(
+            [np.nan if value is None else value for value in durations],
+            dtype=np.float64),
+        'passed': np.array(
+            [le_report_export.PASS_FLAG_UNKNOWN if value is None else value
+             for value in passed],
+            dtype=np.int8),
+        'pass_criteria_sec': np.array(
+            [np.nan if value is None else value
+             for value in pass_criteria_secs],
+            dtype=np.float64),
+    }
@@ -0,0 +1,326 @@
+"""Module to calculate the statistics of all report sections at once.
+
+The durations of the event and of each report section (e.g. ASCS/CIG/CIS
+setup, audio routing, HFP time cost) are held in a 2-D array with one row per
+trial and one column per section. Percentiles, IQR outlier bounds and pass
+rates of all sections are calculated in one vectorized pass.
+
+Bootstrap confidence intervals are calculated without materializing the
+resamples. The k-th order statistic of a resample of n values is the value at
+index floor(U * n) of the sorted values, where U is the k-th order statistic
+of n uniform variables and follows Beta(k, n + 1 - k). Thus the bootstrap
+distribution of a percentile is drawn exactly in O(number of resamples)
+for all sections at once, no matter how many trials are aggregated.
+
+Usage to aggregate the columnar reports of many runs:
+  $ python le_section_stats.py report1.npz report2.npz ...
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+from typing import Any, Iterable
+
+import numpy as np
+
+import le_report_export
+import utils
+
+
+# Name of the column of overall event duration.
+EVENT_SECTION = 'event'
+DEFAULT_BOOTSTRAP_NUM = 2000
+DEFAULT_CONFIDENCE = 0.95
+_DURATION_SUFFIX = '_duration_sec'
+_PASSED_SUFFIX = '_passed'
+
+
+@dataclasses.dataclass
+class SectionMatrix:
+  """Durations and pass flags of sections in 2-D arrays.
+
+  Attributes:
+    names: Names of sections which are the performance indices. (See
+      `le_report_data.ReportSection`) The event is named `EVENT_SECTION`.
+    durations: Durations in seconds with shape (trial number, section number).
+      Missing durations are NaN.
+    passed: Pass flags with the same shape as `durations`. Missing flags are
+      `le_report_export.PASS_FLAG_UNKNOWN`.
+  """
+  names: list[str]
+  durations: np.ndarray
+  passed: np.ndarray
+
+  @classmethod
+  def from_columns(cls, columns: dict[str, np.ndarray]) -> SectionMatrix:
+    """Builds the matrix from the columns of columnar report.
+
+    Args:
+      columns: Columns generated by `le_report_export.to_columns` or loaded
+        by `le_report_export.load_columnar`.
+    """
+    names, duration_columns, passed_columns = [], [], []
+    for column_name, column in columns.items():
+      if column_name == 'duration_sec':
+        name = EVENT_SECTION
+      elif column_name.endswith(_DURATION_SUFFIX):
+        name = column_name[:-len(_DURATION_SUFFIX)]
+      else:
+        continue
+
+      passed_column_name = (
+          'passed' if name == EVENT_SECTION else f'{name}{_PASSED_SUFFIX}')
+      names.append(name)
+      duration_columns.append(column.astype(np.float64))
+      passed_columns.append(
+          columns[passed_column_name] if passed_column_name in columns
+          else np.full(len(column), le_report_export.PASS_FLAG_UNKNOWN))
+
+    if not names:
+      return cls(names=[], durations=np.empty((0, 0)),
+                 passed=np.empty((0, 0), dtype=np.int8))
+
+    return cls(
+        names=names,
+        durations=np.column_stack(duration_columns),
+        passed=np.column_stack(passed_columns).astype(np.int8))
+
+  @classmethod
+  def from_trial_records(
+      cls, trial_records: Iterable[dict[str, Any]]) -> SectionMatrix:
+    """Builds the matrix from records of `le_report_export.to_trial_record`."""
+    return cls.from_columns(le_report_export.to_columns(
+        le_report_export.to_flat_row(trial_record)
+        for trial_record in trial_records))
+
+  @classmethod
+  def concat(cls, matrices: Iterable[SectionMatrix]) -> SectionMatrix:
+    """Concatenates the trials of matrices. Sections are united by name."""
+    matrices = list(matrices)
+    names = list(dict.fromkeys(
+        name for matrix in matrices for name in matrix.names))
+    durations, passed = [], []
+    for matrix in matrices:
+      trial_num = matrix.durations.shape[0]
+      matrix_durations = np.full((trial_num, len(names)), np.nan)
+      matrix_passed = np.full(
+          (trial_num, len(names)), le_report_export.PASS_FLAG_UNKNOWN,
+          dtype=np.int8)
+      indices = [names.index(name) for name in matrix.names]
+      matrix_durations[:, indices] = matrix.durations
+      matrix_passed[:, indices] = matrix.passed
+      durations.append(matrix_durations)
+      passed.append(matrix_passed)
+
+    return cls(
+        names=names,
+        durations=np.concatenate(durations) if durations else np.empty((0, 0)),
+        passed=(np.concatenate(passed) if passed
+                else np.empty((0, 0), dtype=np.int8)))
+
+
+@dataclasses.dataclass
+class SectionStats:
+  """Statistics of a section.
+
+  Attributes:
+    name: Name of the section.
+    count: Number of trials having the duration of section.
+    p50: Median of durations.
+    p95: P95 of durations.
+    upper_bound: Outlier bound which is Q3 + 1.5 * IQR.
+    max: Maximum duration.
+    pass_rate: Ratio of passed trials among the judged trials. None if no
+      trial is judged.
+    p50_ci: Bootstrap confidence interval of `p50`.
+    p95_ci: Bootstrap confidence interval of `p95`.
+    pass_rate_ci: Bootstrap confidence interval of `pass_rate`.
+  """
+  name: str
+  count: int
+  p50: float | None = None
+  p95: float | None = None
+  upper_bound: float | None = None
+  max: float | None = None
+  pass_rate: float | None = None
+  p50_ci: tuple[float, float] | None = None
+  p95_ci: tuple[float, float] | None = None
+  pass_rate_ci: tuple[float, float] | None = None
+
+
+def _bootstrap_percentiles(
+    sorted_durations: np.ndarray, counts: np.ndarray, percentile: float,
+    bootstrap_num: int, rng: np.random.Generator) -> np.ndarray:
+  """Draws the bootstrap distribution of a percentile of each section.
+
+  Args:
+    sorted_durations: Durations sorted in each column with NaN at the end.
+    counts: Number of valid durations of each column. All must be positive.
+    percentile: The percentile in range [0, 100].
+    bootstrap_num: Number of bootstrap resamples.
+    rng: Random generator.
+
+  Returns:
+    Array with shape (bootstrap_num, section number).
+  """
+  # Linear interpolation between order statistics as `np.percentile`.
+  position = (counts - 1) * percentile / 100
+  lower_rank = np.floor(position).astype(np.int64) + 1
+  fraction = position - (lower_rank - 1)
+  has_upper = lower_rank < counts
+  shape = (bootstrap_num, len(counts))
+  lower_uniform = rng.beta(lower_rank, counts + 1 - lower_rank, size=shape)
+  upper_uniform = lower_uniform + (1 - lower_uniform) * rng.beta(
+      1, np.maximum(counts - lower_rank, 1), size=shape)
+  columns = np.arange(len(counts))
+
+  def order_statistic(uniform: np.ndarray) -> np.ndarray:
+    indices = np.minimum((uniform * counts).astype(np.int64), counts - 1)
+    return sorted_durations[indices, columns]
+
+  lower_values = order_statistic(lower_uniform)
+  upper_values = np.where(
+      has_upper, order_statistic(upper_uniform), lower_values)
+  return lower_values + fraction * (upper_values - lower_values)
+
+
+def calc_section_stats(
+    matrix: SectionMatrix,
+    pass_criteria_sec: dict[str, float] | None = None,
+    bootstrap_num: int = DEFAULT_BOOTSTRAP_NUM,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int | None = 0) -> list[SectionStats]:
+  """Calculates the statistics of all sections.
+
+  Args:
+    matrix: Durations and pass flags of sections.
+    pass_criteria_sec: Pass criteria of sections by name. (e.g. thresholds
+      in `le_audio_constants`) The pass flags of the given sections are
+      re-evaluated against the criteria.
+    bootstrap_num: Number of bootstrap resamples. 0 to skip confidence
+      intervals.
+    confidence: Confidence level of intervals.
+    seed: Seed of bootstrap resampling.
+
+  Returns:
+    Statistics of each section in the order of `matrix.names`.
+  """
+  durations = matrix.durations
+  valid = ~np.isnan(durations)
+  counts = valid.sum(axis=0)
+  passed = matrix.passed.copy()
+  for name, criteria_sec in (pass_criteria_sec or {}).items():
+    if name in matrix.names:
+      index = matrix.names.index(name)
+      passed[:, index] = np.where(
+          valid[:, index], durations[:, index] <= criteria_sec,
+          le_report_export.PASS_FLAG_UNKNOWN)
+
+  judged_nums = (passed != le_report_export.PASS_FLAG_UNKNOWN).sum(axis=0)
+  pass_nums = (passed == 1).sum(axis=0)
+  stats_list = [
+      SectionStats(name=name, count=int(count))
+      for name, count in zip(matrix.names, counts)]
+  has_values = counts > 0
+  if has_values.any():
+    values = durations[:, has_values]
+    q1, p50, q3, p95 = np.nanpercentile(values, [25, 50, 75, 95], axis=0)
+    upper_bounds = q3 + 1.5 * (q3 - q1)
+    max_values = np.nanmax(values, axis=0)
+    round_digit = utils.get_round_digit()
+    for column, index in enumerate(np.flatnonzero(has_values)):
+      stats = stats_list[index]
+      stats.p50 = round(float(p50[column]), round_digit)
+      stats.p95 = round(float(p95[column]), round_digit)
+      stats.upper_bound = round(float(upper_bounds[column]), round_digit)
+      stats.max = float(max_values[column])
+
+  for stats, judged_num, pass_num in zip(stats_list, judged_nums, pass_nums):
+    if judged_num:
+      stats.pass_rate = float(pass_num / judged_num)
+
+  if bootstrap_num <= 0:
+    return stats_list
+
+  rng = np.random.default_rng(seed)
+  tail_percent = (1 - confidence) / 2 * 100
+  ci_percentiles = [tail_percent, 100 - tail_percent]
+  if has_values.any():
+    sorted_values = np.sort(durations[:, has_values], axis=0)
+    valid_counts = counts[has_values]
+    for percentile, field_name in ((50, 'p50_ci'), (95, 'p95_ci')):
+      lows, highs = np.percentile(
+          _bootstrap_percentiles(
+              sorted_values, valid_counts, percentile, bootstrap_num, rng),
+          ci_percentiles, axis=0)
+      for column, index in enumerate(np.flatnonzero(has_values)):
+        setattr(stats_list[index], field_name,
+                (float(lows[column]), float(highs[column])))
+
+  is_judged = judged_nums > 0
+  if is_judged.any():
+    judged = judged_nums[is_judged]
+    pass_rates = rng.binomial(
+        judged, pass_nums[is_judged] / judged,
+        size=(bootstrap_num, len(judged))) / judged
+    lows, highs = np.percentile(pass_rates, ci_percentiles, axis=0)
+    for column, index in enumerate(np.flatnonzero(is_judged)):
+      stats_list[index].pass_rate_ci = (
+          float(lows[column]), float(highs[column]))
+
+  return stats_list
+
+
+def _ci_str(ci: tuple[float, float] | None, percent: bool = False) -> str:
+  if ci is None:
+    return '-'
+
+  if percent:
+    return f'[{ci[0] * 100:.1f}%, {ci[1] * 100:.1f}%]'
+
+  return f'[{ci[0]:.3f}, {ci[1]:.3f}]'
+
+
+def format_table(stats_list: list[SectionStats]) -> str:
+  """Formats the statistics as a text table."""
+  lines = [
+      f'{"Section":<24}{"Count":>8}{"P50":>9}{"P95":>9}{"P95 CI":>20}'
+      f'{"Outliner":>10}{"Max":>9}{"Pass Rate":>11}{"Pass Rate CI":>18}']
+  for stats in stats_list:
+    if not stats.count:
+      continue
+
+    pass_rate_str = (
+        f'{stats.pass_rate * 100:.1f}%' if stats.pass_rate is not None
+        else '-')
+    lines.append(
+        f'{stats.name:<24}{stats.count:>8}{stats.p50:>9}{stats.p95:>9}'
+        f'{_ci_str(stats.p95_ci):>20}{stats.upper_bound:>10}'
+        f'{stats.max:>9.3f}{pass_rate_str:>11}'
+        f'{_ci_str(stats.pass_rate_ci, percent=True):>18}')
+
+  return '\n'.join(lines)
+
+
+def main():
+  parser = argparse.ArgumentParser(
+      description='Statistics of report sections across columnar reports.')
+  parser.add_argument(
+      'report_files', nargs='+',
+      help='Columnar reports (.npz or .parquet) of runs to aggregate.')
+  parser.add_argument('--bootstrap-num', type=int,
+                      default=DEFAULT_BOOTSTRAP_NUM)
+  parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+  parser.add_argument('--seed', type=int, default=0)
+  args = parser.parse_args()
+
+  matrix = SectionMatrix.concat(
+      SectionMatrix.from_columns(le_report_export.load_columnar(file_path))
+      for file_path in args.report_files)
+  print(format_table(calc_section_stats(
+      matrix, bootstrap_num=args.bootstrap_num, confidence=args.confidence,
+      seed=args.seed)))
+
+
+if __name__ == '__main__':
+  main()
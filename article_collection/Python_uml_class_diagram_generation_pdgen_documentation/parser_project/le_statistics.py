@@ -0,0 +1,222 @@
+"""Module to accumulate the statistics of durations in streaming way.
+
+The quantiles are estimated by P-square algorithm (Jain & Chlamtac, 1985)
+which keeps only 5 markers per quantile, so the memory usage is constant no
+matter how many trials are found during a long monitoring session. The
+values are kept as well until their number exceeds the exact limit, and the
+statistics are calculated exactly in the same way as the reports
+(`utils.calc_p95_info`) before that.
+"""
+from __future__ import annotations
+
+import bisect
+import dataclasses
+
+import utils
+
+
+# Number of values kept to calculate the statistics exactly.
+DEFAULT_EXACT_LIMIT = 1000
+_MARKER_NUM = 5
+
+
+class P2Quantile:
+  """P-square estimator of a single quantile.
+
+  Attributes:
+    quantile: The estimated quantile in range (0, 1).
+    count: Number of added values.
+  """
+
+  def __init__(self, quantile: float):
+    self.quantile = quantile
+    self.count = 0
+    self._heights: list[float] = []
+    self._positions = [1, 2, 3, 4, 5]
+    self._desired_positions = [
+        1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+    self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+  def add(self, value: float) -> None:
+    self.count += 1
+    heights = self._heights
+    if len(heights) < _MARKER_NUM:
+      bisect.insort(heights, value)
+      return
+
+    if value < heights[0]:
+      heights[0] = value
+      cell = 0
+    elif value >= heights[-1]:
+      heights[-1] = value
+      cell = _MARKER_NUM - 2
+    else:
+      cell = bisect.bisect_right(heights, value) - 1
+
+    positions = self._positions
+    for index in range(cell + 1, _MARKER_NUM):
+      positions[index] += 1
+
+    for index in range(_MARKER_NUM):
+      self._desired_positions[index] += self._increments[index]
+
+    for index in range(1, _MARKER_NUM - 1):
+      delta = self._desired_positions[index] - positions[index]
+      if ((delta >= 1 and positions[index + 1] - positions[index] > 1) or
+          (delta <= -1 and positions[index - 1] - positions[index] < -1)):
+        step = 1 if delta > 0 else -1
+        height = self._parabolic(index, step)
+        if not heights[index - 1] < height < heights[index + 1]:
+          height = self._linear(index, step)
+
+        heights[index] = height
+        positions[index] += step
+
+  def _parabolic(self, index: int, step: int) -> float:
+    heights, positions = self._heights, self._positions
+    return heights[index] + step / (
+        positions[index + 1] - positions[index - 1]) * (
+            (positions[index] - positions[index - 1] + step)
+            * (heights[index + 1] - heights[index])
+            / (positions[index + 1] - positions[index])
+            + (positions[index + 1] - positions[index] - step)
+            * (heights[index] - heights[index - 1])
+            / (positions[index] - positions[index - 1]))
+
+  def _linear(self, index: int, step: int) -> float:
+    heights, positions = self._heights, self._positions
+    return heights[index] + step * (
+        heights[index + step] - heights[index]) / (
+            positions[index + step] - positions[index])
+
+  @property
+  def value(self) -> float | None:
+    """Estimated quantile. None if no value is added."""
+    if not self._heights:
+      return None
+
+    if self.count <= _MARKER_NUM:
+      import numpy as np
+
+      return float(np.percentile(self._heights, self.quantile * 100))
+
+    return self._heights[2]
+
+
+@dataclasses.dataclass
+class StatsSnapshot:
+  """Running statistics of durations.
+
+  Attributes:
+    count: Number of durations.
+    pass_num: Number of passed trials.
+    p50: Median of durations.
+    p95: P95 of durations.
+    upper_bound: Outlier bound which is Q3 + 1.5 * IQR.
+    max: Maximum duration.
+    pass_rate: Ratio of passed trials among the trials with pass criteria.
+    is_exact: True if the quantiles are calculated exactly.
+  """
+  count: int
+  pass_num: int
+  p50: float | None
+  p95: float | None
+  upper_bound: float | None
+  max: float | None
+  pass_rate: float | None
+  is_exact: bool
+
+
+class StreamingStats:
+  """Accumulator of duration statistics updated by each found trial.
+
+  Attributes:
+    exact_limit: Number of values kept to calculate the statistics exactly.
+    count: Number of added durations.
+    pass_num: Number of passed trials.
+    judged_num: Number of trials judged as passed or failed.
+    max: Maximum duration.
+  """
+
+  def __init__(self, exact_limit: int = DEFAULT_EXACT_LIMIT):
+    self.exact_limit = exact_limit
+    self.count = 0
+    self.pass_num = 0
+    self.judged_num = 0
+    self.max: float | None = None
+    self._values: list[float] | None = []
+    self._estimators = {
+        quantile: P2Quantile(quantile) for quantile in (0.25, 0.5, 0.75, 0.95)}
+
+  def add(self, value: float, passed: bool | None = None) -> None:
+    """Adds the duration of a found trial.
+
+    Args:
+      value: Duration in seconds.
+      passed: True if the trial passes the criteria. None if not judged.
+    """
+    self.count += 1
+    self.max = value if self.max is None else max(self.max, value)
+    if passed is not None:
+      self.judged_num += 1
+      self.pass_num += int(passed)
+
+    for estimator in self._estimators.values():
+      estimator.add(value)
+
+    if self._values is not None:
+      self._values.append(value)
+      if len(self._values) > self.exact_limit:
+        # Drops the values to keep the memory usage constant.
+        self._values = None
+
+  @property
+  def is_exact(self) -> bool:
+    return self._values is not None
+
+  def snapshot(self) -> StatsSnapshot:
+    """Gets the running statistics."""
+    pass_rate = self.pass_num / self.judged_num if self.judged_num else None
+    if not self.count:
+      return StatsSnapshot(
+          count=0, pass_num=self.pass_num, p50=None, p95=None,
+          upper_bound=None, max=None, pass_rate=pass_rate, is_exact=True)
+
+    round_digit = utils.get_round_digit()
+    if self.is_exact:
+      import numpy as np
+
+      p95_info = utils.calc_p95_info(self._values)
+      p50 = float(np.percentile(self._values, 50))
+      p95, upper_bound = p95_info.p95, p95_info.upper_bound
+    else:
+      q1 = self._estimators[0.25].value
+      q3 = self._estimators[0.75].value
+      p50 = self._estimators[0.5].value
+      p95 = round(self._estimators[0.95].value, round_digit)
+      upper_bound = round(q3 + 1.5 * (q3 - q1), round_digit)
+
+    return StatsSnapshot(
+        count=self.count, pass_num=self.pass_num,
+        p50=round(p50, round_digit), p95=float(p95),
+        upper_bound=float(upper_bound), max=self.max, pass_rate=pass_rate,
+        is_exact=self.is_exact)
+
+  def summary(self) -> str:
+    """Gets the one line summary of running statistics.
+
+    e.g.: P50=1.2; P95=2.3; Outliner=3.1; Max=3.5; Pass Rate 95.0% (19/20)
+    """
+    snapshot = self.snapshot()
+    if not snapshot.count:
+      return 'No trial found yet'
+
+    pass_rate_str = (
+        f'{snapshot.pass_rate * 100:.01f}% '
+        f'({snapshot.pass_num}/{self.judged_num})'
+        if snapshot.pass_rate is not None else 'N/A')
+    estimated_str = '' if snapshot.is_exact else ' (estimated)'
+    return (
+        f'P50={snapshot.p50}; P95={snapshot.p95};'
+        f' Outliner={snapshot.upper_bound}; Max={snapshot.max};'
+        f' Pass Rate {pass_rate_str}{estimated_str}')
@@ -2,15 +2,17 @@
 
 import argparse
 import constants
-import dataclasses
 from dotenv import load_dotenv
 import logging
 import os
 import sys
 
 import le_audio_log_event_publisher
-from observer.le_audio_log_observer import LeAudioLogObserver
-from observer.le_audio_pairing_test import PairPattern
+import le_log_merge
+import le_log_reader
+import le_parser_registry
+import le_reorder_buffer
+import utils
 
 
 load_dotenv()
@@ -21,121 +23,28 @@ logging.basicConfig(
     datefmt='%H:%M:%S', level=logging.DEBUG)
 
 
-@dataclasses.dataclass(frozen=True)
-class LEParserTask:
-  task_id: int
-  observer_cls: LeAudioLogObserver
-  description: str
-
-
-ParserTaskInfo = {
-    1: LEParserTask(1, PairPattern, 'Generic: Pair and connection'),
-}
-
-
 def check_value_in_test_case_options():
   """Checks if given `tc_no` exist in predefined test cases options."""
-  if int(tc_no) in ParserTaskInfo:
+  if int(tc_no) in le_parser_registry.tasks():
       return True
 
   return False
 
 
 def select_parser_task_info():
-  """Prints perf parser task information."""
-  item_2_task_id = {
-      1:   1,
-      2:   2,
-      3:  37,
-      4:   3,
-      5:   4,
-      6:   5,
-      7:  26,
-      8:  24,
-      9:  23,
-     10:  42,
-     11:  27,
-     12:  25,
-     13:   7,
-     14:  36,
-     15:  23,
-     16:   8,
-     17:  40,
-     18:   9,
-     19:  39,
-     20:  10,
-     21:  35,
-     22:  11,
-     23:  34,
-     24:  12,
-     25:  33,
-     26:  13,
-     27:  33,
-     28:  14,
-     29:  28,
-     30:  15,
-     31:  29,
-     32:  16,
-     33:  38,
-     34:  17,
-     35:  29,
-     36:  18,
-     37:  31,
-     38:  19,
-     39:  30,
-     40:  20,
-     41:  22,
-     42:  42,
-  }
-  print(TitleStyle + '\n\t=== Performance - Connection ===' + Color.END)
-  print('\t  1. Generic: Pair and connection')
-  print('\t  2. Generic: Reconnect - Turn off/on DUT BT')
-  print('\t  3. Generic: Reconnect by TA')
-  print('\t  4. Media streaming: One earbud dropping the connection and reconnection')
-  print('\t  5. Call conversation: One earbud dropping the connection and reconnection')
-  print(TitleStyle + '\n\t=== Performance - Media/Call control ===' + Color.END)
-  print('\t  6. Media Control: Play music from LE Audio device (HW)')
-  print('\t  7. Media Control: Play music from LE Audio device (SW)')
-  print('\t  8. Media Control: Pause music from LE Audio device')
-  print('\t  9. Media Control: Volume control from LE Audio device')
-  print('\t 10. Call Control: Incoming call from LE audio device (HW)')
-  print('\t 11. Call Control: Incoming call from LE audio device (SW)')
-  print('\t 12. Call Control: End call from LE Audio devices')
-  print('\t 13. Call Control: Outgoing call from DUT (HW)')
-  print('\t 14. Call Control: Outgoing call from DUT (SW)')
-  print('\t 15. Call Control: Volume control from LE Audio device')
-  print(TitleStyle + '\n\t=== Performance - Content type switching ===' + Color.END)
-  print('\t 16. Stream interrupted by incoming call: LE media stream -> LE conversation stream')
-  print('\t 17. Stream interrupted by incoming call: LE media stream -> LE conversation stream (SW)')  # New
-  print('\t 18. Stream resume back after call end with LE audio device: LE conversation stream -> LE media stream')
-  print('\t 19. Stream resume back after call end with LE audio device: LE conversation stream -> LE media stream (SW)')  # New
-  print(TitleStyle + '\n\t=== Performance - Audio path switching ===' + Color.END)
-  print('\t 20. Media streaming: LE media stream -> DUT speaker (HW)')
-  print('\t 21. Media streaming: LE media stream -> DUT speaker (SW)')
-  print('\t 22. Media streaming: DUT speaker -> LE media stream (HW)')
-  print('\t 23. Media streaming: DUT speaker -> LE media stream (SW)')
-  print('\t 24. Call conversation: LE conversation stream -> DUT speaker (HW)')
-  print('\t 25. Call conversation: LE conversation stream -> DUT speaker (SW)')
-  print('\t 26. Call conversation: DUT speaker -> LE conversation stream (HW)')
-  print('\t 27. Call conversation: DUT speaker -> LE conversation stream (SW)')
-  print(TitleStyle + '\n\t=== Performance - Multi-connections with BR/EDR device ===' + Color.END)
-  print('\t 28. Media streaming: LE media stream (HW) -> A2dp HW offload')
-  print('\t 29. Media streaming: LE media stream (SW) -> A2dp HW offload')
-  print('\t 30. Media streaming: A2dp HW offload -> LE media stream (HW)')
-  print('\t 31. Media streaming: A2dp HW offload -> LE media stream (SW)')
-  print('\t 32. Media streaming: LE media stream -> A2dp SW encode')
-  print('\t 33. Media streaming: LE media stream (SW) -> A2dp SW encode')
-  print('\t 34. Media streaming: A2dp SW encode -> LE media stream (HW)')
-  print('\t 35. Media streaming: A2dp SW encode -> LE media stream (SW)')
-  print('\t 36. Call conversation: LE conversation stream (HW) -> HFP')
-  print('\t 37. Call conversation: LE conversation stream (SW) -> HFP')
-  print('\t 38. Call conversation: HFP -> LE conversation stream (HW)')
-  print('\t 39. Call conversation: HFP -> LE conversation stream (SW)')
-  print(TitleStyle + '\n\t=== Others ===' + Color.END)
-  print('\t 40. Generic: Reconnect - disconnect/connect from phone setting UI')
+  """Prints perf parser task information and gets the selected task ID."""
+  menu_tasks = []
+  category = None
+  for task in le_parser_registry.tasks().values():
+    if task.category != category:
+      category = task.category
+      print(TitleStyle + f'\n\t=== {category} ===' + Color.END)
+
+    menu_tasks.append(task)
+    print(f'\t{len(menu_tasks):>3}. {task.description}')
 
   tc_no = int(input('\nInput a test case number: '))
-  task_id = item_2_task_id[tc_no]
+  task_id = menu_tasks[tc_no - 1].task_id
   log.info(f'Executing parser task-{task_id}...')
   return task_id
 
@@ -145,12 +54,12 @@ def print_perf_test_case_options():
   le_audio_new_task_nums = {
       23, 24, 25, 26, 27, 28, 29, 30, 31, 32, 33, 34, 35, 36}
   print('\n+++ LE Audio performance test case +++\n')
-  for task_id, task_info in ParserTaskInfo.items():
+  for task_id, task_info in le_parser_registry.tasks().items():
     if task_id <= 20 or task_id in le_audio_new_task_nums:
       print(f'{task_id:>3} : {task_info.description}')
 
   print('\n+++ Classic performance test case +++\n')
-  for option in test_case_options:
+  for task_id, task_info in le_parser_registry.tasks().items():
     if task_id > 20 and task_id not in le_audio_new_task_nums:
       print(f'{task_id:>3} : {task_info.description}')
 
@@ -164,7 +73,71 @@ if __name__ == '__main__':
   parser.add_argument('logcat_filename', type=str, nargs='?')
   parser.add_argument('result_filename', type=str, nargs='?')
   parser.add_argument('tc_no', type=str, nargs='?')
+  parser.add_argument(
+      '--formats', type=str, default=None,
+      help=(
+          'Comma separated output formats among '
+          f'{",".join(constants.ReportFormat)}. Unrequested formats are not'
+          ' generated. (default: '
+          f'{",".join(constants.DEFAULT_REPORT_FORMATS)} or environment'
+          f' variable {constants.ENV_REPORT_FORMATS})'))
+  parser.add_argument(
+      '--profile-patterns', action='store_true', default=None,
+      help=(
+          'Profile the hit count and cost of each pattern. (Or set environment'
+          f' variable {constants.ENV_PATTERN_PROFILE}=1)'))
+  parser.add_argument(
+      '--metrics-file', type=str, default=None,
+      help='Output the stage timing and throughput metrics into JSON file.')
+  parser.add_argument(
+      '--profile-cpu', action='store_true',
+      help=(
+          'Run the parsing under cProfile and dump pstats of each phase into'
+          ' "<result filename>_<phase>.pstats".'))
+  parser.add_argument(
+      '--profile-mem', action='store_true',
+      help=(
+          'Run the parsing under tracemalloc and dump top allocation sites of'
+          ' each phase into "<result filename>_<phase>_mem.txt".'))
+  parser.add_argument(
+      '--since', type=le_log_reader.parse_log_time, default=None,
+      help=(
+          'Only analyze the log from this time in format'
+          ' "MM-DD HH:MM:SS[.ffffff]". The log file must be sorted by time.'))
+  parser.add_argument(
+      '--until', type=le_log_reader.parse_log_time, default=None,
+      help=(
+          'Only analyze the log until this time (plus the search timeout) in'
+          ' format "MM-DD HH:MM:SS[.ffffff]".'))
+  parser.add_argument(
+      '--reorder-lines', type=int, default=None,
+      help=(
+          'Reorder the out-of-order lines by timestamp within a window of this'
+          f' number of lines. (Or set {constants.ENV_REORDER_WINDOW_LINES})'))
+  parser.add_argument(
+      '--reorder-ms', type=int, default=None,
+      help=(
+          'Reorder the out-of-order lines by timestamp within a window of this'
+          f' time span in ms. (Or set {constants.ENV_REORDER_WINDOW_MS})'))
+  parser.add_argument(
+      '--history-db', type=str, default=None,
+      help=(
+          'Record the run and its trials into this SQLite database. (Or set'
+          f' environment variable {constants.ENV_HISTORY_DB})'))
+  parser.add_argument(
+      '--build', type=str, default=None,
+      help=(
+          'Label of the build under test recorded with the run history. (Or'
+          f' set environment variable {constants.ENV_BUILD})'))
   args = parser.parse_args()
+  if args.profile_cpu:
+    os.environ[utils.ENV_PROFILE_CPU] = '1'
+  if args.profile_mem:
+    os.environ[utils.ENV_PROFILE_MEM] = '1'
+  if args.build:
+    os.environ[constants.ENV_BUILD] = args.build
+
+  report_formats = constants.ReportFormat.from_str_list(args.formats)
   logcat_filename = args.logcat_filename
   result_filename = args.result_filename
   headset_type_str = os.getenv('HEADSET_TYPE', None)
@@ -191,7 +164,9 @@ if __name__ == '__main__':
   if not logcat_filename:
     logcat_filename = input('Input a logcat filename: ')
 
-  if not os.path.isfile(logcat_filename) and not logcat_filename.startswith('device:'):
+  if (not os.path.isfile(logcat_filename)
+      and not logcat_filename.startswith('device:')
+      and not le_log_merge.is_merge_input(logcat_filename)):
     log.error('Input logcat file=%s does not exist!\n', logcat_filename)
     sys.exit(1)
 
@@ -208,15 +183,24 @@ if __name__ == '__main__':
     sys.exit(1)
 
   # Initialization
-  log_gr = le_audio_log_event_publisher.LogEventPublisher()
+  log_gr = le_audio_log_event_publisher.LogEventPublisher(
+      formats=report_formats, profile_patterns=args.profile_patterns,
+      metrics_file_path=args.metrics_file,
+      reorder_window=(
+          le_reorder_buffer.ReorderWindow(
+              max_lines=args.reorder_lines, max_delay_ms=args.reorder_ms)
+          if args.reorder_lines or args.reorder_ms else None),
+      history_db_path=args.history_db)
 
   registered_observer_count = 0  # pylint: disable=invalid-name
   tc_no = int(tc_no)
-  task_info = ParserTaskInfo[tc_no]
-  parser_clz = task_info.observer_cls
-  parser_object = parser_clz()
-  parser_object.lea_config = constants.LEAConfig.from_headset_type(headset_type)
-  parser_object.task_num = tc_no
+  task_info = le_parser_registry.get_task(tc_no)
+  if not task_info.supports(headset_type):
+    log.error('Task %s does not support headset type=%s!\n', tc_no,
+              headset_type.value)
+    sys.exit(1)
+
+  parser_object = task_info.create_observer(headset_type)
   log_gr.register_observer(parser_object)
   log.debug('Registered observer %s...(tc_no=%s)', parser_object, task_info.task_id)
   registered_observer_count += 1
@@ -227,4 +211,5 @@ if __name__ == '__main__':
   # Parsing
   # log_gr.convert_to_utf8(input_file_path=logcat_filename)
   log_gr.start_to_search(
-      input_file_path=logcat_filename, output_file_path=result_filename)
+      input_file_path=logcat_filename, output_file_path=result_filename,
+      since=args.since, until=args.until)
@@ -15,7 +15,10 @@ import le_audio_constants
 import le_audio_parsing_data
 from le_audio_parsing_data import CollectOutputResult
 from le_audio_parsing_data import OutputResult
+import le_log_reader
 import le_patterns
+import le_raw_hit_sink
+import le_statistics
 
 
 Color = constants.Color
@@ -79,6 +82,10 @@ class LeAudioLogObserver(Observer):
       streaming connection.
     has_prefix_drop_signal: True to drop the next caught record and reset
       itself as False then.
+    keep_global_raw_data: True to keep all matched lines in `global_raw_data`.
+      The publisher turns it off if the raw dump is not requested.
+    global_raw_data: Sink of all matched lines. Only the recent lines are kept
+      in memory and the others are spilled into file once the sink is opened.
 
     **Attributes for le_audio_conversation_stream_interrupt_and_reconnect_test
     bt_stack_codec_configured_freq: Accumulated count of matching pattern to
@@ -107,6 +114,8 @@ class LeAudioLogObserver(Observer):
       pattern, including timeouts.
     incomplete_callback: Callback to be executed when the parsing is not
       completed and there are missing patterns found.
+    duration_stats: Running statistics of the durations of found records
+      which are updated by each found record.
 
     **Attributes for
       le_audio_path_swtich_from_le_media_stream_to_phone_speaker_test
@@ -139,7 +148,8 @@ class LeAudioLogObserver(Observer):
     self._found_num = 0
     self._search_timeout_sec = search_timeout_sec
     self._task_num = -1
-    self._global_raw_data: list[str] = []
+    self._global_raw_data = le_raw_hit_sink.RawHitSink()
+    self.keep_global_raw_data = True
     self._pattern_match_times: list[datetime.datetime] = []
     self.has_prefix_drop_signal = False
     self.pattern_count_list = []
@@ -147,6 +157,7 @@ class LeAudioLogObserver(Observer):
     self.expect_start_pattern_count = 1
     self.drop_num = 0
     self.incomplete_callback = incomplete_callback
+    self.duration_stats = le_statistics.StreamingStats()
     self._lea_config: constants.LEAConfig | None = lea_config
 
   def get_pattern(self, key):
@@ -161,7 +172,7 @@ class LeAudioLogObserver(Observer):
     return self.lea_config.streaming_confg * 2
 
   @property
-  def global_raw_data(self) -> list[str]:
+  def global_raw_data(self) -> le_raw_hit_sink.RawHitSink:
     return self._global_raw_data
 
   @property
@@ -541,9 +552,25 @@ class LeAudioLogObserver(Observer):
         self.captured.stream_create_start_time, self.captured.event_end_time)
 
     self.captured.trial += 1
+    self.update_duration_stats()
     captured_messages.append(copy.deepcopy(self.captured))
     return captured_messages
 
+  def update_duration_stats(self) -> None:
+    """Adds the duration of captured record into the running statistics."""
+    if self.captured.start_to_end_duration is None:
+      return
+
+    event_end_result = self.captured.event_end_result
+    self.duration_stats.add(
+        self.captured.start_to_end_duration_in_sec,
+        passed=(
+            event_end_result == general_data.EndResult.PASS
+            if event_end_result in (
+                general_data.EndResult.PASS, general_data.EndResult.FAIL)
+            else None))
+    self.log.info('Live KPI: %s', self.duration_stats.summary())
+
   def calc_start_to_end_duration(
       self, start_time: datetime.datetime, end_time: datetime.datetime,
       duration_name: str = 'unknown',
@@ -598,7 +625,9 @@ class LeAudioLogObserver(Observer):
 
   def save_matcher_raw_data(self, matcher: re.Match[str]) -> None:
     try:
-      self._global_raw_data.append(matcher.group(0))
+      if self.keep_global_raw_data:
+        self._global_raw_data.append(matcher.group(0))
+
       matched_time = matcher.group('time')
       if matched_time.startswith('02-29'):
         temp_time = datetime.datetime.strptime(
@@ -610,8 +639,7 @@ class LeAudioLogObserver(Observer):
 
       self.captured.temp_time = temp_time
       self.captured.raw_data.append(
-          Log(self.captured.temp_time, matcher.group('log'))
-      )
+          le_log_reader.to_log(self.captured.temp_time, matcher))
       self._pattern_match_times.append(temp_time)
     except Exception as e:
       print(f'Error: matcher={matcher}')
@@ -5,6 +5,7 @@ import re
 
 import general_data
 import le_audio_constants
+import le_parser_registry
 import le_patterns
 
 from le_audio_parsing_data import CollectOutputResult
@@ -16,6 +17,9 @@ Log = general_data.Log
 _PatternEnum = general_data.PatternEnum
 
 
+@le_parser_registry.register_task(
+    1, 'Generic: Pair and connection',
+    category=le_parser_registry.CATEGORY_CONNECTION)
 class PairPattern(LeAudioLogObserver):
   """The observe to detect LE audio pairing process from log for testing purpose.
 
@@ -0,0 +1,104 @@
+"""The observer to detect synthetic trials for benchmarks and golden tests."""
+import constants
+import general_data
+import le_patterns
+
+from le_audio_parsing_data import CollectOutputResult
+from le_audio_parsing_data import OutputFormat
+from observer.le_audio_log_observer import LeAudioLogObserver
+
+
+Color = constants.Color
+_PatternEnum = general_data.PatternEnum
+_TIME_RE = r'(?P<time>\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3})'
+# Pass criteria of synthetic trial. `le_logcat_generator` makes the trials
+# last 70% of it in average.
+SYNTHETIC_TRIAL_TIME_SEC = 5.0
+
+
+class SyntheticTrialStart(le_patterns.REPattern):
+  """Start of synthetic trial."""
+
+  def __init__(self):
+    super().__init__(
+        _TIME_RE + r'\s+\d+\s+\d+ I SyntheticTrial: (?P<log>TRIAL_START id=\d+)')
+
+
+class SyntheticTrialStep(le_patterns.REPattern):
+  """Optional step in the middle of synthetic trial."""
+
+  def __init__(self):
+    super().__init__(
+        _TIME_RE + r'\s+\d+\s+\d+ D SyntheticTrial: (?P<log>TRIAL_STEP \w+)',
+        is_optional=True)
+
+
+class SyntheticTrialAbort(le_patterns.REPattern):
+  """Abort of synthetic trial which resets the parsing process."""
+
+  def __init__(self):
+    super().__init__(
+        _TIME_RE + r'\s+\d+\s+\d+ W SyntheticTrial: (?P<log>TRIAL_ABORT)',
+        reset_signal=True)
+
+
+class SyntheticTrialEnd(le_patterns.REPattern):
+  """End of synthetic trial."""
+
+  def __init__(self):
+    super().__init__(
+        _TIME_RE + r'\s+\d+\s+\d+ I SyntheticTrial: (?P<log>TRIAL_END id=\d+)')
+
+
+class SyntheticTrialPattern(LeAudioLogObserver):
+  """The observer to detect synthetic trials from TRIAL_START to TRIAL_END.
+
+  No device is behind the trials. The patterns are simple for
+  `le_logcat_generator` to synthesize the logcat, so the benchmarks and the
+  golden corpus run without real device logs. It is not registered as task.
+  """
+
+  def __init__(self):
+    super().__init__(
+        title='***Start To Parse Log For Synthetic Trial Information\n',
+        log_pattern_dict={
+            _PatternEnum.START: SyntheticTrialStart(),
+            _PatternEnum.STATE_1: SyntheticTrialStep(),
+            _PatternEnum.RESET: SyntheticTrialAbort(),
+            _PatternEnum.END: SyntheticTrialEnd(),
+        },
+        event_pass_criteria_sec=SYNTHETIC_TRIAL_TIME_SEC)
+    self.captured.output_format = OutputFormat.GENERIC
+
+  def find_log_pattern(self, line: str) -> CollectOutputResult:
+    """Starts to parse logs for synthetic trial information.
+
+    Args:
+      line: The line of input file to analyze.
+
+    Returns:
+      captured_messages: The matching messages.
+    """
+    for state, pattern in self.captured.log_pattern_dict.items():
+      is_started = self.captured.event_start_time is not None
+      matcher = pattern.s(
+          line, state, self.captured, reset_func=self.set_to_default_value)
+      if matcher is None:
+        continue
+
+      if state == _PatternEnum.START and is_started:
+        self.log.info('Start pattern hit again before the end pattern!')
+        self.drop_num += 1
+      elif state == _PatternEnum.END and is_started:
+        captured_messages = self.append_result_info([])
+        self.set_to_default_value()
+        return captured_messages
+
+    time_diff = self.captured.is_timeout(self._search_timeout_sec)
+    if time_diff:
+      self.log.warning(
+          Color.ORANGE + Color.BOLD + 'Timeout reached after '
+          f'{time_diff.total_seconds()}s (limit: {self._search_timeout_sec}s)! '
+          'Resetting the searching process.' + Color.END)
+      self.drop_num += 1
+      self.set_to_default_value()
@@ -1,14 +1,20 @@
 """Module to hold utilities used in testing."""
 import constants
+import cProfile
 import dataclasses
 import functools
-import numpy as np
+import inspect
+import logging
 import os
-import pdb
+import tracemalloc
 from typing import Any, Callable, Optional
 
 
 _ENV_PDB = 'LE_AUDIO_PDB'
+ENV_PROFILE_CPU = 'LE_AUDIO_PROFILE_CPU'
+ENV_PROFILE_MEM = 'LE_AUDIO_PROFILE_MEM'
+# Number of top allocation sites dumped in each phase.
+_PROFILE_MEM_TOP_NUM = 30
 
 
 @dataclasses.dataclass
@@ -26,12 +32,13 @@ def get_round_digit() -> int:
 
 def calc_p95_info(perf_data: list[float]) -> PerfP95:
   """Calculates the P95 related statistical data."""
-  p95 = round(
-      np.percentile(perf_data, 95), get_round_digit())
-  q1, q3 = np.percentile(sorted(perf_data), [25, 75])
+  # NumPy is imported on first use to keep the startup fast.
+  import numpy as np
+
+  q1, q3, p95 = np.percentile(perf_data, [25, 75, 95])
   iqr = q3 - q1
   upper_bound = round(q3 + (1.5 * iqr), get_round_digit())
-  return PerfP95(p95=p95, upper_bound=upper_bound)
+  return PerfP95(p95=round(p95, get_round_digit()), upper_bound=upper_bound)
 
 
 def pdb_able(func: Optional[Callable[..., Any]] = None,
@@ -58,6 +65,8 @@ def pdb_able(func: Optional[Callable[..., Any]] = None,
     @functools.wraps(func)
     def func_wrapper(*args, **kwargs):
       if os.environ.get(_ENV_PDB, '0') == '1':
+        import pdb
+
         try:
           if enter:
             return pdb.runcall(func, *args, **kwargs)
@@ -85,11 +94,164 @@ def pdb_able(func: Optional[Callable[..., Any]] = None,
     return decorate_func(func)
 
 
-def print_p95(perf_data: list[float]):
+class _ProfileSession:
+  """Session of cProfile/tracemalloc profiling which is dumped per phase."""
+
+  def __init__(self, output_prefix: str, cpu: bool, mem: bool):
+    self.log = logging.getLogger(self.__class__.__name__)
+    self.output_prefix = output_prefix
+    self._cpu_profile: cProfile.Profile | None = (
+        cProfile.Profile() if cpu else None)
+    self._mem = mem
+    self._mem_snapshot: tracemalloc.Snapshot | None = None
+
+  @staticmethod
+  def _take_mem_snapshot() -> tracemalloc.Snapshot:
+    # Excludes the allocation of profilers and importing.
+    return tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, cProfile.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+
+  def start(self) -> None:
+    if self._mem:
+      tracemalloc.start()
+      self._mem_snapshot = self._take_mem_snapshot()
+
+    if self._cpu_profile:
+      self._cpu_profile.enable()
+
+  def checkpoint(self, phase: str) -> None:
+    """Dumps the profile collected since the previous checkpoint."""
+    if self._cpu_profile:
+      self._cpu_profile.disable()
+      pstats_file_path = f'{self.output_prefix}_{phase}.pstats'
+      self.log.info('Output CPU profile to %s...', pstats_file_path)
+      self._cpu_profile.dump_stats(pstats_file_path)
+
+    if self._mem:
+      snapshot = self._take_mem_snapshot()
+      _, peak_size = tracemalloc.get_traced_memory()
+      tracemalloc.reset_peak()
+      mem_file_path = f'{self.output_prefix}_{phase}_mem.txt'
+      self.log.info('Output memory profile to %s...', mem_file_path)
+      with open(mem_file_path, 'w') as fw:
+        fw.write(f'Peak traced memory: {peak_size / 1024:.1f} KiB\n')
+        fw.write(f'Top {_PROFILE_MEM_TOP_NUM} allocation sites:\n')
+        for stat in snapshot.compare_to(
+            self._mem_snapshot, 'lineno')[:_PROFILE_MEM_TOP_NUM]:
+          fw.write(f'{stat}\n')
+
+      self._mem_snapshot = snapshot
+
+    if self._cpu_profile:
+      self._cpu_profile = cProfile.Profile()
+      self._cpu_profile.enable()
+
+  def stop(self) -> None:
+    if self._cpu_profile:
+      self._cpu_profile.disable()
+
+    if self._mem:
+      tracemalloc.stop()
+
+
+_active_profile_session: _ProfileSession | None = None
+
+
+def profile_checkpoint(phase: str) -> None:
+  """Dumps the profile of given phase if `profile_able` is activated.
+
+  Args:
+    phase: Name of the phase which just ends. It is used as the suffix of the
+      dumped files.
+  """
+  if _active_profile_session is not None:
+    _active_profile_session.checkpoint(phase)
+
+
+def profile_able(func: Optional[Callable[..., Any]] = None,
+                 *,
+                 output_prefix_arg: str = 'output_file_path'
+                 ) -> Callable[..., Any]:
+  """Decorator of function which will be run under cProfile and/or tracemalloc.
+
+  This decorator will only be working when environment variable
+  LE_AUDIO_PROFILE_CPU or LE_AUDIO_PROFILE_MEM is set to 1. Otherwise this
+  decorator will be disabled in default.
+
+  The profile is dumped at each `profile_checkpoint` called by the decorated
+  function and at the end of it into files "<output prefix>_<phase>.pstats"
+  (cProfile) and "<output prefix>_<phase>_mem.txt" (tracemalloc).
+
+  Args:
+    func: The decorated function.
+    output_prefix_arg: Name of argument of the decorated function holding the
+      prefix of dumped files. The function name is used if not given.
+
+  Returns:
+    The wrapper of decorated function.
+  """
+
+  def decorate_func(func: Optional[Callable[..., Any]]) -> Callable[..., Any]:
+    func_signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def func_wrapper(*args, **kwargs):
+      global _active_profile_session
+      profile_cpu = os.environ.get(ENV_PROFILE_CPU, '0') == '1'
+      profile_mem = os.environ.get(ENV_PROFILE_MEM, '0') == '1'
+      if not (profile_cpu or profile_mem) or _active_profile_session:
+        return func(*args, **kwargs)
+
+      bound_args = func_signature.bind(*args, **kwargs)
+      bound_args.apply_defaults()
+      output_prefix = bound_args.arguments.get(
+          output_prefix_arg) or func.__name__
+      _active_profile_session = _ProfileSession(
+          output_prefix, cpu=profile_cpu, mem=profile_mem)
+      _active_profile_session.start()
+      try:
+        return func(*args, **kwargs)
+      finally:
+        _active_profile_session.checkpoint('end')
+        _active_profile_session.stop()
+        _active_profile_session = None
+
+    return func_wrapper
+
+  if func is None:
+    # decorator was called with argument(s)
+    return decorate_func
+  else:
+    # decorator was called without argument
+    return decorate_func(func)
+
+
+def p95_summary(perf_data: list[float]) -> str:
+  """Gets the one line summary of P95 related statistical data."""
   stat_info = calc_p95_info(perf_data)
   max_value = max(perf_data)
+  return (
+      f'=====> P95={stat_info.p95}; Outliner={stat_info.upper_bound};'
+      f' Max={max_value}')
+
+
+def success_rate_summary(found_num: int, drop_num: int) -> str:
+  """Gets the one line summary of success rate.
+
+  e.g.: =====> Success Rate 60.0%, total 5, success 3
+  """
+  total_num = found_num + drop_num
+  success_rate = found_num / total_num * 100 if total_num else 0
+  return (
+      f'=====> Success Rate {success_rate:.01f}%, total {total_num}'
+      f', success {found_num}')
+
+
+def print_p95(perf_data: list[float]):
   print(
         constants.Color.BOLD + constants.Color.CYAN +
-        f'=====> P95={stat_info.p95}; Outliner={stat_info.upper_bound};'
-        f' Max={max_value}\n' +
+        p95_summary(perf_data) + '\n' +
         constants.Color.END)